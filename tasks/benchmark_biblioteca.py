@@ -0,0 +1,618 @@
+"""
+Benchmarks del sistema de gestión de biblioteca.
+
+Uso:
+    python benchmark_biblioteca.py busquedas [--libros 1000000]
+    python benchmark_biblioteca.py texto [--libros 1000000]
+    python benchmark_biblioteca.py prestamos [--prestamos 50000]
+    python benchmark_biblioteca.py persistencia [--libros 1000000]
+    python benchmark_biblioteca.py vencimientos [--prestamos 1000000]
+    python benchmark_biblioteca.py ejemplares [--titulos 20000] [--ejemplares 40]
+    python benchmark_biblioteca.py concurrencia [--hilos 1 2 4 8 16] [--latencia-ms 1]
+    python benchmark_biblioteca.py ingesta [--registros 3000000] [--formato csv|jsonl|mrk]
+    python benchmark_biblioteca.py memoria [--libros 1000000] [--catalogo 5000000]
+    python benchmark_biblioteca.py estadisticas [--prestamos 1000000]
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter, deque
+from itertools import accumulate, islice
+
+from historial_biblioteca import HistorialPrestamos, mes_de
+from ingesta_biblioteca import CAMPOS, abrir_registros, ingerir
+from persistencia_biblioteca import AlmacenArchivos, AlmacenBiblioteca
+from sistema_biblioteca import Biblioteca, Libro, Usuario
+
+NOMBRES = ["Gabriel", "Isabel", "Mario", "Julio", "Laura", "Jorge", "Elena", "Pablo", "Rosa", "Andrés",
+           "Lucía", "Ángel", "Inés", "Tomás", "Sofía", "Ramón", "Carmen", "Álvaro", "Teresa", "Íñigo"]
+APELLIDOS = ["García", "Márquez", "Allende", "Vargas", "Cortázar", "Borges", "Pérez", "Galdós", "Mistral",
+             "Neruda", "Rulfo", "Fuentes", "Paz", "Benedetti", "Sábato", "Onetti", "Bolaño", "Matute"]
+CATEGORIAS = ["Ficción", "Misterio", "Fantasía", "Clásico", "Historia", "Ciencia", "Poesía", "Ensayo",
+              "Biografía", "Infantil", "Teatro", "Filosofía", "Arte", "Viajes", "Cocina", "Economía"]
+PALABRAS = ["amor", "guerra", "ciudad", "noche", "tiempo", "mar", "sombra", "casa", "río", "memoria",
+            "silencio", "viaje", "jardín", "fuego", "espejo", "laberinto", "soledad", "camino", "isla"]
+SILABAS = ["ma", "lo", "ri", "ta", "ne", "so", "ca", "du", "vi", "le", "pa", "mo", "ga", "ti", "ru", "be"]
+# Vocabulario con frecuencias de tipo Zipf, como en un catálogo real: pocas palabras muy
+# comunes y muchas raras
+VOCABULARIO = PALABRAS + [a + b + c for a in SILABAS for b in SILABAS for c in SILABAS]
+FRECUENCIAS_ACUMULADAS = list(accumulate(1 / rango for rango in range(1, len(VOCABULARIO) + 1)))
+
+
+def generar_libros(cantidad, semilla=42):
+    """
+    Genera libros sintéticos reproducibles.
+
+    Args:
+        cantidad: Número de libros a generar
+        semilla: Semilla del generador aleatorio
+
+    Returns:
+        generator: Objetos Libro con ISBN únicos
+    """
+    aleatorio = random.Random(semilla)
+    for numero in range(cantidad):
+        titulo = " ".join(aleatorio.choices(VOCABULARIO, cum_weights=FRECUENCIAS_ACUMULADAS, k=3)).capitalize()
+        autor = f"{aleatorio.choice(NOMBRES)} {aleatorio.choice(APELLIDOS)} {aleatorio.choice(APELLIDOS)}"
+        yield Libro(titulo, autor, aleatorio.choice(CATEGORIAS), f"978-{numero:010d}")
+
+
+def isbn13(numero):
+    """ISBN-13 válido (con dígito de control) para un número de secuencia."""
+    base = f"978{numero:09d}"
+    suma = sum(map(int, base[0::2])) + 3 * sum(map(int, base[1::2]))
+    return f"{base}{-suma % 10}"
+
+
+def generar_registros(cantidad, semilla=42):
+    """
+    Genera registros de catálogo como los de una sincronización: ~1 % de ISBN
+    repetidos (con y sin guiones) y ~0,5 % de registros inválidos.
+
+    Returns:
+        generator: Diccionarios con isbn, titulo, autor y categoria
+    """
+    aleatorio = random.Random(semilla)
+    for numero, libro in enumerate(generar_libros(cantidad, semilla)):
+        tirada = aleatorio.random()
+        isbn = isbn13(numero)
+        if tirada < 0.01 and numero:
+            repetido = isbn13(aleatorio.randrange(numero))
+            isbn = f"{repetido[:3]}-{repetido[3:]}"
+        elif tirada < 0.015:
+            isbn = isbn[:-1] + str((int(isbn[-1]) + 1) % 10)
+        yield {"isbn": isbn, "titulo": libro.titulo, "autor": libro.autor, "categoria": libro.categoria}
+
+
+def escribir_catalogo(ruta, formato, registros):
+    """Escribe registros en un archivo CSV, JSONL o MARC en texto (.mrk)."""
+    with open(ruta, "w", encoding="utf-8", newline="") as archivo:
+        if formato == "csv":
+            escritor = csv.DictWriter(archivo, fieldnames=CAMPOS)
+            escritor.writeheader()
+            escritor.writerows(registros)
+        elif formato == "jsonl":
+            archivo.writelines(json.dumps(registro, ensure_ascii=False) + "\n" for registro in registros)
+        else:
+            for registro in registros:
+                nombre, _, apellidos = registro["autor"].partition(" ")
+                archivo.write(f"=LDR  00000nam  2200000 a 4500\n"
+                              f"=020  \\\\$a{registro['isbn']}\n"
+                              f"=100  1\\$a{apellidos}, {nombre}.\n"
+                              f"=245  10$a{registro['titulo']} /\n"
+                              f"=650  \\0$a{registro['categoria']}.\n\n")
+
+
+class LibroConDiccionario:
+    """Representación original de Libro: __dict__, tupla (título, autor) y un indicador de disponibilidad."""
+
+    def __init__(self, titulo, autor, categoria, isbn):
+        self._info = (titulo, autor)
+        self.categoria = categoria
+        self.isbn = isbn
+        self.disponible = True
+
+
+def buscar_por_autor_recorriendo(biblioteca, autor):
+    """Búsqueda por autor original: recorre todos los libros."""
+    autor = autor.lower()
+    return [libro for libro in biblioteca.libros.values() if autor in libro.autor.lower()]
+
+
+def buscar_por_categoria_recorriendo(biblioteca, categoria):
+    """Búsqueda por categoría original: recorre todos los libros."""
+    categoria = categoria.lower()
+    return [libro for libro in biblioteca.libros.values() if categoria == libro.categoria.lower()]
+
+
+def prestamos_vencidos_recorriendo(biblioteca, ahora):
+    """Préstamos vencidos mirando el vencimiento de todos los préstamos."""
+    vencidos = sorted((vence, *clave) for clave, vence in biblioteca.vencimientos.items() if vence <= ahora)
+    return [(biblioteca.libros[isbn], biblioteca.usuarios[id_usuario], vence) for vence, isbn, id_usuario in vencidos]
+
+
+def medir(funcion, consultas):
+    """Tiempo medio por consulta en segundos."""
+    inicio = time.perf_counter()
+    for consulta in consultas:
+        funcion(consulta)
+    return (time.perf_counter() - inicio) / len(consultas)
+
+
+def benchmark_busquedas(argumentos):
+    biblioteca = Biblioteca()
+    inicio = time.perf_counter()
+    for libro in generar_libros(argumentos.libros):
+        biblioteca.añadir_libro(libro)
+    biblioteca.buscar("")  # Los índices se construyen en la primera búsqueda
+    print(f"📚 {argumentos.libros:,} libros cargados e indexados en {time.perf_counter() - inicio:.2f} s")
+
+    aleatorio = random.Random(7)
+    # Autores completos (pocos resultados) y categorías (muchos resultados)
+    autores = [f"{aleatorio.choice(NOMBRES)} {aleatorio.choice(APELLIDOS)} {aleatorio.choice(APELLIDOS)}"
+               for _ in range(argumentos.consultas)]
+    categorias = [aleatorio.choice(CATEGORIAS) for _ in range(argumentos.consultas)]
+    casos = [
+        ("autor", autores, biblioteca.buscar_por_autor,
+         lambda autor: buscar_por_autor_recorriendo(biblioteca, autor)),
+        ("categoría", categorias, biblioteca.buscar_por_categoria,
+         lambda categoria: buscar_por_categoria_recorriendo(biblioteca, categoria)),
+    ]
+    for nombre, consultas, con_indice, recorriendo in casos:
+        # El índice busca palabras sin tildes en cualquier orden: encuentra al menos lo mismo que el recorrido
+        assert {l.isbn for l in con_indice(consultas[0])} >= {l.isbn for l in recorriendo(consultas[0])}
+        # El recorrido es lento: se mide con menos consultas
+        t_recorrido = medir(recorriendo, consultas[:max(1, len(consultas) // 50)])
+        t_indice = medir(con_indice, consultas)
+        resultados = len(con_indice(consultas[0]))
+        print(f"🔎 Por {nombre} (~{resultados:,} resultados): índice {t_indice * 1e6:,.1f} µs | "
+              f"recorrido {t_recorrido * 1e6:,.1f} µs | x{t_recorrido / t_indice:,.0f} más rápido")
+
+
+def benchmark_texto(argumentos):
+    biblioteca = Biblioteca()
+    inicio = time.perf_counter()
+    for libro in generar_libros(argumentos.libros):
+        biblioteca.añadir_libro(libro)
+    biblioteca.buscar("")  # Los índices se construyen en la primera búsqueda
+    print(f"📚 {argumentos.libros:,} libros cargados e indexados en {time.perf_counter() - inicio:.2f} s "
+          f"({len(biblioteca.motor._vocabulario):,} palabras distintas)")
+
+    aleatorio = random.Random(7)
+    casos = {
+        "palabra poco común": [aleatorio.choice(VOCABULARIO[1000:]) for _ in range(argumentos.consultas)],
+        "título + autor": [f"{aleatorio.choice(VOCABULARIO[100:])} {aleatorio.choice(APELLIDOS)}"
+                           for _ in range(argumentos.consultas)],
+        "palabra común": [aleatorio.choice(PALABRAS[:5]) for _ in range(argumentos.consultas)],
+        "prefijo": [aleatorio.choice(VOCABULARIO[100:])[:4] + "*" for _ in range(argumentos.consultas)],
+    }
+    for nombre, consultas in casos.items():
+        t_motor = medir(lambda consulta: biblioteca.buscar(consulta, k=10), consultas)
+        print(f"🔎 {nombre} ({consultas[0]!r}): top-10 BM25 en {t_motor * 1000:,.2f} ms")
+    t_titulo = medir(biblioteca.buscar_por_titulo, [aleatorio.choice(PALABRAS) for _ in range(5)])
+    print(f"🐢 buscar_por_titulo (subcadena, recorrido completo): {t_titulo * 1000:,.2f} ms")
+
+    inicio = time.perf_counter()
+    isbns = list(biblioteca.libros)[::10]
+    for isbn in isbns:
+        biblioteca.quitar_libro(isbn)
+    print(f"🗑️ {len(isbns):,} libros quitados del índice en {time.perf_counter() - inicio:.2f} s")
+
+
+def benchmark_prestamos(argumentos):
+    biblioteca = Biblioteca()
+    for libro in generar_libros(argumentos.prestamos):
+        biblioteca.añadir_libro(libro)
+    biblioteca.registrar_usuario(Usuario("Biblioteca universitaria", "INST"))
+    isbns = list(biblioteca.libros)
+
+    inicio = time.perf_counter()
+    for isbn in isbns:
+        biblioteca.prestar_libro(isbn, "INST")
+    prestar = time.perf_counter() - inicio
+    # Devoluciones en orden aleatorio: con una lista cada una costaba O(préstamos activos)
+    random.Random(7).shuffle(isbns)
+    inicio = time.perf_counter()
+    for isbn in isbns:
+        biblioteca.devolver_libro(isbn, "INST")
+    devolver = time.perf_counter() - inicio
+    print(f"📖 {len(isbns):,} préstamos a un mismo usuario: {len(isbns) / prestar:,.0f} préstamos/s | "
+          f"{len(isbns) / devolver:,.0f} devoluciones/s")
+
+
+def benchmark_vencimientos(argumentos):
+    biblioteca = Biblioteca()
+    biblioteca.añadir_libros(generar_libros(argumentos.prestamos))
+    for numero in range(1000):
+        biblioteca.registrar_usuario(Usuario(f"Usuario {numero}", f"U{numero:04d}"))
+    # Préstamos hechos durante los últimos 30 días: con 14 días de plazo, ~1/6 están vencidos
+    ahora = time.time()
+    aleatorio = random.Random(7)
+    inicio = time.perf_counter()
+    for numero, isbn in enumerate(biblioteca.libros):
+        biblioteca.prestar_libro(isbn, f"U{numero % 1000:04d}", ahora=ahora - aleatorio.uniform(0, 30) * 86400)
+    print(f"📖 {argumentos.prestamos:,} préstamos con vencimiento: "
+          f"{argumentos.prestamos / (time.perf_counter() - inicio):,.0f} préstamos/s")
+
+    for dias_atras in (15.9, 14, 0):
+        instante = ahora - dias_atras * 86400
+        t_monticulo = medir(lambda _: biblioteca.prestamos_vencidos(instante), range(5))
+        t_recorrido = medir(lambda _: prestamos_vencidos_recorriendo(biblioteca, instante), range(5))
+        vencidos = len(biblioteca.prestamos_vencidos(instante))
+        print(f"⏰ {vencidos:,} vencidos hace {dias_atras:g} días: montículo {t_monticulo * 1000:,.2f} ms | "
+              f"recorrido {t_recorrido * 1000:,.2f} ms")
+
+    # Cada libro con 5 reservas: cada devolución lo presta al siguiente de la cola
+    prestatarios = {isbn: id_usuario for isbn, id_usuario in biblioteca.prestamos}
+    isbns = list(biblioteca.libros)[:argumentos.prestamos // 10]
+    for isbn in isbns:
+        for desplazamiento in range(1, 6):
+            biblioteca.reservar_libro(isbn, f"U{(int(prestatarios[isbn][1:]) + desplazamiento) % 1000:04d}")
+    inicio = time.perf_counter()
+    entregas = 0
+    for desplazamiento in range(5):
+        for isbn in isbns:
+            biblioteca.devolver_libro(isbn, f"U{(int(prestatarios[isbn][1:]) + desplazamiento) % 1000:04d}",
+                                      ahora=ahora)
+            entregas += 1
+    segundos = time.perf_counter() - inicio
+    print(f"🔁 {entregas:,} devoluciones entregadas al siguiente de la cola: {entregas / segundos:,.0f} por segundo "
+          f"({len(biblioteca.reservas):,} colas pendientes)")
+
+
+def benchmark_ejemplares(argumentos):
+    titulos = list(generar_libros(argumentos.titulos))
+    # Antes: un Libro con un ISBN inventado por cada ejemplar
+    tracemalloc.start()
+    por_ejemplar = Biblioteca()
+    for libro in titulos:
+        for copia in range(argumentos.ejemplares):
+            por_ejemplar.añadir_libro(Libro(libro.titulo, libro.autor, libro.categoria, f"{libro.isbn}-{copia}"))
+    memoria_antes = tracemalloc.get_traced_memory()[0]
+    del por_ejemplar
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    por_titulo = Biblioteca()
+    por_titulo.añadir_libros(Libro(libro.titulo, libro.autor, libro.categoria, libro.isbn, argumentos.ejemplares)
+                             for libro in titulos)
+    memoria_despues = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    total = argumentos.titulos * argumentos.ejemplares
+    print(f"💾 {argumentos.titulos:,} títulos x {argumentos.ejemplares} ejemplares: un Libro por ejemplar "
+          f"{memoria_antes / 1e6:,.1f} MB ({memoria_antes / total:,.0f} B/ejemplar) | ejemplares por título "
+          f"{memoria_despues / 1e6:,.1f} MB ({memoria_despues / total:,.0f} B/ejemplar)")
+
+    # Un curso entero se lleva los ejemplares de un mismo libro y los devuelve
+    for numero in range(argumentos.ejemplares):
+        por_titulo.registrar_usuario(Usuario(f"Alumno {numero}", f"A{numero:03d}"))
+    alumnos = list(por_titulo.usuarios)
+    isbns = list(por_titulo.libros)[:1000]
+    inicio = time.perf_counter()
+    for isbn in isbns:
+        for alumno in alumnos:
+            por_titulo.prestar_libro(isbn, alumno)
+        assert not por_titulo.libros[isbn].disponible
+        for alumno in alumnos:
+            por_titulo.devolver_libro(isbn, alumno)
+    operaciones = 2 * len(isbns) * len(alumnos)
+    print(f"📖 Préstamos y devoluciones de ejemplares: {operaciones / (time.perf_counter() - inicio):,.0f} op/s")
+
+
+class AlmacenRemotoSimulado(AlmacenBiblioteca):
+    """Almacén que solo espera: simula una base de datos remota que confirma cada registro."""
+
+    def __init__(self, latencia):
+        self.latencia = latencia
+
+    def cargar(self):
+        return {"libros": {}, "usuarios": {}, "prestamos": {}, "reservas": {}}
+
+    def registrar(self, registros):
+        if self.latencia:
+            time.sleep(self.latencia)
+
+    def escribir_instantanea(self, datos):
+        pass
+
+
+def quiosco(biblioteca, usuarios, isbns, operaciones, semilla, en_mano, cerrojo_comprobacion, errores):
+    """Hilo de un quiosco: presta y devuelve libros al azar y anota cada ejemplar que entrega."""
+    aleatorio = random.Random(semilla)
+    prestados = []  # (isbn, id_usuario, ejemplar)
+    for _ in range(operaciones):
+        if prestados and (len(prestados) >= 3 or aleatorio.random() < 0.5):
+            isbn, id_usuario, ejemplar = prestados.pop(aleatorio.randrange(len(prestados)))
+            # Se anota antes de devolver: en cuanto se devuelve, otro quiosco puede recibir el ejemplar
+            with cerrojo_comprobacion:
+                del en_mano[(isbn, ejemplar)]
+            if not biblioteca.devolver_libro(isbn, id_usuario):
+                errores.append(f"devolución rechazada: {isbn} {id_usuario}")
+            continue
+        isbn, id_usuario = aleatorio.choice(isbns), aleatorio.choice(usuarios)
+        if biblioteca.prestar_libro(isbn, id_usuario):
+            ejemplar = biblioteca.prestamos[(isbn, id_usuario)]
+            with cerrojo_comprobacion:
+                if (isbn, ejemplar) in en_mano:
+                    errores.append(f"ejemplar {ejemplar} de {isbn} prestado dos veces")
+                en_mano[(isbn, ejemplar)] = id_usuario
+            prestados.append((isbn, id_usuario, ejemplar))
+    for isbn, id_usuario, ejemplar in prestados:
+        with cerrojo_comprobacion:
+            del en_mano[(isbn, ejemplar)]
+        biblioteca.devolver_libro(isbn, id_usuario)
+
+
+def benchmark_concurrencia(argumentos):
+    print(f"🏪 {argumentos.titulos:,} títulos x {argumentos.ejemplares} ejemplares, "
+          f"{argumentos.operaciones:,} operaciones por quiosco, confirmación remota de "
+          f"{argumentos.latencia_ms} ms por operación")
+    for franjas, nombre in ((1, "cerrojo global"), (argumentos.franjas, f"{argumentos.franjas} franjas")):
+        linea = []
+        for hilos in argumentos.hilos:
+            biblioteca = Biblioteca(AlmacenRemotoSimulado(argumentos.latencia_ms / 1000), franjas=franjas)
+            biblioteca.añadir_libros(Libro(l.titulo, l.autor, l.categoria, l.isbn, argumentos.ejemplares)
+                                     for l in generar_libros(argumentos.titulos))
+            # Cada quiosco atiende a sus propios usuarios
+            for numero in range(hilos * 50):
+                biblioteca.registrar_usuario(Usuario(f"Usuario {numero}", f"U{numero:05d}"))
+            usuarios = list(biblioteca.usuarios)
+            isbns = list(biblioteca.libros)
+            en_mano, cerrojo_comprobacion, errores = {}, threading.Lock(), []
+            quioscos = [threading.Thread(target=quiosco, args=(biblioteca, usuarios[n * 50:(n + 1) * 50], isbns,
+                                                               argumentos.operaciones, n, en_mano,
+                                                               cerrojo_comprobacion, errores))
+                        for n in range(hilos)]
+            inicio = time.perf_counter()
+            for hilo in quioscos:
+                hilo.start()
+            for hilo in quioscos:
+                hilo.join()
+            segundos = time.perf_counter() - inicio
+            # Al terminar todo está devuelto: cada libro con todos sus ejemplares libres
+            if biblioteca.prestamos or any(l.disponibles != l.ejemplares for l in biblioteca.libros.values()):
+                errores.append("quedaron préstamos sin devolver")
+            estado = "✅" if not errores else f"❌ {errores[0]}"
+            linea.append(f"{hilos} hilos {hilos * argumentos.operaciones / segundos:,.0f} op/s {estado}")
+        print(f"🔒 {nombre}: " + " | ".join(linea))
+
+
+def benchmark_persistencia(argumentos):
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, "biblioteca")
+        biblioteca = Biblioteca()
+        for libro in generar_libros(argumentos.libros):
+            biblioteca.añadir_libro(libro)
+        for numero in range(argumentos.libros // 100):
+            biblioteca.registrar_usuario(Usuario(f"Usuario {numero}", f"U{numero:07d}"))
+        for numero, isbn in enumerate(list(biblioteca.libros)[::10]):
+            biblioteca.prestar_libro(isbn, f"U{numero % len(biblioteca.usuarios):07d}")
+
+        biblioteca.almacen = AlmacenArchivos(ruta)
+        inicio = time.perf_counter()
+        biblioteca.compactar()
+        print(f"💾 Instantánea de {argumentos.libros:,} libros escrita en {time.perf_counter() - inicio:.2f} s "
+              f"({os.path.getsize(ruta + '.json') / 1e6:,.1f} MB)")
+
+        operaciones = 10000
+        isbns = list(biblioteca.libros)[1::10][:operaciones]
+        inicio = time.perf_counter()
+        for numero, isbn in enumerate(isbns):
+            biblioteca.prestar_libro(isbn, f"U{numero % len(biblioteca.usuarios):07d}")
+        segundos = time.perf_counter() - inicio
+        print(f"📝 {operaciones:,} préstamos guardados de forma incremental: {operaciones / segundos:,.0f} op/s "
+              f"(registro de {os.path.getsize(ruta + '.log') / 1e3:,.0f} KB)")
+
+        del biblioteca
+        inicio = time.perf_counter()
+        restaurada = Biblioteca(AlmacenArchivos(ruta))
+        print(f"📂 Biblioteca restaurada en {time.perf_counter() - inicio:.2f} s: {len(restaurada.libros):,} libros, "
+              f"{len(restaurada.usuarios):,} usuarios, {len(restaurada.prestamos):,} préstamos")
+
+
+def benchmark_ingesta(argumentos):
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, f"catalogo.{argumentos.formato}")
+        escribir_catalogo(ruta, argumentos.formato, generar_registros(argumentos.registros))
+        print(f"📄 Catálogo {argumentos.formato.upper()} de {argumentos.registros:,} registros "
+              f"({os.path.getsize(ruta) / 1e6:,.0f} MB)")
+
+        biblioteca = Biblioteca(AlmacenArchivos(os.path.join(carpeta, "biblioteca")))
+        resumen = ingerir(biblioteca, abrir_registros(ruta))
+        print(f"📥 Ingesta masiva (lectura, validación, un registro por lote e instantánea final): {resumen}")
+        inicio = time.perf_counter()
+        biblioteca.buscar("soledad")
+        print(f"🗂️ Índices construidos de una vez en la primera búsqueda: {time.perf_counter() - inicio:.2f} s")
+
+        # Libro a libro, con los índices ya construidos y un registro de cambios por libro
+        muestra = min(argumentos.registros, 100000)
+        biblioteca = Biblioteca(AlmacenArchivos(os.path.join(carpeta, "uno_a_uno")))
+        biblioteca.buscar("soledad")
+        inicio = time.perf_counter()
+        for registro in islice(abrir_registros(ruta), muestra):
+            biblioteca.añadir_libro(Libro(registro["titulo"], registro["autor"], registro["categoria"],
+                                          registro["isbn"]))
+        segundos = time.perf_counter() - inicio
+        print(f"🐢 Libro a libro con añadir_libro (sin validar, {muestra:,} registros): "
+              f"{muestra / segundos:,.0f} registros/s")
+
+
+def memoria_por_libro(crear, filas_json):
+    """
+    Memoria que ocupan los libros creados a partir de filas JSON, con sus cadenas.
+
+    Cada fila se decodifica justo antes de crear su libro, así que cada campo
+    llega como una cadena nueva, igual que al restaurar un almacén o ingerir un catálogo.
+
+    Returns:
+        tuple: (bytes por libro, objeto creado para que siga vivo hasta medir)
+    """
+    tracemalloc.start()
+    libros = crear(json.loads(linea) for linea in io.StringIO(filas_json))
+    memoria = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    cantidad = len(libros.libros) if isinstance(libros, Biblioteca) else len(libros)
+    return memoria / cantidad, libros
+
+
+def benchmark_memoria(argumentos):
+    filas_json = "".join(json.dumps([libro.titulo, libro.autor, libro.categoria, libro.isbn], ensure_ascii=False) + "\n"
+                         for libro in generar_libros(argumentos.libros))
+    # Los tres casos se miden como catálogo ISBN -> libro, igual que Biblioteca.libros
+    antes, libros = memoria_por_libro(lambda filas: {fila[3]: LibroConDiccionario(*fila) for fila in filas}, filas_json)
+    del libros
+    con_slots, libros = memoria_por_libro(lambda filas: {fila[3]: Libro(*fila) for fila in filas}, filas_json)
+    autores = len({libro.autor for libro in libros.values()})
+    del libros
+
+    def catalogo(filas):
+        biblioteca = Biblioteca()
+        biblioteca.añadir_libros(Libro(*fila) for fila in filas)
+        return biblioteca
+
+    en_biblioteca, biblioteca = memoria_por_libro(catalogo, filas_json)
+    objetivo = argumentos.catalogo
+    print(f"📚 {argumentos.libros:,} libros ({autores:,} autores distintos), estimación para {objetivo:,} libros:")
+    for descripcion, por_libro in [("Libro original con __dict__", antes),
+                                   ("Libro con __slots__, sin internar", con_slots),
+                                   ("Dentro de Biblioteca.libros, autores/categorías internados (sin índices)",
+                                    en_biblioteca)]:
+        print(f"💾 {descripcion}: {por_libro:,.0f} B/libro -> {por_libro * objetivo / 1e9:,.2f} GB")
+    print(f"📉 Ahorro por libro: {antes - en_biblioteca:,.0f} B ({1 - en_biblioteca / antes:.0%})")
+    del biblioteca
+
+
+def mas_prestados_recorriendo(historial, n, anio):
+    """Libros más prestados de un año volviendo a leer todo el historial."""
+    prefijo = f"{anio:04d}-"
+    return Counter(evento[2] for evento in historial.eventos()
+                   if evento[1] == "p" and mes_de(evento[0]).startswith(prefijo)).most_common(n)
+
+
+def simular_prestamos(biblioteca, operaciones, semilla=42, en_mano=20000):
+    """
+    Presta libros con popularidad de tipo Zipf durante un año; cuando hay más
+    de en_mano préstamos activos se devuelve el más antiguo.
+
+    Returns:
+        int: Préstamos realizados
+    """
+    aleatorio = random.Random(semilla)
+    isbns = list(biblioteca.libros)
+    usuarios = list(biblioteca.usuarios)
+    popularidad = list(accumulate(1 / rango for rango in range(1, len(isbns) + 1)))
+    activos = deque()
+    ahora = time.mktime((2025, 1, 1, 0, 0, 0, 0, 0, -1))
+    paso = 365 * 86400 / operaciones
+    prestados = 0
+    for isbn in aleatorio.choices(isbns, cum_weights=popularidad, k=operaciones):
+        ahora += paso
+        id_usuario = aleatorio.choice(usuarios)
+        if biblioteca.prestar_libro(isbn, id_usuario, ahora=ahora):
+            activos.append((isbn, id_usuario))
+            prestados += 1
+        if len(activos) > en_mano:
+            biblioteca.devolver_libro(*activos.popleft(), ahora=ahora)
+    return prestados
+
+
+def benchmark_estadisticas(argumentos):
+    libros = list(generar_libros(argumentos.libros))
+    with tempfile.TemporaryDirectory() as carpeta:
+        ruta = os.path.join(carpeta, "biblioteca")
+        for historial in (None, HistorialPrestamos(ruta)):
+            biblioteca = Biblioteca(historial=historial)
+            biblioteca.añadir_libros(Libro(l.titulo, l.autor, l.categoria, l.isbn, 3) for l in libros)
+            for numero in range(argumentos.usuarios):
+                biblioteca.registrar_usuario(Usuario(f"Socio {numero}", f"S{numero:06d}"))
+            inicio = time.perf_counter()
+            prestados = simular_prestamos(biblioteca, argumentos.prestamos)
+            segundos = time.perf_counter() - inicio
+            descripcion = "sin historial" if historial is None else "con historial y contadores"
+            print(f"📖 {prestados:,} préstamos en un año ({descripcion}): {prestados / segundos:,.0f} préstamos/s")
+        print(f"📄 Historial: {os.path.getsize(historial.archivo) / 1e6:,.0f} MB, "
+              f"{sum(historial.por_isbn.values()):,} préstamos y {historial.devoluciones:,} devoluciones")
+
+        inicio = time.perf_counter()
+        top = historial.mas_prestados(100, anio=2025)
+        con_contadores = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        assert mas_prestados_recorriendo(historial, 100, 2025)[0] == top[0]
+        recorriendo = time.perf_counter() - inicio
+        print(f"🏆 Top 100 del año: contadores {con_contadores * 1000:,.2f} ms | "
+              f"recorriendo el historial {recorriendo * 1000:,.0f} ms ({recorriendo / con_contadores:,.0f}x)")
+        inicio = time.perf_counter()
+        tendencia = historial.tendencia_categoria(CATEGORIAS[0])
+        print(f"📈 Tendencia mensual de {CATEGORIAS[0]} ({len(tendencia)} meses): "
+              f"{(time.perf_counter() - inicio) * 1000:,.2f} ms")
+
+        historial.guardar_resumen()
+        inicio = time.perf_counter()
+        HistorialPrestamos(ruta)
+        con_resumen = time.perf_counter() - inicio
+        os.remove(historial.archivo_resumen)
+        inicio = time.perf_counter()
+        HistorialPrestamos(ruta)
+        print(f"📂 Carga del historial: con resumen {con_resumen:.2f} s | "
+              f"recorriéndolo entero {time.perf_counter() - inicio:.2f} s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks del sistema de biblioteca")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+    busquedas = subparsers.add_parser("busquedas", help="Índices secundarios frente a recorrer el catálogo")
+    busquedas.add_argument("--libros", type=int, default=200000)
+    busquedas.add_argument("--consultas", type=int, default=200)
+    busquedas.set_defaults(funcion=benchmark_busquedas)
+    texto = subparsers.add_parser("texto", help="Motor de texto completo (BM25, prefijos, top-k)")
+    texto.add_argument("--libros", type=int, default=200000)
+    texto.add_argument("--consultas", type=int, default=50)
+    texto.set_defaults(funcion=benchmark_texto)
+    prestamos = subparsers.add_parser("prestamos", help="Préstamos y devoluciones de un usuario institucional")
+    prestamos.add_argument("--prestamos", type=int, default=50000)
+    prestamos.set_defaults(funcion=benchmark_prestamos)
+    persistencia = subparsers.add_parser("persistencia", help="Instantánea, registro de cambios y restauración")
+    persistencia.add_argument("--libros", type=int, default=500000)
+    persistencia.set_defaults(funcion=benchmark_persistencia)
+    vencimientos = subparsers.add_parser("vencimientos", help="Préstamos vencidos y colas de reservas")
+    vencimientos.add_argument("--prestamos", type=int, default=1000000)
+    vencimientos.set_defaults(funcion=benchmark_vencimientos)
+    ejemplares = subparsers.add_parser("ejemplares", help="Memoria y préstamos con varios ejemplares por título")
+    ejemplares.add_argument("--titulos", type=int, default=20000)
+    ejemplares.add_argument("--ejemplares", type=int, default=40)
+    ejemplares.set_defaults(funcion=benchmark_ejemplares)
+    concurrencia = subparsers.add_parser("concurrencia", help="Quioscos en paralelo: escalado y ejemplares duplicados")
+    concurrencia.add_argument("--hilos", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    concurrencia.add_argument("--operaciones", type=int, default=2000, help="Operaciones por quiosco")
+    concurrencia.add_argument("--titulos", type=int, default=500)
+    concurrencia.add_argument("--ejemplares", type=int, default=3)
+    concurrencia.add_argument("--franjas", type=int, default=64)
+    concurrencia.add_argument("--latencia-ms", type=float, default=1.0,
+                              help="Espera del almacén por operación (0 = solo CPU)")
+    concurrencia.set_defaults(funcion=benchmark_concurrencia)
+    ingesta = subparsers.add_parser("ingesta", help="Ingesta masiva de un catálogo frente a añadir_libro")
+    ingesta.add_argument("--registros", type=int, default=1000000)
+    ingesta.add_argument("--formato", choices=["csv", "jsonl", "mrk"], default="csv")
+    ingesta.set_defaults(funcion=benchmark_ingesta)
+    memoria = subparsers.add_parser("memoria", help="Bytes por libro y estimación para un catálogo grande")
+    memoria.add_argument("--libros", type=int, default=1000000, help="Libros que se crean y se miden")
+    memoria.add_argument("--catalogo", type=int, default=5000000, help="Tamaño del catálogo estimado")
+    memoria.set_defaults(funcion=benchmark_memoria)
+    estadisticas = subparsers.add_parser("estadisticas", help="Historial de préstamos y consultas de popularidad")
+    estadisticas.add_argument("--prestamos", type=int, default=1000000, help="Préstamos intentados en el año")
+    estadisticas.add_argument("--libros", type=int, default=100000)
+    estadisticas.add_argument("--usuarios", type=int, default=50000)
+    estadisticas.set_defaults(funcion=benchmark_estadisticas)
+    argumentos = parser.parse_args()
+    argumentos.funcion(argumentos)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+Motor de búsqueda de texto completo para el catálogo de la biblioteca.
+
+Indexa título, autor y categoría de cada libro en un índice invertido
+(palabra -> lista de libros) y ordena los resultados con BM25.
+"""
+import heapq
+import math
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left, insort
+from functools import lru_cache
+from operator import itemgetter
+
+# Una palabra puede llevar marcas diacríticas combinadas (texto en forma NFD,
+# habitual en registros MARC): "Ma\u0301rquez" es una sola palabra
+PALABRA = re.compile(r"\w[\w\u0300-\u036f]*")
+
+
+@lru_cache(maxsize=65536)  # Autores y categorías se repiten mucho en un catálogo
+def normalizar(texto):
+    """
+    Normaliza un texto para compararlo sin distinguir mayúsculas ni tildes.
+
+    Args:
+        texto: Texto a normalizar
+
+    Returns:
+        str: Texto en minúsculas y sin marcas diacríticas ("Márquez" -> "marquez")
+    """
+    descompuesto = unicodedata.normalize("NFKD", texto.casefold())
+    return "".join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+@lru_cache(maxsize=65536)
+def tokenizar(texto):
+    """
+    Divide un texto normalizado en palabras.
+
+    Args:
+        texto: Texto a dividir
+
+    Returns:
+        tuple: Palabras normalizadas del texto
+    """
+    # Se normaliza palabra a palabra: las palabras se repiten mucho más que los
+    # títulos completos, así que casi siempre están ya en la caché de normalizar
+    return tuple(map(normalizar, PALABRA.findall(texto.casefold())))
+
+
+class MotorBusqueda:
+    """
+    Índice invertido con ranking BM25 sobre título, autor y categoría.
+
+    Cada palabra tiene una lista de publicación con dos arrays paralelos: los
+    números internos de los libros que la contienen y su frecuencia ponderada
+    por campo (el título pesa más que el autor y este más que la categoría).
+    Al quitar un libro su número se marca como borrado y se omite al puntuar;
+    cuando los borrados superan una cuarta parte del índice, las listas se
+    compactan de una vez y los libros vigentes se renumeran.
+
+    Consultas: palabras sueltas sin tildes ni mayúsculas; una palabra terminada
+    en "*" busca por prefijo ("garc*" encuentra "García" y "Garcilaso").
+
+    Atributos:
+        k1, b: Parámetros de BM25
+        pesos: Peso de cada campo en la frecuencia de una palabra
+    """
+
+    PESOS = {"titulo": 3.0, "autor": 2.0, "categoria": 1.0}
+
+    def __init__(self, k1=1.2, b=0.75, pesos=None):
+        """
+        Inicializa un índice vacío.
+
+        Args:
+            k1: Saturación de la frecuencia de las palabras
+            b: Peso de la normalización por longitud del documento
+            pesos: Diccionario campo -> peso (por defecto PESOS)
+        """
+        self.k1 = k1
+        self.b = b
+        self.pesos = pesos or self.PESOS
+        self._publicaciones = {}  # Palabra -> (array de documentos, array de frecuencias)
+        self._df = {}  # Palabra -> número de documentos vigentes que la contienen
+        self._vocabulario = []  # Palabras ordenadas, para las búsquedas por prefijo
+        self._isbns = []  # Documento -> ISBN (None si se quitó)
+        self._documentos = {}  # ISBN -> documento
+        self._longitudes = array("d")  # Documento -> longitud ponderada
+        self._longitud_total = 0.0
+        self._borrados = set()
+
+    def __len__(self):
+        """Número de libros indexados."""
+        return len(self._documentos)
+
+    def _frecuencias(self, libro):
+        """Frecuencia ponderada de cada palabra del libro en sus campos."""
+        frecuencias = {}
+        for campo, peso in self.pesos.items():
+            for palabra in tokenizar(getattr(libro, campo)):
+                frecuencias[palabra] = frecuencias.get(palabra, 0.0) + peso
+        return frecuencias
+
+    def agregar(self, libro):
+        """
+        Indexa un libro (o lo reindexa si su ISBN ya estaba).
+
+        Args:
+            libro: Objeto Libro con titulo, autor, categoria e isbn
+        """
+        if libro.isbn in self._documentos:
+            self.quitar(libro)
+        self._indexar(libro, insort)
+
+    def agregar_lote(self, libros):
+        """
+        Indexa muchos libros de una vez; el vocabulario se ordena una sola vez al final.
+
+        Args:
+            libros: Iterable de objetos Libro con ISBN que no estén ya indexados
+        """
+        nuevas = []
+        for libro in libros:
+            self._indexar(libro, list.append, nuevas)
+        if nuevas:
+            self._vocabulario = sorted(self._vocabulario + nuevas)
+
+    def _indexar(self, libro, anotar, vocabulario=None):
+        """Añade un libro a las listas de publicación; anotar(vocabulario, palabra) registra cada palabra nueva."""
+        documento = len(self._isbns)
+        self._isbns.append(libro.isbn)
+        self._documentos[libro.isbn] = documento
+        frecuencias = self._frecuencias(libro)
+        longitud = sum(frecuencias.values())
+        self._longitudes.append(longitud)
+        self._longitud_total += longitud
+        publicaciones, df = self._publicaciones, self._df
+        for palabra, frecuencia in frecuencias.items():
+            publicacion = publicaciones.get(palabra)
+            if publicacion is None:
+                publicacion = publicaciones[palabra] = (array("l"), array("f"))
+                df[palabra] = 0
+                anotar(self._vocabulario if vocabulario is None else vocabulario, palabra)
+            publicacion[0].append(documento)
+            publicacion[1].append(frecuencia)
+            df[palabra] += 1
+
+    def quitar(self, libro):
+        """
+        Quita un libro del índice.
+
+        Args:
+            libro: Objeto Libro a quitar (sus campos deben ser los que se indexaron)
+
+        Returns:
+            bool: True si el libro estaba indexado
+        """
+        documento = self._documentos.pop(libro.isbn, None)
+        if documento is None:
+            return False
+        self._isbns[documento] = None
+        self._borrados.add(documento)
+        self._longitud_total -= self._longitudes[documento]
+        for palabra in self._frecuencias(libro):
+            self._df[palabra] -= 1
+        if len(self._borrados) * 4 > len(self._isbns):
+            self.compactar()
+        return True
+
+    def compactar(self):
+        """
+        Elimina los libros quitados y las palabras sin libros, y renumera los libros vigentes.
+
+        Los números nuevos conservan el orden de los antiguos, así que las listas
+        de publicación siguen ordenadas. La longitud total se recalcula desde
+        cero, sin el error de redondeo acumulado al quitar libros.
+        """
+        nuevo = array("l", [-1]) * len(self._isbns)  # Documento antiguo -> nuevo (-1 si se quitó)
+        isbns, longitudes = [], array("d")
+        for documento, isbn in enumerate(self._isbns):
+            if isbn is not None:
+                nuevo[documento] = len(isbns)
+                isbns.append(isbn)
+                longitudes.append(self._longitudes[documento])
+        for palabra in list(self._publicaciones):
+            if self._df[palabra] == 0:
+                del self._publicaciones[palabra]
+                del self._df[palabra]
+                continue
+            documentos, frecuencias = self._publicaciones[palabra]
+            vigentes = [(nuevo[d], f) for d, f in zip(documentos, frecuencias) if nuevo[d] >= 0]
+            self._publicaciones[palabra] = (array("l", map(itemgetter(0), vigentes)),
+                                            array("f", map(itemgetter(1), vigentes)))
+        self._isbns = isbns
+        self._documentos = {isbn: documento for documento, isbn in enumerate(isbns)}
+        self._longitudes = longitudes
+        self._longitud_total = sum(longitudes)
+        self._vocabulario = sorted(self._publicaciones)
+        self._borrados = set()
+
+    def _expandir(self, termino):
+        """Palabras del vocabulario que corresponden a un término (con * final = prefijo)."""
+        if not termino.endswith("*"):
+            return [termino] if self._df.get(termino) else []
+        prefijo = normalizar(termino[:-1])
+        inicio = bisect_left(self._vocabulario, prefijo)
+        palabras = []
+        for palabra in self._vocabulario[inicio:]:
+            if not palabra.startswith(prefijo):
+                break
+            if self._df.get(palabra):
+                palabras.append(palabra)
+        return palabras
+
+    def _terminos(self, consulta):
+        """Divide la consulta en términos normalizados, conservando el * de los prefijos."""
+        return [normalizar(t) for t in re.findall(PALABRA.pattern + r"\*?", consulta)]
+
+    def buscar(self, consulta, k=10):
+        """
+        Busca los k libros más relevantes para la consulta.
+
+        Un libro puntúa por cada término de la consulta que contiene (no hace
+        falta que los contenga todos). En un término con prefijo cuenta la
+        palabra que mejor puntúa para cada libro.
+
+        Args:
+            consulta: Texto de búsqueda, p. ej. "garcia marquez soledad" o "cien a*"
+            k: Número máximo de resultados
+
+        Returns:
+            list: Tuplas (isbn, puntuación) de mayor a menor puntuación
+        """
+        total = len(self._documentos)
+        if not total:
+            return []
+        # norma = k1 * (1 - b + b * longitud / media), precalculada en dos constantes
+        constante = self.k1 * (1 - self.b)
+        # Si ningún libro tiene palabras la longitud media es 0 (y tampoco habrá coincidencias)
+        por_longitud = self.k1 * self.b * total / self._longitud_total if self._longitud_total > 0 else 0.0
+        longitudes, borrados = self._longitudes, self._borrados
+        puntuaciones = {}
+        for termino in self._terminos(consulta):
+            mejores = {}
+            for palabra in self._expandir(termino):
+                df = self._df[palabra]
+                escala = math.log(1 + (total - df + 0.5) / (df + 0.5)) * (self.k1 + 1)
+                documentos, frecuencias = self._publicaciones[palabra]
+                for documento, frecuencia in zip(documentos, frecuencias):
+                    puntos = escala * frecuencia / (frecuencia + constante + por_longitud * longitudes[documento])
+                    if puntos > mejores.get(documento, 0.0):
+                        mejores[documento] = puntos
+            for documento, puntos in mejores.items():
+                puntuaciones[documento] = puntuaciones.get(documento, 0.0) + puntos
+        for documento in borrados.intersection(puntuaciones):
+            del puntuaciones[documento]
+        # Selección de los k mejores con un montículo, sin ordenar todos los candidatos
+        mejores = heapq.nlargest(k, puntuaciones.items(), key=itemgetter(1))
+        return [(self._isbns[documento], puntos) for documento, puntos in mejores]
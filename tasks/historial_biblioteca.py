@@ -0,0 +1,252 @@
+"""
+Historial de préstamos de la biblioteca digital y estadísticas de uso.
+
+Cada préstamo y cada devolución se añaden al final de un archivo JSONL que
+nunca se reescribe. Al registrar un préstamo se actualizan también contadores
+por libro, categoría, usuario y mes, así que preguntas como "los 100 libros
+más prestados este año" o "cómo evoluciona una categoría" se responden con
+ellos, sin volver a recorrer el historial. Los meses y años se cuentan en UTC.
+
+Cada evento es una lista JSON:
+    [instante, "p", isbn, id_usuario, categoria]    préstamo
+    [instante, "d", isbn, id_usuario, categoria]    devolución
+La categoría se guarda con el evento para que las estadísticas no dependan
+de que el libro siga en el catálogo.
+"""
+import json
+import os
+import threading
+import time
+from collections import Counter
+
+# Un solo codificador para todos los eventos: json.dumps con opciones crea uno nuevo en cada llamada
+_CODIFICADOR = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def mes_de(instante):
+    """Mes UTC de un instante (segundos desde la época) como "AAAA-MM"."""
+    fecha = time.gmtime(instante)
+    return f"{fecha.tm_year:04d}-{fecha.tm_mon:02d}"
+
+
+class HistorialPrestamos:
+    """
+    Registro append-only de préstamos y devoluciones con contadores incrementales.
+
+    Los contadores se guardan en un resumen (<ruta>.resumen) junto con la
+    posición del historial que cubren; al cargar solo se leen los eventos
+    posteriores a esa posición. El historial se mantiene abierto en modo añadir
+    (hasta llamar a cerrar) y cada escritura se vuelca al sistema de archivos.
+    Sin ruta, el historial no se guarda y solo se llevan los contadores en memoria.
+
+    Atributos:
+        archivo: Ruta del historial (<ruta>.historial), o None
+        archivo_resumen: Ruta del resumen de los contadores, o None
+        por_isbn: Counter ISBN -> préstamos
+        por_categoria: Counter categoría -> préstamos
+        por_usuario: Counter ID de usuario -> préstamos
+        por_mes: Counter "AAAA-MM" -> préstamos
+        devoluciones: Número de devoluciones registradas
+    """
+
+    def __init__(self, ruta=None):
+        """
+        Inicializa el historial y carga el que ya estuviera guardado.
+
+        Args:
+            ruta: Ruta base de los archivos, sin extensión (None para no guardar nada)
+        """
+        self.archivo = ruta + ".historial" if ruta else None
+        self.archivo_resumen = ruta + ".resumen" if ruta else None
+        self.por_isbn = Counter()
+        self.por_categoria = Counter()
+        self.por_usuario = Counter()
+        self.por_mes = Counter()
+        self.devoluciones = 0
+        self._por_anio_isbn = {}  # Año -> Counter ISBN -> préstamos
+        self._por_mes_categoria = {}  # "AAAA-MM" -> Counter categoría -> préstamos
+        self._posicion = 0  # Bytes del historial ya contados
+        self._salida = None  # Historial abierto en modo añadir, desde la primera escritura
+        self._cerrojo = threading.Lock()  # Contadores y archivo; se toma dentro de las franjas de Biblioteca
+        if ruta:
+            self._cargar_resumen()
+            self._leer_historial()
+
+    # --- Persistencia ---
+
+    def _cargar_resumen(self):
+        """Carga los contadores del resumen si sigue correspondiendo al historial."""
+        if not os.path.exists(self.archivo_resumen):
+            return
+        with open(self.archivo_resumen, "r", encoding="utf-8") as file:
+            resumen = json.load(file)
+        tamano = os.path.getsize(self.archivo) if os.path.exists(self.archivo) else 0
+        if resumen["posicion"] > tamano:
+            print("⚠️ El resumen no corresponde al historial de préstamos, se recalcula.")
+            return
+        self._posicion = resumen["posicion"]
+        self.por_isbn = Counter(dict(resumen["por_isbn"]))
+        self.por_categoria = Counter(dict(resumen["por_categoria"]))
+        self.por_usuario = Counter(dict(resumen["por_usuario"]))
+        self.por_mes = Counter(dict(resumen["por_mes"]))
+        self.devoluciones = resumen["devoluciones"]
+        self._por_anio_isbn = {anio: Counter(dict(pares)) for anio, pares in resumen["por_anio_isbn"]}
+        self._por_mes_categoria = {mes: Counter(dict(pares)) for mes, pares in resumen["por_mes_categoria"]}
+
+    def _leer_historial(self):
+        """Cuenta los eventos posteriores al resumen; una última línea incompleta se elimina del archivo."""
+        if not os.path.exists(self.archivo):
+            return
+        with open(self.archivo, "rb") as file:
+            file.seek(self._posicion)
+            for linea in file:
+                try:
+                    evento = json.loads(linea) if linea.endswith(b"\n") else None
+                except json.JSONDecodeError:
+                    evento = None
+                if evento is None:
+                    print("⚠️ Evento incompleto en el historial de préstamos, se descarta.")
+                    break
+                self._contar(*evento)
+                self._posicion += len(linea)
+        if self._posicion < os.path.getsize(self.archivo):
+            os.truncate(self.archivo, self._posicion)
+
+    def cerrar(self):
+        """Cierra el historial; la siguiente escritura lo vuelve a abrir."""
+        with self._cerrojo:
+            if self._salida is not None:
+                self._salida.close()
+                self._salida = None
+
+    def guardar_resumen(self):
+        """
+        Guarda los contadores para no tener que recorrer el historial entero al cargar.
+
+        Los contadores se guardan como listas de pares [clave, n] y no como
+        objetos JSON, cuyas claves siempre son cadenas: un ISBN o un ID de
+        usuario numérico volvería como texto y se contaría aparte del original.
+        """
+        if self.archivo_resumen is None:
+            return
+        with self._cerrojo:
+            resumen = {
+                "posicion": self._posicion,
+                "por_isbn": list(self.por_isbn.items()),
+                "por_categoria": list(self.por_categoria.items()),
+                "por_usuario": list(self.por_usuario.items()),
+                "por_mes": list(self.por_mes.items()),
+                "devoluciones": self.devoluciones,
+                "por_anio_isbn": [[anio, list(c.items())] for anio, c in self._por_anio_isbn.items()],
+                "por_mes_categoria": [[mes, list(c.items())] for mes, c in self._por_mes_categoria.items()],
+            }
+            temporal = self.archivo_resumen + ".tmp"
+            with open(temporal, "w", encoding="utf-8") as file:
+                file.write(json.dumps(resumen, ensure_ascii=False, separators=(",", ":")))
+            os.replace(temporal, self.archivo_resumen)
+
+    # --- Escritura ---
+
+    def registrar(self, eventos):
+        """
+        Añade eventos al historial y actualiza los contadores.
+
+        Args:
+            eventos: Lista de eventos [instante, tipo, isbn, id_usuario, categoria]
+                (ver el formato al inicio del módulo)
+        """
+        lineas = "".join(_CODIFICADOR.encode(e) + "\n" for e in eventos)
+        with self._cerrojo:
+            if self.archivo is not None:
+                if self._salida is None:
+                    self._salida = open(self.archivo, "ab")
+                self._salida.write(lineas.encode("utf-8"))
+                self._salida.flush()
+                self._posicion = self._salida.tell()
+            for evento in eventos:
+                self._contar(*evento)
+
+    def _contar(self, instante, tipo, isbn, id_usuario, categoria):
+        """Actualiza los contadores con un evento."""
+        if tipo != "p":
+            self.devoluciones += 1
+            return
+        mes = mes_de(instante)
+        self.por_isbn[isbn] += 1
+        self.por_categoria[categoria] += 1
+        self.por_usuario[id_usuario] += 1
+        self.por_mes[mes] += 1
+        self._por_anio_isbn.setdefault(int(mes[:4]), Counter())[isbn] += 1
+        self._por_mes_categoria.setdefault(mes, Counter())[categoria] += 1
+
+    # --- Consultas ---
+
+    def eventos(self):
+        """
+        Recorre el historial guardado, del evento más antiguo al más reciente.
+
+        Returns:
+            generator: Eventos [instante, tipo, isbn, id_usuario, categoria] (ninguno si no hay archivo)
+        """
+        if self.archivo is None or not os.path.exists(self.archivo):
+            return
+        with open(self.archivo, "rb") as file:
+            for linea in file:
+                if linea.endswith(b"\n"):
+                    yield json.loads(linea)
+
+    def mas_prestados(self, n=100, anio=None):
+        """
+        Libros más prestados.
+
+        Args:
+            n: Número de libros
+            anio: Año UTC (p. ej. 2026); por defecto, todo el historial
+
+        Returns:
+            list: Tuplas (isbn, préstamos) de más a menos prestado
+        """
+        with self._cerrojo:
+            contador = self.por_isbn if anio is None else self._por_anio_isbn.get(anio, Counter())
+            return contador.most_common(n)
+
+    def categorias_mas_prestadas(self, n=10, mes=None):
+        """
+        Categorías con más préstamos.
+
+        Args:
+            n: Número de categorías
+            mes: Mes "AAAA-MM"; por defecto, todo el historial
+
+        Returns:
+            list: Tuplas (categoria, préstamos) de más a menos prestada
+        """
+        with self._cerrojo:
+            contador = self.por_categoria if mes is None else self._por_mes_categoria.get(mes, Counter())
+            return contador.most_common(n)
+
+    def usuarios_mas_activos(self, n=10):
+        """
+        Usuarios con más préstamos.
+
+        Args:
+            n: Número de usuarios
+
+        Returns:
+            list: Tuplas (id_usuario, préstamos) de más a menos préstamos
+        """
+        with self._cerrojo:
+            return self.por_usuario.most_common(n)
+
+    def tendencia_categoria(self, categoria):
+        """
+        Préstamos de una categoría mes a mes.
+
+        Args:
+            categoria: Categoría, tal como está en los libros
+
+        Returns:
+            list: Tuplas ("AAAA-MM", préstamos) de todos los meses con préstamos, en orden
+        """
+        with self._cerrojo:
+            return [(mes, self._por_mes_categoria[mes][categoria]) for mes in sorted(self.por_mes)]
@@ -0,0 +1,275 @@
+"""
+Ingesta masiva del catálogo de la biblioteca digital.
+
+Lee registros de libros desde CSV, JSONL o MARC en texto (formato .mrk),
+valida y deduplica los ISBN por lotes y añade cada lote a la biblioteca con
+Biblioteca.añadir_libros. La lectura y la validación se hacen sin cerrojos:
+solo la incorporación de cada lote detiene un momento los préstamos y las búsquedas.
+
+Uso:
+    python ingesta_biblioteca.py catalogo.csv [--formato csv|jsonl|mrk] [--almacen ruta]
+"""
+import argparse
+import csv
+import json
+import os
+import re
+import time
+from collections import namedtuple
+from itertools import islice
+
+from persistencia_biblioteca import AlmacenArchivos
+from sistema_biblioteca import Biblioteca, Libro
+
+CAMPOS = ("isbn", "titulo", "autor", "categoria")
+CATEGORIA_POR_DEFECTO = "Sin categoría"
+# Solo dígitos ASCII: isdigit() también acepta "²", "٨" o dígitos de ancho completo
+_FORMA_ISBN = re.compile(r"[0-9]{13}|[0-9]{9}[0-9X]")
+
+
+def normalizar_isbn(isbn):
+    """
+    Valida un ISBN-10 o ISBN-13 y lo reduce a sus dígitos.
+
+    Args:
+        isbn: ISBN con o sin guiones ni espacios ("978-0307474728")
+
+    Returns:
+        str: Dígitos del ISBN ("9780307474728"), o None si no es válido
+    """
+    digitos = isbn.replace("-", "").replace(" ", "").upper()
+    if not _FORMA_ISBN.fullmatch(digitos):
+        return None
+    if len(digitos) == 13:
+        # Pesos 1 y 3 alternos: la suma debe ser múltiplo de 10. Se suman los códigos
+        # ASCII; el desplazamiento ("0" = 48) suma 48 * (7 + 3 * 6) = 1200, múltiplo de 10
+        codigos = digitos.encode("ascii")
+        suma = sum(codigos[0::2]) + 3 * sum(codigos[1::2])
+        return digitos if suma % 10 == 0 else None
+    # Pesos 10 a 1, con X = 10 en el dígito de control: la suma debe ser múltiplo de 11
+    valores = [int(d) for d in digitos[:9]] + [10 if digitos[9] == "X" else int(digitos[9])]
+    suma = sum(peso * valor for peso, valor in zip(range(10, 0, -1), valores))
+    return digitos if suma % 11 == 0 else None
+
+
+def leer_csv(archivo):
+    """
+    Lee registros de un CSV con encabezado isbn,titulo,autor,categoria (y, opcionalmente, ejemplares).
+
+    Args:
+        archivo: Archivo de texto abierto
+
+    Returns:
+        generator: Diccionarios con los campos de cada libro
+    """
+    return csv.DictReader(archivo)
+
+
+def leer_jsonl(archivo):
+    """
+    Lee registros JSONL, un objeto {"isbn", "titulo", "autor", "categoria"} por línea.
+
+    Args:
+        archivo: Archivo de texto abierto
+
+    Returns:
+        generator: Diccionarios con los campos de cada libro (None si la línea no es JSON válido)
+    """
+    for linea in archivo:
+        if linea.strip():
+            try:
+                yield json.loads(linea)
+            except json.JSONDecodeError:
+                yield None
+
+
+def _subcampo(valor, codigo="a"):
+    """Texto de un subcampo MARC ($a por defecto) sin la puntuación final de catalogación."""
+    for parte in valor.split("$")[1:]:
+        if parte[:1] == codigo:
+            return parte[1:].strip().rstrip(" /:;,.").strip()
+    return ""
+
+
+def leer_marc(archivo):
+    """
+    Lee registros MARC en texto (formato .mrk): una línea "=TAG  indicadores$a..." por
+    campo y una línea en blanco entre registros.
+
+    Se usan los campos 020 (ISBN), 100 (autor, "Apellido, Nombre" se invierte),
+    245 (título) y el primer 650 (materia, como categoría).
+
+    Args:
+        archivo: Archivo de texto abierto
+
+    Returns:
+        generator: Diccionarios con los campos de cada libro
+    """
+    registro = {}
+    for linea in archivo:
+        linea = linea.rstrip("\n")
+        if not linea.strip():
+            if registro:
+                yield registro
+                registro = {}
+            continue
+        etiqueta, valor = linea[1:4], linea[6:]
+        if etiqueta == "020" and "isbn" not in registro:
+            # "$a9780307474728 (rústica)": el ISBN es la primera palabra
+            registro["isbn"] = (_subcampo(valor).split() or [""])[0]
+        elif etiqueta == "100":
+            apellidos, _, nombre = _subcampo(valor).partition(", ")
+            registro["autor"] = f"{nombre} {apellidos}" if nombre else apellidos
+        elif etiqueta == "245":
+            registro["titulo"] = _subcampo(valor)
+        elif etiqueta == "650" and "categoria" not in registro:
+            registro["categoria"] = _subcampo(valor)
+    if registro:
+        yield registro
+
+
+FORMATOS = {"csv": leer_csv, "jsonl": leer_jsonl, "mrk": leer_marc}
+
+
+class ResumenIngesta(namedtuple("ResumenIngesta", ["leidos", "añadidos", "duplicados", "invalidos", "segundos"])):
+    """Contadores de una ingesta; duplicados incluye los ISBN que ya estaban en la biblioteca."""
+
+    @property
+    def por_segundo(self):
+        """Registros leídos por segundo."""
+        return self.leidos / self.segundos if self.segundos else 0.0
+
+    def __str__(self):
+        return (f"{self.leidos:,} registros en {self.segundos:.2f} s ({self.por_segundo:,.0f} registros/s): "
+                f"{self.añadidos:,} añadidos, {self.duplicados:,} duplicados, {self.invalidos:,} inválidos")
+
+
+def validar_lote(registros, vistos):
+    """
+    Valida un lote de registros y descarta los ISBN repetidos.
+
+    Args:
+        registros: Lista de diccionarios con isbn, titulo, autor, categoria y, opcionalmente,
+            ejemplares (1 si falta)
+        vistos: Conjunto de ISBN normalizados ya aceptados; se amplía con los del lote
+
+    Returns:
+        tuple: (libros válidos y nuevos, número de duplicados, número de inválidos)
+    """
+    libros = []
+    duplicados = invalidos = 0
+    for registro in registros:
+        try:
+            isbn = registro["isbn"].strip()
+            titulo = registro["titulo"].strip()
+            autor = registro["autor"].strip()
+            categoria = (registro.get("categoria") or "").strip() or CATEGORIA_POR_DEFECTO
+            ejemplares = int(registro.get("ejemplares") or 1)
+            clave = normalizar_isbn(isbn)
+        except (AttributeError, KeyError, TypeError, ValueError):
+            invalidos += 1
+            continue
+        if clave is None or not titulo or not autor or ejemplares < 1:
+            invalidos += 1
+        elif clave in vistos:
+            duplicados += 1
+        else:
+            vistos.add(clave)
+            libros.append(Libro(titulo, autor, categoria, isbn, ejemplares))
+    return libros, duplicados, invalidos
+
+
+def ingerir(biblioteca, registros, tamano_lote=50000, informar=None):
+    """
+    Añade a la biblioteca un flujo de registros, validándolos por lotes.
+
+    Se admite el primer registro de cada ISBN (comparando solo sus dígitos, así
+    que "978-0307474728" y "9780307474728" son el mismo libro); los siguientes y
+    los que ya estaban en la biblioteca cuentan como duplicados. El flujo se
+    consume por lotes, sin cargarlo entero en memoria. Cada lote se lee y se
+    valida fuera de los cerrojos de la biblioteca y se incorpora con
+    Biblioteca.añadir_libros, que solo toma todas las franjas para añadirlo; con
+    un almacén, cada lote se guarda como un solo registro de cambios y al terminar
+    se compacta, para no tener que reproducir todo el catálogo en cada arranque.
+
+    Args:
+        biblioteca: Biblioteca destino
+        registros: Iterable de diccionarios con isbn, titulo, autor y categoria
+        tamano_lote: Registros que se validan y se añaden de una vez
+        informar: Función opcional que recibe un ResumenIngesta parcial tras cada lote
+
+    Returns:
+        ResumenIngesta: Contadores y duración de la ingesta
+    """
+    inicio = time.perf_counter()
+    with biblioteca.cerrojos.lectura():
+        existentes = list(biblioteca.libros)
+    vistos = {clave for clave in map(normalizar_isbn, existentes) if clave is not None}
+    leidos = añadidos = duplicados = invalidos = 0
+
+    def resumen():
+        return ResumenIngesta(leidos, añadidos, duplicados, invalidos, time.perf_counter() - inicio)
+
+    registros_pendientes = iter(registros)
+    while True:
+        lote = list(islice(registros_pendientes, tamano_lote))
+        if not lote:
+            break
+        libros, duplicados_lote, invalidos_lote = validar_lote(lote, vistos)
+        añadidos_lote = biblioteca.añadir_libros(libros, instantanea=False)
+        leidos += len(lote)
+        añadidos += añadidos_lote
+        # Un ISBN con otro formato que ya estaba en la biblioteca no se añade: también es duplicado
+        duplicados += duplicados_lote + len(libros) - añadidos_lote
+        invalidos += invalidos_lote
+        if informar is not None:
+            informar(resumen())
+    if añadidos and biblioteca.almacen is not None:
+        # Cada lote es un solo registro, así que el límite del almacén (que cuenta registros)
+        # no llegaría a pedir la compactación aunque el registro tenga millones de libros
+        biblioteca.compactar()
+    return resumen()
+
+
+def abrir_registros(ruta, formato=None):
+    """
+    Abre un archivo de catálogo y devuelve sus registros.
+
+    Args:
+        ruta: Ruta del archivo
+        formato: "csv", "jsonl" o "mrk" (por defecto, según la extensión)
+
+    Returns:
+        generator: Diccionarios con los campos de cada libro
+    """
+    formato = formato or os.path.splitext(ruta)[1].lstrip(".").lower()
+    # El formato se comprueba al llamar, no al empezar a recorrer los registros
+    if formato not in FORMATOS:
+        raise ValueError(f"❌ Formato de catálogo no soportado: {formato!r} (use {', '.join(FORMATOS)})")
+    return _leer_archivo(ruta, FORMATOS[formato])
+
+
+def _leer_archivo(ruta, lector):
+    """Abre el archivo y devuelve los registros de su lector; el archivo se cierra al terminar."""
+    with open(ruta, "r", encoding="utf-8", newline="") as archivo:
+        yield from lector(archivo)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingesta masiva de un catálogo en la biblioteca")
+    parser.add_argument("catalogo", help="Archivo CSV, JSONL o MARC en texto (.mrk)")
+    parser.add_argument("--formato", choices=sorted(FORMATOS), help="Por defecto, según la extensión")
+    parser.add_argument("--almacen", help="Ruta base del almacén de la biblioteca (sin extensión)")
+    parser.add_argument("--lote", type=int, default=50000, help="Registros validados por lote")
+    argumentos = parser.parse_args()
+
+    biblioteca = Biblioteca(AlmacenArchivos(argumentos.almacen) if argumentos.almacen else None)
+    resumen = ingerir(biblioteca, abrir_registros(argumentos.catalogo, argumentos.formato),
+                      tamano_lote=argumentos.lote,
+                      informar=lambda parcial: print(f"📥 {parcial}"))
+    print(f"✅ {resumen}")
+    print(f"📚 La biblioteca tiene {len(biblioteca.libros):,} libros")
+
+
+if __name__ == "__main__":
+    main()
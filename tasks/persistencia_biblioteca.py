@@ -0,0 +1,208 @@
+"""
+Capa de persistencia de la biblioteca digital.
+
+La biblioteca habla con un almacén a través de tres operaciones (cargar,
+registrar y escribir_instantanea), así que se puede cambiar el medio de
+guardado sin tocar Biblioteca. AlmacenArchivos guarda una instantánea
+completa más un registro de cambios incremental.
+
+Los registros de cambios son listas JSON con el estado actual de una entidad:
+    ["l", isbn, titulo, autor, categoria, ejemplares]
+                                            libro añadido o modificado
+    ["-l", isbn]                            libro quitado
+    ["L", [[isbn, titulo, autor, categoria, ejemplares], ...]]
+                                            libros añadidos de una vez (ingesta por lotes)
+    ["u", id_usuario, nombre]               usuario registrado
+    ["-u", id_usuario]                      usuario dado de baja
+    ["p", isbn, id_usuario, ejemplar, vence]
+                                            préstamo activo (vence en segundos desde la época)
+    ["-p", isbn, id_usuario]                préstamo terminado
+    ["r", isbn, [id_usuario, ...]]          cola de reservas del libro
+    ["-r", isbn]                            cola de reservas vacía
+Como cada registro es el estado final y no una diferencia, volver a aplicar
+un registro es inofensivo.
+"""
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+
+# Un solo codificador para todos los registros: json.dumps con opciones crea uno nuevo en cada llamada
+_CODIFICADOR = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def aplicar_registro(datos, registro):
+    """
+    Aplica un registro de cambios a los datos cargados.
+
+    Args:
+        datos: Diccionario con "libros" {isbn: [isbn, titulo, autor, categoria, ejemplares]},
+            "usuarios" {id: nombre}, "prestamos" {(isbn, id_usuario): [ejemplar, vence]}
+            y "reservas" {isbn: [id_usuario, ...]}
+        registro: Lista con el tipo de cambio seguido de sus valores
+    """
+    tipo = registro[0]
+    if tipo == "l":
+        datos["libros"][registro[1]] = registro[1:6]
+    elif tipo == "L":
+        libros = datos["libros"]
+        for fila in registro[1]:
+            libros[fila[0]] = fila
+    elif tipo == "-l":
+        datos["libros"].pop(registro[1], None)
+    elif tipo == "u":
+        datos["usuarios"][registro[1]] = registro[2]
+    elif tipo == "-u":
+        datos["usuarios"].pop(registro[1], None)
+    elif tipo == "p":
+        datos["prestamos"][(registro[1], registro[2])] = registro[3:5]
+    elif tipo == "-p":
+        datos["prestamos"].pop((registro[1], registro[2]), None)
+    elif tipo == "r":
+        datos["reservas"][registro[1]] = registro[2]
+    elif tipo == "-r":
+        datos["reservas"].pop(registro[1], None)
+    else:
+        raise ValueError(f"Registro de cambios desconocido: {tipo!r}")
+
+
+class AlmacenBiblioteca(ABC):
+    """
+    Interfaz de los almacenes de la biblioteca.
+
+    Una implementación debe poder devolver el estado guardado, añadir
+    registros de cambios y reemplazar todo por una instantánea nueva; si le
+    falta alguna de las tres operaciones, falla al crearla y no a mitad de un guardado.
+    registrar puede llamarse desde varios hilos a la vez (nunca con registros
+    de la misma entidad): cada implementación decide cómo ordenarlos.
+    """
+
+    @abstractmethod
+    def cargar(self):
+        """
+        Lee el estado guardado.
+
+        Returns:
+            dict: "libros" {isbn: [isbn, titulo, autor, categoria, ejemplares]}, "usuarios" {id: nombre},
+                "prestamos" {(isbn, id_usuario): [ejemplar, vence]} y "reservas" {isbn: [id_usuario, ...]}
+        """
+
+    @abstractmethod
+    def registrar(self, registros):
+        """
+        Guarda registros de cambios.
+
+        Args:
+            registros: Lista de registros (ver el formato al inicio del módulo)
+        """
+
+    @abstractmethod
+    def escribir_instantanea(self, datos):
+        """
+        Reemplaza lo guardado por una instantánea completa y descarta los registros anteriores.
+
+        Args:
+            datos: Diccionario con listas "libros", "usuarios", "prestamos" y "reservas" de filas
+        """
+
+    def necesita_compactar(self):
+        """
+        Indica si conviene escribir una instantánea nueva.
+
+        Returns:
+            bool: True si el registro de cambios creció demasiado
+        """
+        return False
+
+
+class AlmacenArchivos(AlmacenBiblioteca):
+    """
+    Almacén en dos archivos: instantánea JSON (<ruta>.json) y registro de cambios (<ruta>.log).
+
+    La instantánea guarda cada tipo de entidad como una lista de filas, que
+    json.load decodifica en una sola llamada. El registro se abre en modo
+    añadir y recibe una línea por entidad modificada.
+
+    Atributos:
+        archivo: Ruta de la instantánea
+        archivo_registro: Ruta del registro de cambios
+        limite_registro: Registros acumulados antes de pedir una compactación
+    """
+
+    def __init__(self, ruta="biblioteca", limite_registro=100000):
+        """
+        Inicializa el almacén.
+
+        Args:
+            ruta: Ruta base de los archivos, sin extensión
+            limite_registro: Registros acumulados antes de pedir una compactación
+        """
+        self.archivo = ruta + ".json"
+        self.archivo_registro = ruta + ".log"
+        self.limite_registro = limite_registro
+        self._registros = 0
+        self._cerrojo = threading.Lock()  # Un solo hilo escribe en los archivos a la vez
+
+    def cargar(self):
+        datos = {"libros": {}, "usuarios": {}, "prestamos": {}, "reservas": {}}
+        if os.path.exists(self.archivo):
+            with open(self.archivo, "r", encoding="utf-8") as file:
+                instantanea = json.load(file)
+            datos["libros"] = {fila[0]: fila for fila in instantanea["libros"]}
+            datos["usuarios"] = dict(instantanea["usuarios"])
+            datos["prestamos"] = {(fila[0], fila[1]): fila[2:] for fila in instantanea["prestamos"]}
+            datos["reservas"] = dict(instantanea["reservas"])
+        if os.path.exists(self.archivo_registro):
+            self._registros = self._leer_registro(datos)
+        return datos
+
+    def _leer_registro(self, datos):
+        """
+        Aplica el registro de cambios; una última línea incompleta se elimina del archivo.
+
+        Returns:
+            int: Número de registros aplicados
+        """
+        aplicados = 0
+        posicion = 0
+        with open(self.archivo_registro, "rb") as file:
+            for linea in file:
+                try:
+                    registro = json.loads(linea) if linea.endswith(b"\n") else None
+                except json.JSONDecodeError:
+                    registro = None
+                if registro is None:
+                    print("⚠️ Registro incompleto en el registro de cambios, se descarta.")
+                    break
+                aplicar_registro(datos, registro)
+                aplicados += 1
+                posicion += len(linea)
+        if posicion < os.path.getsize(self.archivo_registro):
+            os.truncate(self.archivo_registro, posicion)
+        return aplicados
+
+    def registrar(self, registros):
+        lineas = "".join(_CODIFICADOR.encode(r) + "\n" for r in registros)
+        with self._cerrojo:
+            with open(self.archivo_registro, "ab") as file:
+                file.write(lineas.encode("utf-8"))
+            self._registros += len(registros)
+
+    def escribir_instantanea(self, datos):
+        with self._cerrojo:
+            self._escribir_instantanea(datos)
+
+    def _escribir_instantanea(self, datos):
+        temporal = self.archivo + ".tmp"
+        with open(temporal, "w", encoding="utf-8") as file:
+            # json.dumps usa el codificador en C; json.dump escribiría por fragmentos en Python
+            file.write(json.dumps(datos, ensure_ascii=False, separators=(",", ":")))
+        os.replace(temporal, self.archivo)
+        # Si el proceso se detiene aquí, el registro se vuelve a aplicar sobre la
+        # instantánea nueva sin cambiar nada
+        if os.path.exists(self.archivo_registro):
+            os.remove(self.archivo_registro)
+        self._registros = 0
+
+    def necesita_compactar(self):
+        return self._registros >= self.limite_registro
@@ -5,19 +5,43 @@ Sistema de Gestión de Biblioteca Digital
 Este módulo implementa un sistema para gestionar una biblioteca digital,
 permitiendo administrar libros, usuarios y préstamos.
 """
+import heapq
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from functools import wraps
+
+from busqueda_biblioteca import MotorBusqueda, normalizar, tokenizar
+from cerrojos_biblioteca import CerrojosPorFranjas
+from historial_biblioteca import HistorialPrestamos
+from persistencia_biblioteca import AlmacenArchivos
 
 class Libro:
     """
-    Representa un libro en la biblioteca digital.
+    Representa un libro en la biblioteca digital, con uno o varios ejemplares.
     
     Atributos:
-        _info: Tupla con (título, autor) - datos inmutables del libro
+        _titulo: Título del libro (solo lectura a través de titulo)
+        _autor: Autor del libro (solo lectura a través de autor)
         categoria: Categoría del libro
         isbn: ISBN único del libro
-        disponible: Estado de disponibilidad del libro
+        _prestatarios: Con un solo ejemplar, el ID del usuario que lo tiene o None;
+            con varios, una lista con ese estado para cada ejemplar
+        _libres: Pila con los números de los ejemplares libres, o None si hay un solo ejemplar
+
+    Los ejemplares se numeran desde 0. La pila de libres permite prestar y
+    devolver un ejemplar en O(1), y su longitud es el contador de disponibles.
+    La mayoría de los libros tienen un solo ejemplar, así que solo se crean las
+    listas cuando se añade el segundo; __slots__ evita además un diccionario por libro.
+    Al entrar en una Biblioteca, el autor y la categoría pasan a ser las cadenas
+    que comparten todos los libros del catálogo con el mismo texto.
     """
+
+    __slots__ = ("_titulo", "_autor", "categoria", "isbn", "_prestatarios", "_libres")
     
-    def __init__(self, titulo, autor, categoria, isbn):
+    def __init__(self, titulo, autor, categoria, isbn, ejemplares=1):
         """
         Inicializa un nuevo libro.
 
@@ -26,25 +50,126 @@ class Libro:
             autor: Autor del libro
             categoria: Categoría del libro
             isbn: ISBN único del libro
+            ejemplares: Número de ejemplares del libro
         """
-        self._info = (titulo, autor)  
+        if ejemplares < 1:
+            raise ValueError("❌ Un libro debe tener al menos un ejemplar.")
+        self._titulo = titulo
+        self._autor = autor
         self.categoria = categoria
         self.isbn = isbn
-        self.disponible = True
+        self._prestatarios = None
+        self._libres = None
+        if ejemplares > 1:
+            self._prestatarios = [None] * ejemplares
+            self._libres = list(range(ejemplares - 1, -1, -1))  # El ejemplar 0 se presta primero
     
     @property
     def titulo(self):
         """Obtiene el título del libro."""
-        return self._info[0]
+        return self._titulo
     
     @property
     def autor(self):
         """Obtiene el autor del libro."""
-        return self._info[1]
+        return self._autor
+    
+    @property
+    def ejemplares(self):
+        """Número total de ejemplares."""
+        return 1 if self._libres is None else len(self._prestatarios)
+
+    @property
+    def disponibles(self):
+        """Número de ejemplares libres."""
+        if self._libres is None:
+            return 1 if self._prestatarios is None else 0
+        return len(self._libres)
+
+    @property
+    def disponible(self):
+        """Indica si queda algún ejemplar libre."""
+        if self._libres is None:
+            return self._prestatarios is None
+        return bool(self._libres)
+
+    def prestatario(self, ejemplar):
+        """
+        Obtiene el estado de un ejemplar.
+
+        Args:
+            ejemplar: Número del ejemplar (desde 0)
+
+        Returns:
+            str: ID del usuario que tiene el ejemplar, o None si está libre
+        """
+        if self._libres is None:
+            if ejemplar != 0:
+                raise IndexError(f"❌ El libro no tiene el ejemplar {ejemplar}.")
+            return self._prestatarios
+        return self._prestatarios[ejemplar]
+
+    def prestar_ejemplar(self, id_usuario, ejemplar=None):
+        """
+        Marca un ejemplar libre como prestado.
+
+        Args:
+            id_usuario: ID del usuario que se lleva el ejemplar
+            ejemplar: Ejemplar concreto (p. ej. al restaurar); por defecto, el último liberado
+
+        Returns:
+            int: Número del ejemplar prestado, o None si no hay ejemplares libres
+        """
+        if self._libres is None:
+            if ejemplar is None and self._prestatarios is not None:
+                return None
+            if ejemplar not in (None, 0) or self._prestatarios is not None:
+                raise ValueError(f"❌ El ejemplar {ejemplar} no está libre.")
+            self._prestatarios = id_usuario
+            return 0
+        if ejemplar is None:
+            if not self._libres:
+                return None
+            ejemplar = self._libres.pop()
+        else:
+            self._libres.remove(ejemplar)
+        self._prestatarios[ejemplar] = id_usuario
+        return ejemplar
+
+    def devolver_ejemplar(self, ejemplar):
+        """
+        Marca un ejemplar prestado como libre.
+
+        Args:
+            ejemplar: Número del ejemplar devuelto
+        """
+        if self._libres is None:
+            self._prestatarios = None
+            return
+        self._prestatarios[ejemplar] = None
+        self._libres.append(ejemplar)
+
+    def añadir_ejemplares(self, cantidad):
+        """
+        Añade ejemplares libres al libro.
+
+        Args:
+            cantidad: Número de ejemplares nuevos
+        """
+        if self._libres is None:
+            # El libro pasa de un ejemplar a varios: se crean las listas
+            self._libres = [0] if self._prestatarios is None else []
+            self._prestatarios = [self._prestatarios]
+        total = len(self._prestatarios)
+        self._prestatarios.extend([None] * cantidad)
+        self._libres.extend(range(total + cantidad - 1, total - 1, -1))
     
     def __str__(self):
         """Representación en cadena del libro."""
-        estado = "Disponible" if self.disponible else "Prestado"
+        if self.ejemplares > 1:
+            estado = f"{self.disponibles} de {self.ejemplares} ejemplares disponibles"
+        else:
+            estado = "Disponible" if self.disponible else "Prestado"
         return f"'{self.titulo}' por {self.autor} [{self.categoria}] (ISBN: {self.isbn}) - {estado}"
 
 
@@ -55,8 +180,11 @@ class Usuario:
     Atributos:
         nombre: Nombre del usuario
         id_usuario: ID único del usuario
-        libros_prestados: Lista de libros actualmente prestados al usuario
+        libros_prestados: Diccionario ISBN -> Libro de los libros prestados al usuario,
+            en el orden en que se prestaron
     """
+
+    __slots__ = ("nombre", "id_usuario", "libros_prestados")
     
     def __init__(self, nombre, id_usuario):
         """
@@ -68,7 +196,7 @@ class Usuario:
         """
         self.nombre = nombre
         self.id_usuario = id_usuario
-        self.libros_prestados = []   
+        self.libros_prestados = {}
     
     def prestar_libro(self, libro):
         """
@@ -77,7 +205,7 @@ class Usuario:
         Args:
             libro: Objeto Libro a prestar
         """
-        self.libros_prestados.append(libro)
+        self.libros_prestados[libro.isbn] = libro
     
     def devolver_libro(self, libro):
         """
@@ -89,10 +217,19 @@ class Usuario:
         Returns:
             bool: True si el libro fue devuelto, False si no estaba prestado al usuario
         """
-        if libro in self.libros_prestados:
-            self.libros_prestados.remove(libro)
-            return True
-        return False
+        return self.libros_prestados.pop(libro.isbn, None) is not None
+
+    def tiene_prestado(self, isbn):
+        """
+        Indica si el usuario tiene prestado un libro.
+
+        Args:
+            isbn: ISBN del libro
+
+        Returns:
+            bool: True si el libro está prestado a este usuario
+        """
+        return isbn in self.libros_prestados
     
     def listar_libros_prestados(self):
         """
@@ -101,13 +238,52 @@ class Usuario:
         Returns:
             list: Lista de libros prestados al usuario
         """
-        return self.libros_prestados
+        return list(self.libros_prestados.values())
     
     def __str__(self):
         """Representación en cadena del usuario."""
         return f"Usuario: {self.nombre} (ID: {self.id_usuario}) - Libros prestados: {len(self.libros_prestados)}"
 
 
+def _por_isbn(metodo):
+    """Ejecuta el método con el cerrojo de la franja de su ISBN (primer argumento)."""
+    @wraps(metodo)
+    def envoltura(self, isbn, *args, **kwargs):
+        with self.cerrojos.franja(isbn):
+            resultado = metodo(self, isbn, *args, **kwargs)
+        self._compactar_si_hace_falta()
+        return resultado
+    return envoltura
+
+
+def _exclusivo(metodo):
+    """Ejecuta el método con todas las franjas tomadas (cambios en el catálogo o en los usuarios)."""
+    @wraps(metodo)
+    def envoltura(self, *args, **kwargs):
+        with self.cerrojos.exclusivo():
+            resultado = metodo(self, *args, **kwargs)
+        self._compactar_si_hace_falta()
+        return resultado
+    return envoltura
+
+
+def _lectura(metodo):
+    """Ejecuta el método con el cerrojo de lectura del hilo (excluye solo a los métodos exclusivos)."""
+    @wraps(metodo)
+    def envoltura(self, *args, **kwargs):
+        with self.cerrojos.lectura():
+            return metodo(self, *args, **kwargs)
+    return envoltura
+
+
+class _Pendientes(threading.local):
+    """Entidades modificadas por la operación en curso, separadas por hilo."""
+
+    def __init__(self):
+        self.sucios = {}  # (tipo, clave) -> None
+        self.eventos = []  # Préstamos y devoluciones para el historial
+
+
 class Biblioteca:
     """
     Gestiona la colección de libros, usuarios y préstamos.
@@ -116,14 +292,265 @@ class Biblioteca:
         libros: Diccionario de libros con ISBN como clave
         usuarios: Diccionario de usuarios con ID como clave
         ids_usuarios: Conjunto de IDs de usuario para garantizar unicidad
+        indice_categorias: Índice secundario categoría normalizada -> ISBNs
+        indice_autores: Índice secundario autor normalizado -> ISBNs
+        indice_palabras_autor: Palabra normalizada -> autores normalizados que la contienen
+        motor: Motor de búsqueda de texto completo (BM25) sobre título, autor y categoría
+        prestamos: Préstamos activos (ISBN, ID de usuario) -> número de ejemplar
+        vencimientos: (ISBN, ID de usuario) -> instante (segundos desde la época) en que vence el préstamo
+        reservas: ISBN -> cola FIFO de IDs de usuario que esperan un ejemplar
+        almacen: Almacén donde se guardan los cambios (None = solo en memoria)
+        cerrojos: Cerrojos por franjas de ISBN que hacen atómicas las operaciones
+
+    Los ISBN de cada entrada se guardan como claves de un diccionario para
+    conservar el orden de alta sin necesidad de ordenar los resultados. Los
+    índices de búsqueda se construyen en la primera búsqueda y desde entonces
+    se actualizan en añadir_libro y quitar_libro, por lo que la categoría y el
+    autor de un libro no deben cambiarse mientras está en la biblioteca.
+
+    Un usuario puede tener a la vez un solo ejemplar de cada libro, así que un
+    préstamo se identifica por (ISBN, ID de usuario).
+
+    Los vencimientos se guardan además en un montículo (vence, isbn, id_usuario).
+    Al devolver un libro su entrada queda obsoleta y se descarta cuando se rehace el
+    montículo; los k préstamos vencidos se obtienen recorriendo solo la parte
+    vencida del montículo, en O(k log k), sin mirar el resto de préstamos.
+
+    Con un almacén, cada operación marca como modificadas las entidades que
+    cambia (libro, usuario o préstamo) y al terminar guarda solo esas. Con un
+    historial, los préstamos y devoluciones de cada operación se añaden a él
+    en el mismo momento, y las estadísticas de uso se consultan en
+    biblioteca.historial.
+
+    Es segura entre hilos sin un cerrojo global: préstamos, devoluciones,
+    reservas y altas de ejemplares toman solo la franja de su ISBN, así que
+    los quioscos que atienden libros distintos trabajan en paralelo y dos
+    préstamos del mismo libro nunca se llevan el mismo ejemplar. Los cambios
+    de catálogo y de usuarios toman todas las franjas, y las búsquedas solo
+    la franja de lectura del hilo. El montículo de vencimientos, la
+    construcción de los índices, el almacén y el historial tienen sus propios
+    cerrojos, que se toman dentro de una franja y nunca al revés.
     """
+
+    DIAS_PRESTAMO = 14
     
-    def __init__(self):
-        """Inicializa una nueva biblioteca digital."""
+    def __init__(self, almacen=None, franjas=64, historial=None):
+        """
+        Inicializa una nueva biblioteca digital.
+
+        Args:
+            almacen: Almacén de persistencia (p. ej. AlmacenArchivos); si se indica,
+                la biblioteca se restaura desde él
+            franjas: Número de cerrojos entre los que se reparten los ISBN
+            historial: HistorialPrestamos opcional que registra cada préstamo y devolución
+        """
         self.libros = {}  # Diccionario con ISBN como clave y objeto Libro como valor
         self.usuarios = {}  # Diccionario con ID de usuario como clave y objeto Usuario como valor
         self.ids_usuarios = set()  # Conjunto para asegurar IDs únicos
+        self.indice_categorias = {}  # Categoría normalizada -> {ISBN: None}
+        self.indice_autores = {}  # Autor normalizado -> {ISBN: None}
+        self.indice_palabras_autor = {}  # Palabra -> conjunto de autores normalizados
+        self.motor = MotorBusqueda()
+        self._textos = {}  # Autor o categoría -> [cadena compartida, libros del catálogo que la usan]
+        self.prestamos = {}  # (ISBN, ID de usuario) -> ejemplar de los préstamos activos
+        self.vencimientos = {}  # (ISBN, ID de usuario) -> instante de vencimiento del préstamo
+        self._monticulo_vencimientos = []  # (vence, isbn, id_usuario), con entradas obsoletas
+        self.reservas = {}  # ISBN -> deque de IDs de usuario, en orden de llegada
+        self._indices_listos = False  # Los índices se construyen en la primera búsqueda
+        self.almacen = almacen
+        self.historial = historial
+        self._pendientes = _Pendientes()  # Entidades modificadas sin guardar, por hilo
+        self._compactacion_pendiente = False
+        self.cerrojos = CerrojosPorFranjas(franjas)
+        self._cerrojo_vencimientos = threading.Lock()  # Montículo y diccionario de vencimientos
+        self._cerrojo_indices = threading.Lock()  # Construcción perezosa de los índices
+        if almacen is not None:
+            self._restaurar(almacen.cargar())
+
+    def _restaurar(self, datos):
+        """
+        Crea los libros, usuarios y préstamos a partir de los datos de un almacén.
+
+        Args:
+            datos: Diccionario devuelto por almacen.cargar()
+        """
+        for isbn, titulo, autor, categoria, ejemplares in datos["libros"].values():
+            self.libros[isbn] = libro = Libro(titulo, autor, categoria, isbn, ejemplares)
+            self._compartir_textos(libro)
+        for id_usuario, nombre in datos["usuarios"].items():
+            self.usuarios[id_usuario] = Usuario(nombre, id_usuario)
+        self.ids_usuarios = set(self.usuarios)
+        for (isbn, id_usuario), (ejemplar, vence) in datos["prestamos"].items():
+            libro = self.libros[isbn]
+            libro.prestar_ejemplar(id_usuario, ejemplar)
+            self.usuarios[id_usuario].prestar_libro(libro)
+            self.prestamos[(isbn, id_usuario)] = ejemplar
+            self.vencimientos[(isbn, id_usuario)] = vence
+        self._rehacer_vencimientos()
+        self.reservas = {isbn: deque(ids) for isbn, ids in datos["reservas"].items()}
+
+    def _marcar(self, tipo, clave):
+        """Anota una entidad modificada para guardarla al final de la operación."""
+        if self.almacen is not None:
+            self._pendientes.sucios[(tipo, clave)] = None
+
+    def _anotar_evento(self, tipo, libro, id_usuario, ahora):
+        """Anota un préstamo ("p") o una devolución ("d") para el historial."""
+        if self.historial is not None:
+            ahora = time.time() if ahora is None else ahora
+            self._pendientes.eventos.append([ahora, tipo, libro.isbn, id_usuario, libro.categoria])
+
+    def _registro(self, tipo, clave):
+        """Registro de cambios con el estado actual de una entidad (o su eliminación)."""
+        if tipo == "l":
+            libro = self.libros.get(clave)
+            if libro is None:
+                return ["-l", clave]
+            return ["l", clave, libro.titulo, libro.autor, libro.categoria, libro.ejemplares]
+        if tipo == "u":
+            usuario = self.usuarios.get(clave)
+            return ["-u", clave] if usuario is None else ["u", clave, usuario.nombre]
+        if tipo == "r":
+            cola = self.reservas.get(clave)
+            return ["-r", clave] if not cola else ["r", clave, list(cola)]
+        ejemplar = self.prestamos.get(clave)
+        if ejemplar is None:
+            return ["-p", *clave]
+        return ["p", *clave, ejemplar, self.vencimientos[clave]]
+
+    def _guardar_cambios(self):
+        """
+        Guarda en el almacén las entidades modificadas por el hilo actual y en el
+        historial sus préstamos y devoluciones.
+
+        Se llama con los cerrojos de la operación tomados, así que cada registro
+        refleja el estado de la entidad justo después del cambio. Si el registro
+        de cambios creció demasiado, la compactación se hace al soltar los cerrojos.
+        """
+        eventos = self._pendientes.eventos
+        if eventos:
+            self._pendientes.eventos = []
+            self.historial.registrar(eventos)
+        sucios = self._pendientes.sucios
+        if not sucios:
+            return
+        self._pendientes.sucios = {}
+        self.almacen.registrar([self._registro(tipo, clave) for tipo, clave in sucios])
+        if self.almacen.necesita_compactar():
+            self._compactacion_pendiente = True
+
+    def _compactar_si_hace_falta(self):
+        """Compacta el almacén si alguna operación lo pidió (fuera de cualquier franja)."""
+        if self._compactacion_pendiente:
+            with self.cerrojos.exclusivo():
+                if self._compactacion_pendiente:
+                    self._escribir_instantanea()
+
+    @_exclusivo
+    def compactar(self):
+        """Escribe una instantánea completa en el almacén y descarta el registro de cambios."""
+        self._escribir_instantanea()
+
+    def _escribir_instantanea(self):
+        """Escribe la instantánea; requiere todas las franjas tomadas."""
+        self._compactacion_pendiente = False
+        self.almacen.escribir_instantanea({
+            "libros": [[l.isbn, l.titulo, l.autor, l.categoria, l.ejemplares] for l in self.libros.values()],
+            "usuarios": [[u.id_usuario, u.nombre] for u in self.usuarios.values()],
+            "prestamos": [[isbn, id_usuario, ejemplar, self.vencimientos[(isbn, id_usuario)]]
+                          for (isbn, id_usuario), ejemplar in self.prestamos.items()],
+            "reservas": [[isbn, list(cola)] for isbn, cola in self.reservas.items() if cola],
+        })
+        if self.historial is not None:
+            # Los contadores del historial se guardan a la vez, para no recorrerlo entero al cargar
+            self.historial.guardar_resumen()
+
+    def _asegurar_indices(self):
+        """Construye los índices de búsqueda si todavía no existen."""
+        if not self._indices_listos:
+            # Varios lectores pueden llegar a la vez: solo uno construye
+            with self._cerrojo_indices:
+                if not self._indices_listos:
+                    for libro in self.libros.values():
+                        self._indexar_autor_categoria(libro)
+                    self.motor.agregar_lote(self.libros.values())
+                    self._indices_listos = True
+
+    def _indexar_libro(self, libro):
+        """
+        Añade un libro a los índices secundarios.
+
+        Args:
+            libro: Objeto Libro a indexar
+        """
+        self._indexar_autor_categoria(libro)
+        self.motor.agregar(libro)
+
+    def _compartir_textos(self, libro):
+        """
+        Hace que el libro use las cadenas de autor y categoría compartidas por el catálogo.
+
+        Así todos los libros de un mismo autor o categoría guardan una sola
+        cadena en lugar de la suya propia. Cada texto lleva la cuenta de los
+        libros que lo usan y se olvida al quitar el último (ver _soltar_textos).
+        """
+        libro._autor = self._internar(libro._autor)
+        libro.categoria = self._internar(libro.categoria)
+
+    def _internar(self, texto):
+        """Devuelve la copia compartida de un texto y suma un libro a su cuenta."""
+        entrada = self._textos.get(texto)
+        if entrada is None:
+            entrada = self._textos[texto] = [texto, 0]
+        entrada[1] += 1
+        return entrada[0]
+
+    def _soltar_textos(self, libro):
+        """Resta un libro a la cuenta de su autor y su categoría, olvidando los que ya no usa nadie."""
+        for texto in (libro.autor, libro.categoria):
+            entrada = self._textos[texto]
+            entrada[1] -= 1
+            if not entrada[1]:
+                del self._textos[texto]
+
+    def _indexar_autor_categoria(self, libro):
+        """Añade un libro a los índices de categoría y de autor."""
+        self.indice_categorias.setdefault(normalizar(libro.categoria), {})[libro.isbn] = None
+        autor = normalizar(libro.autor)
+        isbns = self.indice_autores.get(autor)
+        if isbns is None:
+            # Autor nuevo: se registran sus palabras una sola vez para todos sus libros
+            isbns = self.indice_autores[autor] = {}
+            for palabra in tokenizar(libro.autor):
+                self.indice_palabras_autor.setdefault(palabra, set()).add(autor)
+        isbns[libro.isbn] = None
+
+    def _desindexar_libro(self, libro):
+        """
+        Quita un libro de los índices secundarios, borrando las entradas que queden vacías.
+
+        Args:
+            libro: Objeto Libro a quitar de los índices
+        """
+        categoria = normalizar(libro.categoria)
+        isbns = self.indice_categorias[categoria]
+        del isbns[libro.isbn]
+        if not isbns:
+            del self.indice_categorias[categoria]
+
+        autor = normalizar(libro.autor)
+        isbns = self.indice_autores[autor]
+        del isbns[libro.isbn]
+        if not isbns:
+            del self.indice_autores[autor]
+            for palabra in tokenizar(libro.autor):
+                autores = self.indice_palabras_autor[palabra]
+                autores.discard(autor)
+                if not autores:
+                    del self.indice_palabras_autor[palabra]
+        self.motor.quitar(libro)
     
+    @_exclusivo
     def añadir_libro(self, libro):
         """
         Añade un libro a la biblioteca.
@@ -138,8 +565,79 @@ class Biblioteca:
             return False
         
         self.libros[libro.isbn] = libro
+        self._compartir_textos(libro)
+        if self._indices_listos:
+            self._indexar_libro(libro)
+        self._marcar("l", libro.isbn)
+        self._guardar_cambios()
+        return True
+    
+    @_exclusivo
+    def añadir_libros(self, libros, instantanea=True):
+        """
+        Añade muchos libros de una vez, p. ej. en una sincronización del catálogo.
+
+        Los índices de búsqueda no se actualizan libro a libro: si todavía no
+        existen se construirán de una vez en la siguiente búsqueda, y si ya
+        existen los libros nuevos se indexan juntos. Con un almacén, el
+        resultado se guarda como una sola instantánea en lugar de un registro
+        de cambios por libro.
+
+        Toma todas las franjas mientras dura, así que libros debe estar ya leído
+        y validado (una lista): para catálogos grandes, ingesta_biblioteca.ingerir
+        lo llama por lotes con instantanea=False.
+
+        Args:
+            libros: Iterable de objetos Libro
+            instantanea: Si es False, los libros nuevos se guardan como un solo registro
+                de cambios y quien llama decide cuándo compactar
+
+        Returns:
+            int: Número de libros añadidos; los ISBN que ya existían se omiten
+        """
+        añadir = self.libros.setdefault
+        nuevos = [libro for libro in libros if añadir(libro.isbn, libro) is libro]
+        for libro in nuevos:
+            self._compartir_textos(libro)
+        if nuevos:
+            if self._indices_listos:
+                for libro in nuevos:
+                    self._indexar_autor_categoria(libro)
+                self.motor.agregar_lote(nuevos)
+            if self.almacen is not None:
+                if instantanea:
+                    self._escribir_instantanea()
+                else:
+                    # Un solo registro con todo el lote: se codifica de una vez, como la instantánea
+                    self.almacen.registrar([["L", [[l.isbn, l.titulo, l.autor, l.categoria, l.ejemplares]
+                                                   for l in nuevos]]])
+        return len(nuevos)
+    
+    @_por_isbn
+    def añadir_ejemplares(self, isbn, cantidad=1, ahora=None):
+        """
+        Añade ejemplares de un libro que ya está en la biblioteca.
+
+        Los ejemplares nuevos se prestan en el acto a las reservas pendientes.
+
+        Args:
+            isbn: ISBN del libro
+            cantidad: Número de ejemplares nuevos
+            ahora: Instante de los préstamos a las reservas (por defecto, el actual)
+
+        Returns:
+            bool: True si se añadieron, False si el libro no existe o la cantidad no es positiva
+        """
+        libro = self.libros.get(isbn)
+        if libro is None or cantidad < 1:
+            return False
+        libro.añadir_ejemplares(cantidad)
+        self._marcar("l", isbn)
+        self._atender_reservas(libro, ahora)
+        self._guardar_cambios()
         return True
     
+    @_exclusivo
     def quitar_libro(self, isbn):
         """
         Quita un libro de la biblioteca.
@@ -148,18 +646,26 @@ class Biblioteca:
             isbn: ISBN del libro a quitar
             
         Returns:
-            bool: True si el libro fue quitado, False si no existía
+            bool: True si el libro fue quitado, False si no existía o tiene ejemplares prestados
         """
         if isbn in self.libros:
-            # Verificar que no esté prestado
+            # Verificar que no tenga ejemplares prestados
             libro = self.libros[isbn]
-            if not libro.disponible:
+            if libro.disponibles < libro.ejemplares:
                 return False
             
             del self.libros[isbn]
+            self._soltar_textos(libro)
+            if self._indices_listos:
+                self._desindexar_libro(libro)
+            self._marcar("l", isbn)
+            if self.reservas.pop(isbn, None) is not None:
+                self._marcar("r", isbn)
+            self._guardar_cambios()
             return True
         return False
     
+    @_exclusivo
     def registrar_usuario(self, usuario):
         """
         Registra un nuevo usuario en la biblioteca.
@@ -175,8 +681,11 @@ class Biblioteca:
         
         self.usuarios[usuario.id_usuario] = usuario
         self.ids_usuarios.add(usuario.id_usuario)
+        self._marcar("u", usuario.id_usuario)
+        self._guardar_cambios()
         return True
     
+    @_exclusivo
     def dar_baja_usuario(self, id_usuario):
         """
         Da de baja a un usuario de la biblioteca.
@@ -195,56 +704,204 @@ class Biblioteca:
             
             del self.usuarios[id_usuario]
             self.ids_usuarios.remove(id_usuario)
+            self._marcar("u", id_usuario)
+            self._guardar_cambios()
             return True
         return False
     
-    def prestar_libro(self, isbn, id_usuario):
+    @_por_isbn
+    def prestar_libro(self, isbn, id_usuario, dias=None, ahora=None):
         """
-        Presta un libro a un usuario.
+        Presta un ejemplar de un libro a un usuario.
 
         Args:
             isbn: ISBN del libro a prestar
             id_usuario: ID del usuario que solicita el préstamo
+            dias: Duración del préstamo en días (por defecto DIAS_PRESTAMO)
+            ahora: Instante del préstamo en segundos desde la época (por defecto, el actual)
             
         Returns:
-            bool: True si el préstamo fue exitoso, False en caso contrario
+            bool: True si el préstamo fue exitoso; False si el libro o el usuario no existen,
+                no quedan ejemplares libres o el usuario ya tiene un ejemplar del libro
         """
         if isbn not in self.libros or id_usuario not in self.usuarios:
             return False
         
         libro = self.libros[isbn]
-        usuario = self.usuarios[id_usuario]
         
-        if not libro.disponible:
+        if not libro.disponible or (isbn, id_usuario) in self.prestamos:
             return False
         
-        libro.disponible = False
-        usuario.prestar_libro(libro)
+        self._prestar(libro, id_usuario, dias, ahora)
+        self._guardar_cambios()
         return True
+
+    def _prestar(self, libro, id_usuario, dias, ahora):
+        """Presta un ejemplar libre a un usuario existente que no tiene otro del mismo libro."""
+        ahora = time.time() if ahora is None else ahora
+        vence = ahora + (self.DIAS_PRESTAMO if dias is None else dias) * 86400
+        clave = (libro.isbn, id_usuario)
+        self.prestamos[clave] = libro.prestar_ejemplar(id_usuario)
+        self._anotar_evento("p", libro, id_usuario, ahora)
+        self.usuarios[id_usuario].prestar_libro(libro)
+        with self._cerrojo_vencimientos:
+            self.vencimientos[clave] = vence
+            heapq.heappush(self._monticulo_vencimientos, (vence, libro.isbn, id_usuario))
+            if len(self._monticulo_vencimientos) > 2 * len(self.vencimientos) + 64:
+                self._rehacer_vencimientos()
+        self._marcar("p", clave)
+
+    def _rehacer_vencimientos(self):
+        """Rehace el montículo de vencimientos en O(n), sin entradas obsoletas (con su cerrojo tomado)."""
+        self._monticulo_vencimientos = [(vence, isbn, id_usuario)
+                                        for (isbn, id_usuario), vence in self.vencimientos.items()]
+        heapq.heapify(self._monticulo_vencimientos)
     
-    def devolver_libro(self, isbn, id_usuario):
+    @_por_isbn
+    def devolver_libro(self, isbn, id_usuario, ahora=None):
         """
-        Registra la devolución de un libro.
+        Registra la devolución de un ejemplar.
+
+        Si el libro tiene reservas, el ejemplar se presta en el acto al primer
+        usuario de la cola que siga dado de alta.
 
         Args:
             isbn: ISBN del libro a devolver
             id_usuario: ID del usuario que devuelve el libro
+            ahora: Instante de la devolución (y del nuevo préstamo, si lo hay)
             
         Returns:
             bool: True si la devolución fue exitosa, False en caso contrario
         """
-        if isbn not in self.libros or id_usuario not in self.usuarios:
+        clave = (isbn, id_usuario)
+        ejemplar = self.prestamos.pop(clave, None)
+        if ejemplar is None:
             return False
         
         libro = self.libros[isbn]
-        usuario = self.usuarios[id_usuario]
-        
-        if libro.disponible or libro not in usuario.libros_prestados:
+        with self._cerrojo_vencimientos:
+            del self.vencimientos[clave]
+        libro.devolver_ejemplar(ejemplar)
+        self.usuarios[id_usuario].devolver_libro(libro)
+        self._marcar("p", clave)
+        self._anotar_evento("d", libro, id_usuario, ahora)
+        self._atender_reservas(libro, ahora)
+        self._guardar_cambios()
+        return True
+
+    def _atender_reservas(self, libro, ahora):
+        """Presta los ejemplares libres de un libro a los primeros usuarios de su cola de reservas."""
+        cola = self.reservas.get(libro.isbn)
+        if not cola or not libro.disponible:
+            return
+        while cola and libro.disponible:
+            siguiente = cola.popleft()
+            # Los usuarios dados de baja se saltan aquí, sin buscarlos al darlos de baja
+            if siguiente in self.usuarios and (libro.isbn, siguiente) not in self.prestamos:
+                self._prestar(libro, siguiente, None, ahora)
+        if not cola:
+            del self.reservas[libro.isbn]
+        self._marcar("r", libro.isbn)
+
+    @_por_isbn
+    def reservar_libro(self, isbn, id_usuario):
+        """
+        Pone a un usuario en la cola de espera de un libro sin ejemplares libres.
+
+        Args:
+            isbn: ISBN del libro a reservar
+            id_usuario: ID del usuario que reserva
+
+        Returns:
+            bool: True si se reservó; False si el libro o el usuario no existen, queda algún
+                ejemplar libre, el usuario ya tiene uno o ya está en la cola
+        """
+        libro = self.libros.get(isbn)
+        if libro is None or id_usuario not in self.usuarios or libro.disponible:
             return False
-        
-        libro.disponible = True
-        return usuario.devolver_libro(libro)
+        if (isbn, id_usuario) in self.prestamos:
+            return False
+        cola = self.reservas.setdefault(isbn, deque())
+        if id_usuario in cola:
+            return False
+        cola.append(id_usuario)
+        self._marcar("r", isbn)
+        self._guardar_cambios()
+        return True
+
+    @_por_isbn
+    def cancelar_reserva(self, isbn, id_usuario):
+        """
+        Quita a un usuario de la cola de espera de un libro.
+
+        Args:
+            isbn: ISBN del libro reservado
+            id_usuario: ID del usuario
+
+        Returns:
+            bool: True si el usuario estaba en la cola
+        """
+        cola = self.reservas.get(isbn)
+        if not cola or id_usuario not in cola:
+            return False
+        cola.remove(id_usuario)
+        if not cola:
+            del self.reservas[isbn]
+        self._marcar("r", isbn)
+        self._guardar_cambios()
+        return True
+
+    def vencimiento(self, isbn, id_usuario):
+        """
+        Obtiene el vencimiento de un préstamo.
+
+        Args:
+            isbn: ISBN del libro
+            id_usuario: ID del usuario que lo tiene prestado
+
+        Returns:
+            float: Instante de vencimiento en segundos desde la época, o None si no hay tal préstamo
+        """
+        return self.vencimientos.get((isbn, id_usuario))
+
+    def prestamos_vencidos(self, ahora=None):
+        """
+        Lista los préstamos vencidos, del que venció antes al más reciente.
+
+        El montículo se recorre desde la raíz sin modificarlo: si una entrada no
+        ha vencido, tampoco sus descendientes, así que solo se visitan las
+        vencidas. Si entre ellas hay más obsoletas (libros devueltos) que
+        válidas, el montículo se rehace para no volver a visitarlas.
+
+        Args:
+            ahora: Instante de referencia (por defecto, el actual)
+
+        Returns:
+            list: Tuplas (libro, usuario, vence)
+        """
+        ahora = time.time() if ahora is None else ahora
+        vencidos = {}  # (ISBN, ID) -> vence; un libro devuelto y vuelto a prestar puede repetir su entrada
+        obsoletas = 0
+        with self._cerrojo_vencimientos:
+            monticulo = self._monticulo_vencimientos
+            tamano = len(monticulo)
+            pendientes = [0] if monticulo and monticulo[0][0] <= ahora else []
+            while pendientes:
+                posicion = pendientes.pop()
+                vence, isbn, id_usuario = monticulo[posicion]
+                if self.vencimientos.get((isbn, id_usuario)) == vence:
+                    vencidos[(isbn, id_usuario)] = vence
+                else:
+                    obsoletas += 1
+                for hijo in (2 * posicion + 1, 2 * posicion + 2):
+                    if hijo < tamano and monticulo[hijo][0] <= ahora:
+                        pendientes.append(hijo)
+            if obsoletas > len(vencidos) + 64:
+                self._rehacer_vencimientos()
+            return [(self.libros[isbn], self.usuarios[id_usuario], vence)
+                    for vence, isbn, id_usuario in sorted((vence, *clave) for clave, vence in vencidos.items())]
     
+    @_lectura
     def buscar_por_titulo(self, titulo):
         """
         Busca libros por título.
@@ -259,33 +916,78 @@ class Biblioteca:
         return [libro for libro in self.libros.values() 
                 if titulo in libro.titulo.lower()]
     
+    @_por_isbn
+    def prestatarios(self, isbn):
+        """
+        Obtiene los usuarios que tienen prestado algún ejemplar de un libro.
+
+        Args:
+            isbn: ISBN del libro
+
+        Returns:
+            list: Usuarios en orden de número de ejemplar (vacía si el libro no existe o no está prestado)
+        """
+        libro = self.libros.get(isbn)
+        if libro is None:
+            return []
+        return [self.usuarios[libro.prestatario(ejemplar)] for ejemplar in range(libro.ejemplares)
+                if libro.prestatario(ejemplar) is not None]
+
+    @_lectura
+    def buscar(self, consulta, k=10):
+        """
+        Búsqueda de texto completo en título, autor y categoría, ordenada por relevancia.
+
+        No distingue mayúsculas ni tildes; una palabra terminada en "*" se busca
+        como prefijo.
+
+        Args:
+            consulta: Texto de búsqueda, p. ej. "garcia marquez" o "princ*"
+            k: Número máximo de resultados
+
+        Returns:
+            list: Tuplas (libro, puntuación) de la más relevante a la menos relevante
+        """
+        self._asegurar_indices()
+        return [(self.libros[isbn], puntos) for isbn, puntos in self.motor.buscar(consulta, k)]
+
+    @_lectura
     def buscar_por_autor(self, autor):
         """
-        Busca libros por autor.
+        Busca libros por autor usando el índice de palabras del autor.
+
+        Se devuelven los libros cuyo autor contiene todas las palabras buscadas,
+        sin distinguir mayúsculas ni tildes ("garcia marquez" encuentra a
+        "Gabriel García Márquez"). La intersección se hace sobre los autores
+        distintos, no sobre los libros, y luego se reúnen los libros de cada autor.
 
         Args:
-            autor: Nombre o parte del nombre del autor a buscar
+            autor: Nombre, apellido o varias palabras del nombre del autor
             
         Returns:
-            list: Lista de libros que coinciden con la búsqueda
+            list: Lista de libros que coinciden con la búsqueda, agrupados por autor
         """
-        autor = autor.lower()
-        return [libro for libro in self.libros.values() 
-                if autor in libro.autor.lower()]
+        self._asegurar_indices()
+        palabras = set(tokenizar(autor))
+        if not palabras:
+            return []
+        conjuntos = sorted((self.indice_palabras_autor.get(palabra, set()) for palabra in palabras), key=len)
+        autores = conjuntos[0].intersection(*conjuntos[1:])
+        return [self.libros[isbn] for autor in sorted(autores) for isbn in self.indice_autores[autor]]
     
+    @_lectura
     def buscar_por_categoria(self, categoria):
         """
-        Busca libros por categoría.
+        Busca libros por categoría usando el índice de categorías.
 
         Args:
-            categoria: Categoría a buscar
+            categoria: Categoría a buscar (sin distinguir mayúsculas ni tildes)
             
         Returns:
-            list: Lista de libros que coinciden con la búsqueda
+            list: Lista de libros de la categoría, en el orden en que se añadieron
         """
-        categoria = categoria.lower()
-        return [libro for libro in self.libros.values() 
-                if categoria == libro.categoria.lower()]
+        self._asegurar_indices()
+        return [self.libros[isbn] for isbn in self.indice_categorias.get(normalizar(categoria), ())]
     
     def listar_libros_usuario(self, id_usuario):
         """
@@ -309,7 +1011,9 @@ def probar_sistema():
     Función para probar el sistema de gestión de biblioteca digital.
     """
     
-    biblioteca = Biblioteca()
+    carpeta = tempfile.TemporaryDirectory()
+    ruta = os.path.join(carpeta.name, "biblioteca")
+    biblioteca = Biblioteca(AlmacenArchivos(ruta), historial=HistorialPrestamos(ruta))
     
     # Crear algunos libros
     libro1 = Libro("Cien años de soledad", "Gabriel García Márquez", "Ficción", "978-0307474728")
@@ -353,6 +1057,16 @@ def probar_sistema():
     biblioteca.prestar_libro("978-0307474001", "U001")  # El código Da Vinci a Ana
     biblioteca.prestar_libro("978-0590353427", "U002")  # Harry Potter a Juan
     
+    # Un libro de texto con varios ejemplares bajo un mismo ISBN
+    print("\n=== Libro de texto con 3 ejemplares ===")
+    libro6 = Libro("Programación orientada a objetos", "Bertrand Meyer", "Ciencia", "978-0136291553", ejemplares=3)
+    biblioteca.añadir_libro(libro6)
+    biblioteca.prestar_libro("978-0136291553", "U002")
+    biblioteca.prestar_libro("978-0136291553", "U003")
+    print(libro6)
+    biblioteca.añadir_ejemplares("978-0136291553", 2)
+    print(libro6)
+    
     # Listar libros prestados por usuario
     print("\n=== Libros prestados por Ana (U001) ===")
     libros_ana = biblioteca.listar_libros_usuario("U001")
@@ -377,10 +1091,26 @@ def probar_sistema():
     for libro in libros_harry:
         print(libro)
     
+    # Búsqueda de texto completo, sin tildes y con prefijos
+    print("\n=== Búsqueda de texto completo: 'marquez soled*' ===")
+    for libro, puntuacion in biblioteca.buscar("marquez soled*", k=3):
+        print(f"{puntuacion:.2f} {libro}")
+    
+    # Reservar un libro prestado
+    print("\n=== María reserva 'Cien años de soledad' ===")
+    if biblioteca.reservar_libro("978-0307474728", "U003"):
+        print("Reserva registrada: María es la primera de la cola")
+    
+    # Préstamos que vencerán si no se devuelven en 15 días
+    print("\n=== Préstamos vencidos dentro de 15 días ===")
+    for libro, usuario, vence in biblioteca.prestamos_vencidos(time.time() + 15 * 86400):
+        print(f"{libro.titulo} - {usuario.nombre} (vence el {time.strftime('%Y-%m-%d', time.localtime(vence))})")
+    
     # Devolver un libro
     print("\n=== Devolviendo un libro ===")
     if biblioteca.devolver_libro("978-0307474728", "U001"):
         print("Libro 'Cien años de soledad' devuelto correctamente")
+        print(f"Prestado automáticamente a la primera reserva: {biblioteca.prestatarios('978-0307474728')[0].nombre}")
     
     # Verificar estado después de la devolución
     print("\n=== Estado de los libros después de la devolución ===")
@@ -407,6 +1137,23 @@ def probar_sistema():
     print("\n=== Usuarios restantes ===")
     for id_usuario, usuario in biblioteca.usuarios.items():
         print(usuario)
+    
+    # Estadísticas de uso a partir de los contadores del historial de préstamos
+    print("\n=== Libros más prestados este año ===")
+    anio = time.gmtime().tm_year
+    for isbn, prestamos in biblioteca.historial.mas_prestados(3, anio=anio):
+        print(f"{biblioteca.libros[isbn].titulo}: {prestamos} préstamos")
+    print(f"Categorías más prestadas: {biblioteca.historial.categorias_mas_prestadas(3)}")
+    
+    # Restaurar la biblioteca desde disco: solo se guardaron los cambios de cada operación
+    print("\n=== Biblioteca restaurada desde disco ===")
+    restaurada = Biblioteca(AlmacenArchivos(ruta), historial=HistorialPrestamos(ruta))
+    print(f"{len(restaurada.libros)} libros, {len(restaurada.usuarios)} usuarios, "
+          f"{len(restaurada.prestamos)} préstamos activos, "
+          f"{sum(restaurada.historial.por_isbn.values())} préstamos en el historial")
+    biblioteca.historial.cerrar()
+    restaurada.historial.cerrar()
+    carpeta.cleanup()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,225 @@
+import sys
+from array import array
+from collections.abc import MutableMapping
+
+from producto import Producto
+
+
+def _entero(cantidad):
+    """Cantidad para la columna de enteros: un float sin decimales (7.0) se convierte, el resto es un error"""
+    if isinstance(cantidad, float) and cantidad.is_integer():
+        return int(cantidad)
+    if not isinstance(cantidad, int):
+        raise ValueError(f"❌ En modo columnar la cantidad debe ser un número entero (se recibió {cantidad!r}).")
+    return cantidad
+
+
+class ProductoColumnar:
+    """Vista de una fila de AlmacenColumnar con la misma API que Producto.
+
+    No guarda datos propios: cada acceso lee o escribe en las columnas del almacén,
+    así que los cambios hechos con set_cantidad o set_precio quedan guardados.
+    """
+    __slots__ = ("_almacen", "_id")
+
+    def __init__(self, almacen, id_producto):
+        self._almacen = almacen
+        self._id = id_producto
+
+    def _fila(self):
+        """Posición del producto en las columnas; KeyError si ya no está en el almacén"""
+        filas = self._almacen._posiciones()
+        fila = filas[self._id] if self._id < len(filas) else -1
+        if fila < 0:
+            raise KeyError(self._id)
+        return fila
+
+    @property
+    def id_producto(self):
+        return self._id
+
+    @property
+    def nombre(self):
+        return self._almacen._nombres[self._fila()]
+
+    @nombre.setter
+    def nombre(self, valor):
+        self._almacen._nombres[self._fila()] = sys.intern(valor)
+
+    @property
+    def cantidad(self):
+        return self._almacen._cantidades[self._fila()]
+
+    @cantidad.setter
+    def cantidad(self, valor):
+        self._almacen._cantidades[self._fila()] = _entero(valor)
+
+    @property
+    def precio(self):
+        return self._almacen._precios[self._fila()]
+
+    @precio.setter
+    def precio(self, valor):
+        self._almacen._precios[self._fila()] = valor
+
+    # Los accesores y validaciones son los mismos de Producto
+    get_id = Producto.get_id
+    get_nombre = Producto.get_nombre
+    get_cantidad = Producto.get_cantidad
+    get_precio = Producto.get_precio
+    set_nombre = Producto.set_nombre
+    set_cantidad = Producto.set_cantidad
+    set_precio = Producto.set_precio
+    to_dict = Producto.to_dict
+    __str__ = Producto.__str__
+
+
+class NombresCompactos:
+    """Secuencia de nombres guardada como un bloque UTF-8 y un array de posiciones finales.
+
+    Cada nombre se decodifica solo cuando se lee, así que cargar millones de nombres
+    no crea millones de cadenas. Los cambios posteriores se guardan aparte.
+    """
+    __slots__ = ("_bloque", "_finales", "_base", "_longitud", "_cambios")
+
+    def __init__(self, bloque, finales):
+        self._bloque = bloque
+        self._finales = finales  # finales[i] = byte donde termina el nombre i
+        self._base = len(finales)
+        self._longitud = len(finales)
+        self._cambios = {}  # posición -> nombre modificado o añadido
+
+    def __len__(self):
+        return self._longitud
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self._longitud
+        if not 0 <= i < self._longitud:
+            raise IndexError(i)
+        if i in self._cambios:
+            return self._cambios[i]
+        inicio = self._finales[i - 1] if i else 0
+        return self._bloque[inicio:self._finales[i]].decode("utf-8")
+
+    def __setitem__(self, i, nombre):
+        if i < 0:
+            i += self._longitud
+        if not 0 <= i < self._longitud:
+            raise IndexError(i)
+        self._cambios[i] = nombre
+
+    def __iter__(self):
+        for i in range(self._longitud):
+            yield self[i]
+
+    def append(self, nombre):
+        self._cambios[self._longitud] = nombre
+        self._longitud += 1
+
+    def pop(self):
+        nombre = self[-1]
+        self._longitud -= 1
+        self._cambios.pop(self._longitud, None)
+        return nombre
+
+
+class AlmacenColumnar(MutableMapping):
+    """Diccionario {id: producto} que guarda los productos en columnas paralelas.
+
+    Los IDs y cantidades van en arrays de enteros de 64 bits, los precios en un
+    array de dobles y los nombres en una lista de cadenas internadas. Como los IDs
+    los genera Inventario.generar_id de forma consecutiva, la posición de cada ID
+    se guarda también en un array indexado por el propio ID (-1 si no existe).
+    Se usa en lugar del dict de Inventario.productos con Inventario(columnar=True).
+    """
+
+    def __init__(self):
+        self._ids = array("q")
+        self._cantidades = array("q")
+        self._precios = array("d")
+        self._nombres = []
+        self._filas = array("q")  # _filas[id_producto] -> posición en las columnas o -1
+
+    def _posiciones(self):
+        """Devuelve el array id -> fila, construyéndolo si viene de una carga masiva"""
+        if self._filas is None:
+            self._filas = array("q", [-1]) * (max(self._ids, default=-1) + 1)
+            for fila, id_producto in enumerate(self._ids):
+                self._filas[id_producto] = fila
+        return self._filas
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __contains__(self, id_producto):
+        filas = self._posiciones()
+        return isinstance(id_producto, int) and 0 <= id_producto < len(filas) and filas[id_producto] >= 0
+
+    def __getitem__(self, id_producto):
+        if id_producto not in self:
+            raise KeyError(id_producto)
+        return ProductoColumnar(self, id_producto)
+
+    def __setitem__(self, id_producto, producto):
+        """Copia los datos de cualquier objeto con la API de Producto en las columnas"""
+        if id_producto < 0:
+            raise KeyError(id_producto)
+        # Se convierte todo antes de tocar las columnas: un valor no válido no deja filas a medias
+        nombre = sys.intern(producto.get_nombre())
+        cantidad = _entero(producto.get_cantidad())
+        precio = float(producto.get_precio())
+        filas = self._posiciones()
+        if id_producto >= len(filas):
+            filas.extend([-1] * (id_producto + 1 - len(filas)))
+        fila = filas[id_producto]
+        if fila < 0:
+            filas[id_producto] = len(self._ids)
+            self._ids.append(id_producto)
+            self._cantidades.append(cantidad)
+            self._precios.append(precio)
+            self._nombres.append(nombre)
+        else:
+            self._cantidades[fila] = cantidad
+            self._precios[fila] = precio
+            self._nombres[fila] = nombre
+
+    def __delitem__(self, id_producto):
+        if id_producto not in self:
+            raise KeyError(id_producto)
+        filas = self._posiciones()
+        fila = filas[id_producto]
+        filas[id_producto] = -1
+        ultima = len(self._ids) - 1
+        if fila != ultima:
+            # La última fila ocupa el hueco para no desplazar las columnas
+            id_movido = self._ids[ultima]
+            self._ids[fila] = id_movido
+            self._cantidades[fila] = self._cantidades[ultima]
+            self._precios[fila] = self._precios[ultima]
+            self._nombres[fila] = self._nombres[ultima]
+            filas[id_movido] = fila
+        self._ids.pop()
+        self._cantidades.pop()
+        self._precios.pop()
+        self._nombres.pop()
+
+    def clear(self):
+        self.__init__()
+
+    def cargar_columnas(self, ids, cantidades, precios, nombres):
+        """Reemplaza el contenido por columnas ya construidas (carga masiva).
+
+        El array id -> fila se construye en el primer acceso por ID, para que la
+        carga solo copie las columnas.
+        """
+        self._ids, self._cantidades, self._precios = ids, cantidades, precios
+        self._nombres = nombres
+        self._filas = None
+
+    def columnas(self):
+        """Devuelve las columnas (ids, cantidades, precios) sin copiarlas"""
+        return self._ids, self._cantidades, self._precios
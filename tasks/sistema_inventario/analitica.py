@@ -0,0 +1,123 @@
+import heapq
+import operator
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional: sin él se usan las versiones en Python puro
+    np = None
+
+
+class AnaliticaInventario:
+    """Consultas agregadas sobre los productos de un Inventario.
+
+    Trabaja sobre columnas (ids, cantidades, precios). Con Inventario(columnar=True)
+    se copian los arrays del almacén (una copia de memoria, sin recorrer los
+    productos); con el diccionario normal se construyen en una sola pasada. En los
+    dos casos se hace con el inventario bloqueado, así que otro hilo nunca deja
+    una fila a medias, y las consultas trabajan después sobre su propia copia.
+    Si NumPy está instalado todas las operaciones son vectorizadas.
+    """
+
+    def __init__(self, inventario):
+        self.inventario = inventario
+
+    def _columnas(self):
+        with self.inventario._exclusivo():
+            productos = self.inventario.productos
+            if hasattr(productos, "columnas"):
+                # Copias: una vista de NumPy sobre los arrays del almacén impediría que crezcan (BufferError)
+                ids, cantidades, precios = (columna[:] for columna in productos.columnas())
+            else:
+                ids, cantidades, precios = array("q"), array("q"), array("d")
+                for producto in productos.values():
+                    cantidad = producto.get_cantidad()
+                    if isinstance(cantidad, float) and cantidades.typecode == "q":
+                        cantidades = array("d", cantidades)  # El modo diccionario admite cantidades decimales
+                    ids.append(producto.get_id())
+                    cantidades.append(cantidad)
+                    precios.append(producto.get_precio())
+        if np is None:
+            return ids, cantidades, precios
+        tipo_cantidades = np.int64 if cantidades.typecode == "q" else np.float64
+        if not ids:
+            return np.zeros(0, np.int64), np.zeros(0, tipo_cantidades), np.zeros(0, np.float64)
+        return (np.frombuffer(ids, dtype=np.int64), np.frombuffer(cantidades, dtype=tipo_cantidades),
+                np.frombuffer(precios, dtype=np.float64))
+
+    def _valores(self, cantidades, precios):
+        if np is None:
+            return list(map(operator.mul, cantidades, precios))
+        return cantidades * precios
+
+    def valor_total(self):
+        """Valor total del stock: suma de cantidad * precio"""
+        _, cantidades, precios = self._columnas()
+        if np is None:
+            return sum(self._valores(cantidades, precios))
+        return float(np.dot(cantidades.astype(np.float64), precios))
+
+    def bajo_stock(self, umbral):
+        """IDs de los productos con cantidad menor que el umbral"""
+        ids, cantidades, _ = self._columnas()
+        if np is None:
+            return [i for i, c in zip(ids, cantidades) if c < umbral]
+        return ids[cantidades < umbral].tolist()
+
+    def top_por_valor(self, n=10):
+        """Los n productos de mayor valor en stock como lista de (id, valor)"""
+        ids, cantidades, precios = self._columnas()
+        valores = self._valores(cantidades, precios)
+        if np is None:
+            return heapq.nlargest(n, zip(ids, valores), key=operator.itemgetter(1))
+        n = min(n, len(ids))
+        if n == 0:
+            return []
+        # argpartition selecciona los n mayores en tiempo lineal; solo esos se ordenan
+        posiciones = np.argpartition(valores, len(valores) - n)[-n:]
+        posiciones = posiciones[np.argsort(valores[posiciones])[::-1]]
+        return list(zip(ids[posiciones].tolist(), valores[posiciones].tolist()))
+
+    def percentiles(self, campo="precio", qs=(25, 50, 75, 90, 99)):
+        """Percentiles de 'precio' o 'cantidad' como diccionario {q: valor}"""
+        _, cantidades, precios = self._columnas()
+        datos = precios if campo == "precio" else cantidades
+        if not len(datos):
+            return {q: None for q in qs}
+        if np is not None:
+            return dict(zip(qs, np.percentile(datos, qs).tolist()))
+        # Interpolación lineal, igual que el método por defecto de NumPy
+        ordenados = sorted(datos)
+        resultado = {}
+        for q in qs:
+            posicion = (len(ordenados) - 1) * q / 100
+            inferior = int(posicion)
+            superior = min(inferior + 1, len(ordenados) - 1)
+            fraccion = posicion - inferior
+            resultado[q] = ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * fraccion
+        return resultado
+
+    def histograma_precios(self, intervalos=10):
+        """Devuelve (conteos, bordes) de los precios en intervalos de igual ancho"""
+        _, _, precios = self._columnas()
+        if not len(precios):
+            return [], []
+        if np is not None:
+            conteos, bordes = np.histogram(precios, bins=intervalos)
+            return conteos.tolist(), bordes.tolist()
+        minimo, maximo = min(precios), max(precios)
+        if minimo == maximo:
+            # Igual que NumPy: si todos los precios son iguales, el rango es de ±0.5 a su alrededor
+            minimo, maximo = minimo - 0.5, maximo + 0.5
+        ancho = (maximo - minimo) / intervalos
+        bordes = [minimo + ancho * i for i in range(intervalos)] + [maximo]
+        conteos = [0] * intervalos
+        for precio in precios:
+            i = min(int((precio - minimo) / ancho), intervalos - 1)
+            # El redondeo de la división puede dejar el precio junto al borde equivocado; NumPy lo corrige igual
+            if precio < bordes[i]:
+                i -= 1
+            elif i < intervalos - 1 and precio >= bordes[i + 1]:
+                i += 1
+            conteos[i] += 1
+        return conteos, bordes
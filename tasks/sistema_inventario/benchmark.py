@@ -0,0 +1,148 @@
+"""Benchmark reproducible del sistema de inventario.
+
+Genera catálogos sintéticos (con semilla fija), mide las operaciones principales
+de Inventario y guarda los resultados en JSON para comparar versiones.
+
+Ejemplos:
+    python benchmark.py --tamanos 1000 10000 100000 --salida resultados.json
+    python benchmark.py --tamanos 1000000 --columnar --formato invb
+    python benchmark.py --comparar resultados_anteriores.json
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from inventario import Inventario
+from formatos import FORMATOS
+
+PALABRAS = ["arroz", "azúcar", "leche", "pan", "queso", "aceite", "café", "harina",
+            "atún", "jabón", "galleta", "yogur", "sal", "fideo", "jugo", "cereal"]
+
+
+def generar_catalogo(ruta, tamano, semilla=42):
+    """Escribe un catálogo sintético de 'tamano' productos en el formato de la ruta"""
+    aleatorio = random.Random(semilla)
+    datos = [{"id": i, "nombre": f"{aleatorio.choice(PALABRAS)} {aleatorio.randint(1, 999999)}",
+              "cantidad": aleatorio.randint(0, 500), "precio": round(aleatorio.uniform(0.1, 100), 2)}
+             for i in range(1, tamano + 1)]
+    FORMATOS[os.path.splitext(ruta)[1]].escribir(ruta, datos)
+
+
+def cronometrar(funcion, repeticiones=1):
+    """Devuelve el tiempo medio en segundos de 'repeticiones' llamadas"""
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return (time.perf_counter() - inicio) / repeticiones
+
+
+def medir_tamano(tamano, carpeta, columnar, extension, operaciones):
+    ruta = os.path.join(carpeta, f"catalogo_{tamano}{extension}")
+    generar_catalogo(ruta, tamano)
+    resultado = {"tamano": tamano, "bytes_archivo": os.path.getsize(ruta)}
+    # Cada inventario que agrega productos tiene su propio archivo: si compartieran uno,
+    # los dos empezarían en el mismo último ID y se repetirían los IDs
+    ruta_diario = os.path.join(carpeta, f"catalogo_{tamano}_diario{extension}")
+    shutil.copyfile(ruta, ruta_diario)
+
+    def abrir(archivo=ruta, **opciones):
+        return Inventario(archivo, silencioso=True, columnar=columnar, **opciones)
+
+    # La salida de mostrar_inventario se descarta sin guardarla en memoria
+    with open(os.devnull, "w") as salida_nula, contextlib.redirect_stdout(salida_nula):
+        inicio = time.perf_counter()
+        inventario = abrir()
+        resultado["cargar_desde_archivo_s"] = time.perf_counter() - inicio
+
+        resultado["guardar_en_archivo_s"] = cronometrar(inventario.guardar_en_archivo)
+
+        # Agregar en modo diario (una línea por operación) y con reescritura completa
+        con_diario = abrir(ruta_diario, diario=True)
+        resultado["agregar_producto_diario_s"] = cronometrar(
+            lambda: con_diario.agregar_producto("producto de prueba", 1, 1.0), operaciones)
+        resultado["agregar_producto_completo_s"] = cronometrar(
+            lambda: inventario.agregar_producto("producto de prueba", 1, 1.0))
+
+        aleatorio = random.Random(7)
+        consultas = [str(aleatorio.randint(100, 9999)) for _ in range(operaciones)]
+        resultado["buscar_por_nombre_primera_s"] = cronometrar(lambda: inventario.buscar_por_nombre("café"))
+        resultado["buscar_por_nombre_s"] = cronometrar(lambda: [inventario.buscar_por_nombre(c) for c in consultas]) \
+            / len(consultas)
+
+        resultado["mostrar_inventario_s"] = cronometrar(inventario.mostrar_inventario)
+
+    # La memoria se mide en una carga aparte porque tracemalloc hace más lenta la ejecución
+    del inventario, con_diario
+    tracemalloc.start()
+    with open(os.devnull, "w") as salida_nula, contextlib.redirect_stdout(salida_nula):
+        inventario = abrir()
+    actual, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    resultado["memoria_final_bytes"] = actual
+    resultado["memoria_pico_carga_bytes"] = pico
+    resultado["bytes_por_producto"] = actual / tamano
+    return resultado
+
+
+def comparar(actuales, anteriores):
+    """Imprime la razón actual/anterior de cada métrica para los tamaños en común"""
+    previos = {r["tamano"]: r for r in anteriores["resultados"]}
+    for resultado in actuales["resultados"]:
+        previo = previos.get(resultado["tamano"])
+        if previo is None:
+            continue
+        print(f"\n📊 {resultado['tamano']:,} productos (actual / anterior):")
+        for clave, valor in resultado.items():
+            if clave != "tamano" and previo.get(clave):
+                razon = valor / previo[clave]
+                marca = "⚠️" if razon > 1.2 else "  "
+                print(f"  {marca} {clave:32} x{razon:.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del sistema de inventario")
+    parser.add_argument("--tamanos", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--operaciones", type=int, default=100, help="Repeticiones de agregar y buscar")
+    parser.add_argument("--columnar", action="store_true", help="Usar el almacén columnar")
+    parser.add_argument("--formato", choices=["json", "invb"], default="json")
+    parser.add_argument("--salida", default="benchmark_resultados.json")
+    parser.add_argument("--comparar", help="Archivo de resultados anterior para comparar")
+    argumentos = parser.parse_args()
+
+    resultados = {
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "plataforma": platform.platform(),
+        "columnar": argumentos.columnar,
+        "formato": argumentos.formato,
+        "resultados": [],
+    }
+    with tempfile.TemporaryDirectory() as carpeta:
+        for tamano in argumentos.tamanos:
+            resultado = medir_tamano(tamano, carpeta, argumentos.columnar, "." + argumentos.formato,
+                                     argumentos.operaciones)
+            resultados["resultados"].append(resultado)
+            print(f"✅ {tamano:,} productos: carga {resultado['cargar_desde_archivo_s']:.3f} s | "
+                  f"guardado {resultado['guardar_en_archivo_s']:.3f} s | "
+                  f"búsqueda {resultado['buscar_por_nombre_s'] * 1000:.3f} ms | "
+                  f"{resultado['bytes_por_producto']:.0f} B/producto")
+
+    with open(argumentos.salida, "w", encoding="utf-8") as file:
+        json.dump(resultados, file, indent=4, ensure_ascii=False)
+    print(f"💾 Resultados guardados en {argumentos.salida}")
+
+    if argumentos.comparar:
+        with open(argumentos.comparar, "r", encoding="utf-8") as file:
+            comparar(resultados, json.load(file))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Compara la búsqueda por nombre con índice de trigramas frente al recorrido lineal.
+
+Uso: python benchmark_busqueda.py [cantidad_productos] [consultas]
+"""
+import random
+import sys
+import time
+
+from indice_nombres import IndiceTrigramas
+
+PALABRAS = ["arroz", "azúcar", "leche", "pan", "queso", "aceite", "café", "harina",
+            "atún", "jabón", "galleta", "yogur", "sal", "fideo", "jugo", "cereal"]
+MARCAS = ["la favorita", "toni", "nestlé", "real", "don vittorio", "supermaxi", "oriental"]
+
+
+def generar_nombres(cantidad, semilla=42):
+    aleatorio = random.Random(semilla)
+    return {i: f"{aleatorio.choice(PALABRAS)} {aleatorio.choice(MARCAS)} {aleatorio.randint(1, 99999)}"
+            for i in range(1, cantidad + 1)}
+
+
+def busqueda_lineal(nombres, texto):
+    texto = texto.lower()
+    return [i for i, nombre in nombres.items() if texto in nombre.lower()]
+
+
+def medir(funcion, consultas):
+    inicio = time.perf_counter()
+    for consulta in consultas:
+        funcion(consulta)
+    return (time.perf_counter() - inicio) / len(consultas)
+
+
+def main():
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    total_consultas = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    nombres = generar_nombres(cantidad)
+
+    inicio = time.perf_counter()
+    indice = IndiceTrigramas()
+    for id_producto, nombre in nombres.items():
+        indice.agregar(id_producto, nombre)
+    construccion = time.perf_counter() - inicio
+
+    aleatorio = random.Random(7)
+    consultas = [f"{aleatorio.choice(PALABRAS)} {aleatorio.choice(MARCAS)} {aleatorio.randint(1, 9)}"
+                 for _ in range(total_consultas // 2)]
+    consultas += [str(aleatorio.randint(1000, 99999)) for _ in range(total_consultas - len(consultas))]
+
+    # Ambas estrategias deben devolver exactamente los mismos IDs
+    for consulta in consultas:
+        assert sorted(indice.buscar(consulta)) == sorted(busqueda_lineal(nombres, consulta))
+
+    lineal = medir(lambda c: busqueda_lineal(nombres, c), consultas)
+    con_indice = medir(indice.buscar, consultas)
+
+    print(f"Productos: {cantidad:,} | Consultas: {len(consultas)}")
+    print(f"Construcción del índice: {construccion:.2f} s")
+    print(f"Recorrido lineal:  {lineal * 1000:.3f} ms por consulta")
+    print(f"Índice trigramas:  {con_indice * 1000:.3f} ms por consulta")
+    print(f"Aceleración: x{lineal / con_indice:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import codecs
+import json
+import os
+import re
+
+_ESPACIOS = re.compile(r"[ \t\n\r]*")
+# Un elemento partido entre dos bloques falla cerca del final del búfer: a lo sumo un
+# escape \uXXXX doble o un literal (false) a medias
+_MARGEN_PARTIDO = 12
+
+
+def _puede_estar_partido(error, texto):
+    """Indica si un error de raw_decode puede deberse solo a que el elemento sigue en el siguiente bloque"""
+    return error.msg.startswith("Unterminated string") or error.pos >= len(texto) - _MARGEN_PARTIDO
+
+
+def iterar_registros_json(ruta, progreso=None, tamano_bloque=1 << 16):
+    """Recorre un archivo JSON con una lista de objetos devolviendo un objeto a la vez.
+
+    Lee el archivo por bloques y decodifica cada elemento con raw_decode, así que
+    en memoria solo está el bloque actual y no la lista completa. Si se indica,
+    progreso(bytes_leidos, bytes_totales, registros) se llama después de cada bloque.
+    Lanza json.JSONDecodeError si el contenido no es una lista JSON válida, con las
+    mismas reglas que json.load: una sola coma entre elementos, sin coma final y sin
+    nada más que espacios después de la lista. Un elemento corrupto se detecta en
+    cuanto se decodifica, sin seguir leyendo el resto del archivo.
+    """
+    decodificador = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    total = os.path.getsize(ruta)
+    leidos = 0
+    registros = 0
+
+    with open(ruta, "rb") as file:
+        texto = ""
+        pos = 0
+        fin_archivo = False
+        # "inicio": se espera "["; "valor": un elemento (o "]" si la lista está vacía);
+        # "separador": "," o "]"; "fin": solo espacios hasta el final del archivo
+        estado = "inicio"
+        lista_vacia = True
+
+        def leer_mas():
+            nonlocal texto, pos, leidos, fin_archivo
+            bloque = file.read(tamano_bloque)
+            leidos += len(bloque)
+            fin_archivo = not bloque
+            # Se descarta lo ya consumido para que el búfer no crezca
+            texto = texto[pos:] + utf8.decode(bloque, final=fin_archivo)
+            pos = 0
+            if progreso and bloque:
+                progreso(leidos, total, registros)
+
+        while True:
+            pos = _ESPACIOS.match(texto, pos).end()
+            if pos >= len(texto):
+                if fin_archivo:
+                    if estado == "fin":
+                        return
+                    raise json.JSONDecodeError("Fin de archivo inesperado", texto, pos)
+                leer_mas()
+                continue
+
+            caracter = texto[pos]
+            if estado == "inicio":
+                if caracter != "[":
+                    raise json.JSONDecodeError("Se esperaba una lista JSON", texto, pos)
+                estado = "valor"
+                pos += 1
+            elif estado == "fin":
+                raise json.JSONDecodeError("Datos adicionales después de la lista", texto, pos)
+            elif caracter == "]" and (estado == "separador" or lista_vacia):
+                estado = "fin"
+                pos += 1
+            elif estado == "separador":
+                if caracter != ",":
+                    raise json.JSONDecodeError("Se esperaba ',' o ']' entre elementos", texto, pos)
+                estado = "valor"
+                pos += 1
+            else:
+                try:
+                    objeto, fin = decodificador.raw_decode(texto, pos)
+                except json.JSONDecodeError as error:
+                    if fin_archivo or not _puede_estar_partido(error, texto):
+                        raise
+                    leer_mas()  # El objeto está partido entre dos bloques
+                    continue
+                pos = fin
+                registros += 1
+                lista_vacia = False
+                estado = "separador"
+                yield objeto
@@ -0,0 +1,49 @@
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class CerrojoArchivo:
+    """Cerrojo exclusivo entre procesos basado en un archivo .lock.
+
+    Se usa como gestor de contexto y es reentrante dentro del mismo proceso:
+    solo la entrada más externa bloquea el archivo y solo la salida
+    correspondiente lo libera. No protege entre hilos; para eso Inventario
+    lo combina con un threading.RLock.
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.nivel = 0
+        self._file = None
+
+    def __enter__(self):
+        if self.nivel == 0:
+            self._file = open(self.ruta, "a+b")
+            try:
+                if fcntl is not None:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+                else:
+                    self._file.seek(0)
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_LOCK, 1)
+            except BaseException:
+                self._file.close()
+                raise
+        self.nivel += 1
+        return self
+
+    def __exit__(self, *excepcion):
+        self.nivel -= 1
+        if self.nivel == 0:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+                else:
+                    self._file.seek(0)
+                    msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            finally:
+                self._file.close()
+                self._file = None
+        return False
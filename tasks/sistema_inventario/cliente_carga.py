@@ -0,0 +1,182 @@
+"""Cliente del servidor de inventario y generador de carga.
+
+Abre varias conexiones, mantiene en cada una hasta --profundidad solicitudes
+en vuelo (pipelining) y mide solicitudes por segundo y latencias. Con
+--iniciar-servidor lanza un servidor local sobre un inventario temporal.
+
+Uso: python cliente_carga.py [--conexiones 8] [--solicitudes 20000] [--profundidad 32] [--iniciar-servidor]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+
+class ClienteInventario:
+    """Conexión al servidor; varias solicitudes pueden esperar respuesta a la vez"""
+
+    def __init__(self, lector, escritor):
+        self._lector = lector
+        self._escritor = escritor
+        self._siguiente_id = 0
+        self._esperando = {}  # {id de solicitud: futuro}
+        self._tarea_lectura = asyncio.ensure_future(self._leer_respuestas())
+
+    @classmethod
+    async def conectar(cls, host="127.0.0.1", puerto=8765):
+        # Las respuestas de buscar/listar pueden superar el límite de línea por defecto (64 KiB)
+        lector, escritor = await asyncio.open_connection(host, puerto, limit=1 << 24)
+        return cls(lector, escritor)
+
+    async def _leer_respuestas(self):
+        try:
+            async for linea in self._lector:
+                respuesta = json.loads(linea)
+                futuro = self._esperando.pop(respuesta["id"], None)
+                if futuro is not None and not futuro.done():
+                    futuro.set_result(respuesta)
+        finally:
+            for futuro in self._esperando.values():
+                if not futuro.done():
+                    futuro.set_exception(ConnectionError("❌ Conexión cerrada por el servidor."))
+
+    def enviar(self, op, **argumentos):
+        """Envía una solicitud sin esperar y devuelve el futuro de su respuesta"""
+        self._siguiente_id += 1
+        futuro = asyncio.get_running_loop().create_future()
+        self._esperando[self._siguiente_id] = futuro
+        linea = json.dumps({"id": self._siguiente_id, "op": op, **argumentos}, ensure_ascii=False) + "\n"
+        self._escritor.write(linea.encode("utf-8"))
+        return futuro
+
+    async def vaciar(self):
+        """Espera a que se envíen las solicitudes acumuladas en el búfer"""
+        await self._escritor.drain()
+
+    async def solicitar(self, op, **argumentos):
+        """Envía una solicitud y espera su respuesta"""
+        return await self.enviar(op, **argumentos)
+
+    async def cerrar(self):
+        self._escritor.close()
+        await self._escritor.wait_closed()
+        self._tarea_lectura.cancel()
+
+
+def generar_solicitud(aleatorio, maximo_id):
+    """Mezcla de operaciones: sobre todo búsquedas y ajustes de stock"""
+    tirada = aleatorio.random()
+    if tirada < 0.5:
+        return "buscar", {"nombre": f"producto {aleatorio.randint(1, maximo_id)}"}
+    if tirada < 0.8:
+        return "ajustar", {"id_producto": aleatorio.randint(1, maximo_id), "diferencia": 1}
+    if tirada < 0.85:
+        return "listar", {"tamano": 20, "ordenar_por": "cantidad", "descendente": True}
+    return "agregar", {"nombre": f"nuevo {aleatorio.randint(1, 10 ** 6)}", "cantidad": 1, "precio": 1.0}
+
+
+async def ejecutar_conexion(host, puerto, solicitudes, profundidad, maximo_id, semilla, latencias, errores):
+    cliente = await ClienteInventario.conectar(host, puerto)
+    aleatorio = random.Random(semilla)
+    en_vuelo = asyncio.Semaphore(profundidad)
+
+    async def esperar(futuro, inicio):
+        try:
+            respuesta = await futuro
+            if not respuesta["ok"]:
+                errores.append(respuesta["error"])
+        finally:
+            latencias.append(time.perf_counter() - inicio)
+            en_vuelo.release()
+
+    tareas = []
+    for _ in range(solicitudes):
+        await en_vuelo.acquire()
+        op, argumentos = generar_solicitud(aleatorio, maximo_id)
+        tareas.append(asyncio.ensure_future(esperar(cliente.enviar(op, **argumentos), time.perf_counter())))
+        if len(tareas) % profundidad == 0:
+            await cliente.vaciar()
+    await cliente.vaciar()
+    await asyncio.gather(*tareas)
+    await cliente.cerrar()
+
+
+async def preparar_catalogo(host, puerto, productos):
+    """Crea 'productos' productos con solicitudes encadenadas"""
+    cliente = await ClienteInventario.conectar(host, puerto)
+    total = (await cliente.solicitar("listar", tamano=1))["resultado"]["total"]
+    futuros = [cliente.enviar("agregar", nombre=f"producto {i}", cantidad=100, precio=1.0)
+               for i in range(total + 1, productos + 1)]
+    await asyncio.gather(*futuros)
+    await cliente.cerrar()
+
+
+async def esperar_servidor(host, puerto, segundos=10):
+    limite = time.monotonic() + segundos
+    while True:
+        try:
+            cliente = await ClienteInventario.conectar(host, puerto)
+            await cliente.solicitar("ping")
+            await cliente.cerrar()
+            return
+        except OSError:
+            if time.monotonic() > limite:
+                raise
+            await asyncio.sleep(0.1)
+
+
+async def generar_carga(argumentos):
+    await esperar_servidor(argumentos.host, argumentos.puerto)
+    await preparar_catalogo(argumentos.host, argumentos.puerto, argumentos.productos)
+    latencias, errores = [], []
+    # El resto de la división se reparte entre las primeras conexiones: se envían exactamente 'solicitudes'
+    por_conexion, resto = divmod(argumentos.solicitudes, argumentos.conexiones)
+    inicio = time.perf_counter()
+    await asyncio.gather(*(ejecutar_conexion(argumentos.host, argumentos.puerto, por_conexion + (n < resto),
+                                             argumentos.profundidad, argumentos.productos, n, latencias, errores)
+                           for n in range(argumentos.conexiones)))
+    segundos = time.perf_counter() - inicio
+    latencias.sort()
+    total = len(latencias)
+    if not total:
+        print(f"⚠️ No se completó ninguna solicitud (errores: {len(errores)}).")
+        return
+    print(f"✅ {total} solicitudes en {segundos:.2f} s: {total / segundos:,.0f} solicitudes/s "
+          f"({argumentos.conexiones} conexiones, profundidad {argumentos.profundidad})")
+    print(f"   latencia p50 {latencias[total // 2] * 1000:.2f} ms | "
+          f"p99 {latencias[min(total - 1, total * 99 // 100)] * 1000:.2f} ms | errores: {len(errores)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generador de carga para servidor.py")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765)
+    parser.add_argument("--conexiones", type=int, default=8)
+    parser.add_argument("--solicitudes", type=int, default=20000, help="Total entre todas las conexiones")
+    parser.add_argument("--profundidad", type=int, default=32, help="Solicitudes en vuelo por conexión")
+    parser.add_argument("--productos", type=int, default=1000, help="Tamaño del catálogo de prueba")
+    parser.add_argument("--iniciar-servidor", action="store_true", help="Lanzar un servidor local temporal")
+    argumentos = parser.parse_args()
+
+    if not argumentos.iniciar_servidor:
+        asyncio.run(generar_carga(argumentos))
+        return
+    with tempfile.TemporaryDirectory() as carpeta:
+        servidor = subprocess.Popen([sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                                  "servidor.py"),
+                                     "--archivo", os.path.join(carpeta, "inventario.json"),
+                                     "--host", argumentos.host, "--puerto", str(argumentos.puerto)])
+        try:
+            asyncio.run(generar_carga(argumentos))
+        finally:
+            servidor.terminate()
+            servidor.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Prueba de estrés de escritores concurrentes sobre el mismo inventario.
+
+Lanza 16 hilos sobre un Inventario compartido y luego 16 procesos sobre el
+mismo archivo (modo multiproceso). Cada escritor agrega productos e incrementa
+la cantidad de un producto común; al final se comprueba que no se perdió
+ninguna actualización y que no hay IDs repetidos. Por último, dos procesos con
+historial de movimientos comprueban que ninguno pierde los movimientos del otro
+cuando la instantánea cambia entre sus operaciones.
+
+Uso: python estres_concurrencia.py [escritores] [operaciones_por_escritor]
+"""
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from inventario import Inventario
+
+
+def escritor(inventario, numero, operaciones):
+    for i in range(operaciones):
+        inventario.agregar_producto(f"escritor {numero} producto {i}", 1, 1.0)
+        inventario.ajustar_cantidad(1, 1)
+
+
+def proceso_escritor(archivo, numero, operaciones):
+    inventario = Inventario(archivo, diario=True, limite_diario=2000, silencioso=True, multiproceso=True)
+    escritor(inventario, numero, operaciones)
+
+
+def comprobar(inventario, escritores, operaciones, segundos, titulo):
+    esperados = escritores * operaciones
+    nombres = {p.get_nombre() for p in inventario.productos.values()}
+    productos = len(inventario.productos) - 1  # Sin contar el producto común
+    contador = inventario.productos[1].get_cantidad()
+    correcto = productos == esperados and len(nombres) == esperados + 1 and contador == esperados
+    print(f"{titulo}: {escritores} escritores x {operaciones} operaciones en {segundos:.2f} s")
+    print(f"  productos agregados: {productos}/{esperados} | incrementos: {contador}/{esperados}"
+          f" | {'✅ sin pérdidas' if correcto else '❌ se perdieron actualizaciones'}")
+    return correcto
+
+
+def proceso_otro_escritor(archivo):
+    # Sin diario, agregar reescribe la instantánea y añade un movimiento al .mov
+    Inventario(archivo, silencioso=True, multiproceso=True, movimientos=True).agregar_producto("remoto", 5, 1.0)
+
+
+def comprobar_movimientos(carpeta):
+    archivo = os.path.join(carpeta, "movimientos.json")
+    inventario = Inventario(archivo, silencioso=True, multiproceso=True, movimientos=True)
+    inventario.agregar_producto("local", 3, 1.0)
+    proceso = multiprocessing.Process(target=proceso_otro_escritor, args=(archivo,))
+    proceso.start()
+    proceso.join()
+    # La instantánea cambió: se recarga el inventario y se escribe otro movimiento
+    inventario.ajustar_cantidad(1, 1)
+    local = [diferencia for _, diferencia in inventario.movimientos.historial(1)]
+    remoto = [diferencia for _, diferencia in inventario.movimientos.historial(2)]
+    en_disco = len(Inventario(archivo, silencioso=True, movimientos=True).movimientos)
+    correcto = local == [3, 1] and remoto == [5] and len(inventario.movimientos) == en_disco == 3
+    print(f"Movimientos entre 2 procesos: locales {local}, del otro proceso {remoto}, {en_disco} en disco"
+          f" | {'✅ sin pérdidas' if correcto else '❌ se perdieron movimientos'}")
+    return correcto
+
+
+def main():
+    escritores = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    operaciones = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        # Hilos sobre un mismo objeto Inventario
+        archivo = os.path.join(carpeta, "hilos.json")
+        inventario = Inventario(archivo, diario=True, limite_diario=500, silencioso=True)
+        inventario.agregar_producto("contador", 0, 1.0)
+        hilos = [threading.Thread(target=escritor, args=(inventario, n, operaciones)) for n in range(escritores)]
+        inicio = time.perf_counter()
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        bien_hilos = comprobar(inventario, escritores, operaciones, time.perf_counter() - inicio, "Hilos")
+        inventario.compactar()
+        bien_hilos &= comprobar(Inventario(archivo, silencioso=True), escritores, operaciones, 0, "  recargado")
+
+        # Procesos independientes sobre el mismo archivo
+        archivo = os.path.join(carpeta, "procesos.json")
+        Inventario(archivo, diario=True, silencioso=True, multiproceso=True).agregar_producto("contador", 0, 1.0)
+        procesos = [multiprocessing.Process(target=proceso_escritor, args=(archivo, n, operaciones))
+                    for n in range(escritores)]
+        inicio = time.perf_counter()
+        for proceso in procesos:
+            proceso.start()
+        for proceso in procesos:
+            proceso.join()
+        final = Inventario(archivo, diario=True, silencioso=True, multiproceso=True)
+        bien_procesos = comprobar(final, escritores, operaciones, time.perf_counter() - inicio, "Procesos")
+
+        bien_movimientos = comprobar_movimientos(carpeta)
+
+    sys.exit(0 if bien_hilos and bien_procesos and bien_movimientos else 1)
+
+
+if __name__ == "__main__":
+    main()
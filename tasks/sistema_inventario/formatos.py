@@ -0,0 +1,149 @@
+"""Formatos de archivo para las instantáneas del inventario.
+
+Uso como conversor: python formatos.py origen destino
+(el formato de cada archivo se deduce de su extensión: .json o .invb)
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from almacen_columnar import NombresCompactos
+from cargador_json import iterar_registros_json
+
+
+class FormatoJSON:
+    """Lista JSON legible de productos (formato original del inventario)"""
+    extension = ".json"
+    cantidades_enteras = False  # Guarda las cantidades tal cual, también las decimales
+
+    def leer(self, ruta, progreso=None):
+        """Genera los diccionarios de productos del archivo, uno a uno"""
+        return iterar_registros_json(ruta, progreso)
+
+    def escribir(self, ruta, datos):
+        """Escribe una lista de diccionarios de productos"""
+        with open(ruta, "w", encoding="utf-8") as file:
+            json.dump(datos, file, indent=4, ensure_ascii=False)
+
+
+class FormatoBinario:
+    """Instantánea binaria compacta pensada para abrirse con mmap.
+
+    Estructura (little endian):
+        cabecera: b"INVB", versión (u16), reservado (u16), productos (u64), bytes de nombres (u64)
+        columna de IDs (i64 por producto)
+        columna de cantidades (i64 por producto)
+        columna de precios (f64 por producto)
+        columna de fin de cada nombre en el bloque de nombres (u64 por producto)
+        bloque de nombres en UTF-8, uno tras otro
+
+    Las columnas de ancho fijo se copian directamente a arrays y los nombres quedan
+    en un NombresCompactos que los decodifica al leerlos, así que la carga no
+    recorre los registros en Python.
+    """
+    extension = ".invb"
+    cantidades_enteras = True  # La columna de cantidades es de enteros de 64 bits
+    MAGICO = b"INVB"
+    VERSION = 1
+    CABECERA = struct.Struct("<4sHHQQ")
+
+    def _columnas_desde_datos(self, datos):
+        ids, cantidades, precios = array("q"), array("q"), array("d")
+        nombres = []
+        for item in datos:
+            ids.append(int(item["id"]))
+            cantidad = item["cantidad"]
+            if cantidad != int(cantidad):
+                # int() truncaría 7.5 a 7 sin avisar
+                raise ValueError(f"❌ El formato binario solo admite cantidades enteras "
+                                 f"(producto {item['id']}: {cantidad!r}).")
+            cantidades.append(int(cantidad))
+            precios.append(float(item["precio"]))
+            nombres.append(item["nombre"])
+        return ids, cantidades, precios, nombres
+
+    def escribir(self, ruta, datos):
+        """Escribe una lista de diccionarios de productos"""
+        self.escribir_columnas(ruta, *self._columnas_desde_datos(datos))
+
+    def escribir_columnas(self, ruta, ids, cantidades, precios, nombres):
+        """Escribe directamente las columnas (arrays 'q', 'q', 'd' y lista de nombres)"""
+        finales = array("Q")
+        partes = []
+        fin = 0
+        for nombre in nombres:
+            codificado = nombre.encode("utf-8")
+            fin += len(codificado)
+            finales.append(fin)
+            partes.append(codificado)
+        with open(ruta, "wb") as file:
+            file.write(self.CABECERA.pack(self.MAGICO, self.VERSION, 0, len(ids), fin))
+            for columna in (ids, cantidades, precios, finales):
+                if sys.byteorder == "big":
+                    columna = array(columna.typecode, columna)
+                    columna.byteswap()
+                columna.tofile(file)
+            file.write(b"".join(partes))
+
+    def leer_columnas(self, ruta):
+        """Devuelve (ids, cantidades, precios, nombres) leyendo el archivo con mmap"""
+        with open(ruta, "rb") as file:
+            if os.fstat(file.fileno()).st_size < self.CABECERA.size:
+                raise ValueError("❌ Archivo binario de inventario incompleto.")
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+                magico, version, _, total, bytes_nombres = self.CABECERA.unpack_from(mapa, 0)
+                if magico != self.MAGICO or version != self.VERSION:
+                    raise ValueError("❌ El archivo no es una instantánea binaria de inventario.")
+                if len(mapa) != self.CABECERA.size + total * 32 + bytes_nombres:
+                    raise ValueError("❌ Archivo binario de inventario incompleto.")
+
+                vista = memoryview(mapa)
+                try:
+                    inicio = self.CABECERA.size
+                    columnas = []
+                    for tipo in ("q", "q", "d", "Q"):
+                        columna = array(tipo)
+                        columna.frombytes(vista[inicio:inicio + total * 8])
+                        if sys.byteorder == "big":
+                            columna.byteswap()
+                        columnas.append(columna)
+                        inicio += total * 8
+                    bloque_nombres = bytes(vista[inicio:inicio + bytes_nombres])
+                finally:
+                    vista.release()
+        ids, cantidades, precios, finales = columnas
+        return ids, cantidades, precios, NombresCompactos(bloque_nombres, finales)
+
+    def leer(self, ruta, progreso=None):
+        """Genera los diccionarios de productos del archivo, uno a uno"""
+        ids, cantidades, precios, nombres = self.leer_columnas(ruta)
+        if progreso:
+            total = os.path.getsize(ruta)
+            progreso(total, total, len(ids))
+        for id_producto, cantidad, precio, nombre in zip(ids, cantidades, precios, nombres):
+            yield {"id": id_producto, "nombre": nombre, "cantidad": cantidad, "precio": precio}
+
+
+FORMATOS = {formato.extension: formato for formato in (FormatoJSON(), FormatoBinario())}
+
+
+def formato_para_archivo(ruta):
+    """Elige el formato según la extensión del archivo (JSON por defecto)"""
+    return FORMATOS.get(os.path.splitext(ruta)[1].lower(), FORMATOS[".json"])
+
+
+def convertir(origen, destino):
+    """Convierte una instantánea entre formatos; devuelve la cantidad de productos"""
+    datos = list(formato_para_archivo(origen).leer(origen))
+    formato_para_archivo(destino).escribir(destino, datos)
+    return len(datos)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Uso: python formatos.py origen destino")
+        sys.exit(1)
+    print(f"✅ {convertir(sys.argv[1], sys.argv[2])} productos convertidos.")
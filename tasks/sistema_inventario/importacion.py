@@ -0,0 +1,95 @@
+import csv
+import json
+import os
+import time
+from itertools import islice
+
+TAMANO_LOTE = 10000  # Filas procesadas entre cada reporte de avance
+
+
+def leer_registros(ruta):
+    """Genera los registros de un archivo CSV (con encabezado) o JSONL, uno a uno.
+
+    De un JSONL se devuelve cada línea sin decodificar (ver _decodificar): así una
+    línea mal formada se rechaza como una fila más y no interrumpe la lectura.
+    """
+    with open(ruta, "r", encoding="utf-8", newline="") as file:
+        if os.path.splitext(ruta)[1].lower() == ".jsonl":
+            for linea in file:
+                if linea.strip():
+                    yield linea
+        else:
+            yield from csv.DictReader(file)
+
+
+def _decodificar(registro):
+    """Decodifica una línea JSONL; los registros de un CSV ya vienen como diccionario"""
+    return json.loads(registro) if isinstance(registro, str) else registro
+
+
+def _procesar_por_lotes(inventario, ruta, operacion, titulo):
+    """Aplica operacion(inventario, registro) a cada fila dentro de una sola transacción.
+
+    Las filas inválidas se cuentan y se omiten; el inventario se persiste una
+    sola vez al final. Devuelve (filas aplicadas, filas rechazadas).
+    """
+    aplicadas = rechazadas = 0
+    inicio = time.perf_counter()
+    registros = leer_registros(ruta)
+    with inventario.transaccion():
+        while True:
+            lote = list(islice(registros, TAMANO_LOTE))
+            if not lote:
+                break
+            for numero, registro in enumerate(lote, start=aplicadas + rechazadas + 1):
+                try:
+                    operacion(inventario, _decodificar(registro))
+                    aplicadas += 1
+                except (ValueError, KeyError, TypeError) as e:
+                    rechazadas += 1
+                    if rechazadas <= 10:
+                        print(f"⚠️ Fila {numero} omitida: {e}")
+            segundos = time.perf_counter() - inicio
+            print(f"⏳ {titulo}: {aplicadas + rechazadas} filas ({(aplicadas + rechazadas) / segundos:,.0f} filas/s)")
+    segundos = time.perf_counter() - inicio
+    print(f"✅ {titulo}: {aplicadas} filas aplicadas, {rechazadas} omitidas en {segundos:.2f} s "
+          f"({(aplicadas + rechazadas) / max(segundos, 1e-9):,.0f} filas/s)")
+    return aplicadas, rechazadas
+
+
+def _importar_registro(inventario, registro):
+    inventario.agregar_producto(str(registro["nombre"]), int(registro["cantidad"]), float(registro["precio"]))
+
+
+def _aplicar_delta(inventario, registro):
+    inventario.ajustar_cantidad(int(registro["id"]), int(registro["delta"]))
+
+
+def importar_productos(inventario, ruta):
+    """Agrega como productos nuevos las filas (nombre, cantidad, precio) de un CSV o JSONL"""
+    return _procesar_por_lotes(inventario, ruta, _importar_registro, "Importación")
+
+
+def aplicar_deltas(inventario, ruta):
+    """Suma a la cantidad de cada producto el delta indicado en las filas (id, delta)"""
+    return _procesar_por_lotes(inventario, ruta, _aplicar_delta, "Ajuste de cantidades")
+
+
+def exportar_productos(inventario, ruta):
+    """Escribe todos los productos en un CSV o JSONL, fila a fila; devuelve la cantidad exportada"""
+    inicio = time.perf_counter()
+    total = 0
+    with open(ruta, "w", encoding="utf-8", newline="") as file:
+        if os.path.splitext(ruta)[1].lower() == ".jsonl":
+            for producto in inventario.productos.values():
+                file.write(json.dumps(producto.to_dict(), ensure_ascii=False) + "\n")
+                total += 1
+        else:
+            escritor = csv.DictWriter(file, fieldnames=["id", "nombre", "cantidad", "precio"])
+            escritor.writeheader()
+            for producto in inventario.productos.values():
+                escritor.writerow(producto.to_dict())
+                total += 1
+    segundos = time.perf_counter() - inicio
+    print(f"✅ Exportación: {total} productos en {segundos:.2f} s ({total / max(segundos, 1e-9):,.0f} filas/s)")
+    return total
@@ -0,0 +1,69 @@
+from collections import defaultdict
+
+
+def trigramas(texto):
+    """Devuelve el conjunto de subcadenas de 3 caracteres de un texto"""
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+class IndiceTrigramas:
+    """Índice invertido de trigramas sobre los nombres de los productos.
+
+    Cada trigrama del nombre en minúsculas apunta al conjunto de IDs que lo
+    contienen. Una búsqueda por subcadena intersecta las listas de sus trigramas
+    (empezando por la más corta) y solo verifica los candidatos resultantes.
+    """
+
+    def __init__(self):
+        self._posiciones = defaultdict(set)  # Trigrama -> {id_producto}
+        self._nombres = {}  # id_producto -> nombre en minúsculas
+
+    def __len__(self):
+        return len(self._nombres)
+
+    def agregar(self, id_producto, nombre):
+        """Indexa el nombre de un producto (reemplaza el anterior si existía)"""
+        if id_producto in self._nombres:
+            self.quitar(id_producto)
+        nombre = nombre.lower()
+        self._nombres[id_producto] = nombre
+        for trigrama in trigramas(nombre):
+            self._posiciones[trigrama].add(id_producto)
+
+    def quitar(self, id_producto):
+        """Elimina un producto del índice"""
+        nombre = self._nombres.pop(id_producto, None)
+        if nombre is None:
+            return
+        for trigrama in trigramas(nombre):
+            ids = self._posiciones[trigrama]
+            ids.discard(id_producto)
+            if not ids:
+                del self._posiciones[trigrama]
+
+    def limpiar(self):
+        self._posiciones.clear()
+        self._nombres.clear()
+
+    def buscar(self, texto):
+        """Devuelve los IDs cuyo nombre contiene el texto (sin distinguir mayúsculas)"""
+        texto = texto.lower()
+        if len(texto) < 3:
+            # Consultas demasiado cortas para el índice: recorrido lineal
+            return [i for i, nombre in self._nombres.items() if texto in nombre]
+
+        listas = []
+        for trigrama in trigramas(texto):
+            ids = self._posiciones.get(trigrama)
+            if not ids:
+                return []
+            listas.append(ids)
+        listas.sort(key=len)
+
+        candidatos = listas[0]
+        for ids in listas[1:]:
+            candidatos = candidatos & ids
+            if not candidatos:
+                return []
+        # Los trigramas no garantizan el orden: se confirma la subcadena
+        return [i for i in candidatos if texto in self._nombres[i]]
@@ -1,109 +1,544 @@
 import os
 import json
+import threading
+from contextlib import contextmanager
+from functools import wraps
 from producto import Producto
+from indice_nombres import IndiceTrigramas
+from almacen_columnar import AlmacenColumnar
+from formatos import formato_para_archivo
+from cerrojo import CerrojoArchivo
+from listado import paginar, crear_filtro
+from movimientos import LibroMovimientos
+from reposicion import AlertasReposicion
+
+
+def _sincronizado(metodo):
+    """Ejecuta el método con acceso exclusivo al inventario (ver Inventario._exclusivo)"""
+    @wraps(metodo)
+    def envoltura(self, *args, **kwargs):
+        with self._exclusivo():
+            return metodo(self, *args, **kwargs)
+    return envoltura
+
 
 class Inventario:
-    def __init__(self, archivo="inventario.json"):
+    def __init__(self, archivo="inventario.json", diario=False, limite_diario=10000, silencioso=False,
+                 columnar=False, progreso=None, formato=None, multiproceso=False, movimientos=False,
+                 reposicion=False):
         self.archivo = archivo
-        self.productos = {}  # Diccionario de productos {id: Producto}
+        # Formato de la instantánea (JSON o binario), deducido de la extensión si no se indica
+        self.formato = formato or formato_para_archivo(archivo)
+        # Diccionario de productos {id: Producto}; en modo columnar los datos se guardan
+        # en arrays compactos y se accede a ellos con la misma API
+        self.productos = AlmacenColumnar() if columnar else {}
         self.ultimo_id = 0  # Último ID utilizado
-        self.cargar_desde_archivo()  # Cargar datos al iniciar
+        self.indice_nombres = IndiceTrigramas()  # Índice de subcadenas sobre los nombres
+        self._indice_listo = False  # El índice se construye en la primera búsqueda
+        # Modo diario: cada cambio se añade como una línea compacta al final del
+        # archivo .log en lugar de reescribir toda la instantánea
+        self.diario = diario
+        self.archivo_diario = archivo + ".log"
+        self.archivo_compactando = archivo + ".log.compactando"
+        self.limite_diario = limite_diario  # Registros acumulados antes de compactar
+        self._registros_diario = 0
+        self._hilo_compactacion = None
+        self.silencioso = silencioso  # Omite los mensajes de éxito por operación
+        self._transaccion = None  # Registros pendientes {id: registro} de la transacción activa
+        self._deshacer = {}  # Estado previo {id: dict o None} de lo modificado en la transacción
+        # Historial de entradas y salidas de stock en el archivo .mov (opcional)
+        self.movimientos = LibroMovimientos(archivo + ".mov") if movimientos else None
+        self._movimientos_pendientes = []  # Movimientos de la transacción activa
+        # Las columnas, el archivo .mov y la instantánea binaria solo guardan cantidades enteras
+        self._cantidades_enteras = columnar or movimientos or getattr(self.formato, "cantidades_enteras", False)
+        # Puntos de reorden y cola de productos por reponer, en el archivo .reposicion.json (opcional)
+        self.reposicion = AlertasReposicion(archivo + ".reposicion.json") if reposicion else None
+        # Todas las operaciones públicas se serializan con este cerrojo (seguro entre hilos).
+        # Con multiproceso=True además se toma un cerrojo de archivo y, antes de cada
+        # operación, se incorporan los cambios que otros procesos dejaron en disco.
+        self._cerrojo = threading.RLock()
+        self.multiproceso = multiproceso
+        self._cerrojo_archivo = CerrojoArchivo(archivo + ".lock") if multiproceso else None
+        self._marca_instantanea = None  # (inodo, mtime, tamaño) de la última instantánea vista
+        self._marca_diario = (None, 0)  # (inodo, bytes ya aplicados) del diario
+        with self._exclusivo(sincronizar=False):
+            self.cargar_desde_archivo(progreso)  # Cargar datos al iniciar
+
+    @contextmanager
+    def _exclusivo(self, sincronizar=True):
+        """Acceso exclusivo entre hilos y, en modo multiproceso, también entre procesos"""
+        with self._cerrojo:
+            if self._cerrojo_archivo is None:
+                yield
+                return
+            with self._cerrojo_archivo:
+                if sincronizar and self._cerrojo_archivo.nivel == 1:
+                    self._sincronizar_con_disco()
+                yield
+
+    def _marca(self, ruta):
+        try:
+            estado = os.stat(ruta)
+        except FileNotFoundError:
+            return None
+        return estado.st_ino, estado.st_mtime_ns, estado.st_size
+
+    def _sincronizar_con_disco(self):
+        """Incorpora los cambios que otros procesos escribieron desde la última operación"""
+        if self.movimientos is not None:
+            self.movimientos.sincronizar()
+        if self._marca(self.archivo) != self._marca_instantanea:
+            # Otro proceso reescribió la instantánea (guardado completo o compactación)
+            ultimo_id = self.ultimo_id
+            self.cargar_desde_archivo()
+            self.ultimo_id = max(self.ultimo_id, ultimo_id)
+            return
+        if not self.diario:
+            return
+        marca = self._marca(self.archivo_diario)
+        if marca is None:
+            return
+        inodo, posicion = self._marca_diario
+        if marca[0] != inodo:
+            posicion = 0  # Diario nuevo creado por otro proceso tras una compactación
+        if marca[2] > posicion:
+            aplicados, posicion = self._leer_diario(self.archivo_diario, posicion)
+            self._registros_diario += aplicados
+        self._marca_diario = (marca[0], posicion)
 
     def generar_id(self):
         """Genera un ID único para cada producto"""
         self.ultimo_id += 1
         return self.ultimo_id
 
-    def cargar_desde_archivo(self):
-        """Carga el inventario desde un archivo JSON"""
+    def cargar_desde_archivo(self, progreso=None):
+        """Carga el inventario desde su instantánea y, en modo diario, reaplica los cambios registrados.
+
+        Los productos se leen uno a uno sin cargar la lista JSON completa en memoria;
+        progreso(bytes_leidos, bytes_totales, registros) permite mostrar el avance.
+        Una instantánea binaria en modo columnar se carga directamente en las columnas.
+        """
+        self._reconstruir_indices()
         if not os.path.exists(self.archivo):
-            print("Archivo de inventario no encontrado. Se creará uno nuevo.")
+            self._informar("Archivo de inventario no encontrado. Se creará uno nuevo.")
+        else:
+            self.productos.clear()
+            self._marca_instantanea = self._marca(self.archivo)
+            try:
+                if hasattr(self.productos, "cargar_columnas") and hasattr(self.formato, "leer_columnas"):
+                    self.productos.cargar_columnas(*self.formato.leer_columnas(self.archivo))
+                else:
+                    for item in self.formato.leer(self.archivo, progreso):
+                        self.productos[int(item["id"])] = Producto.from_dict(item)
+                self.ultimo_id = max(self.productos, default=0)  # Actualizar ID máximo
+                self._informar("📂 Inventario cargado correctamente.")
+            except (ValueError, FileNotFoundError):
+                self.productos.clear()
+                print("⚠️ Error: Archivo vacío o corrupto. Se iniciará un nuevo inventario.")
+            except PermissionError:
+                print("🚫 Error: No se tiene permiso para leer el archivo.")
+
+        if self.diario:
+            self._reproducir_diario()
+        if self.reposicion is not None:
+            self.reposicion.cargar_cantidades(self.productos)
+
+    def _reconstruir_indices(self):
+        """Descarta los índices; se volverán a construir cuando se necesiten"""
+        self.indice_nombres.limpiar()
+        self._indice_listo = False
+
+    def _asegurar_indice(self):
+        if not self._indice_listo:
+            for id_producto, producto in self.productos.items():
+                self.indice_nombres.agregar(id_producto, producto.get_nombre())
+            self._indice_listo = True
+
+    def _indexar(self, id_producto, nombre):
+        if self._indice_listo:
+            self.indice_nombres.agregar(id_producto, nombre)
+
+    def _poner(self, producto):
+        """Inserta o reemplaza un producto manteniendo los índices"""
+        self.productos[producto.get_id()] = producto
+        self._indexar(producto.get_id(), producto.get_nombre())
+        self._cantidad_cambiada(producto)
+
+    def _quitar(self, id_producto):
+        """Elimina un producto manteniendo los índices"""
+        del self.productos[id_producto]
+        if self._indice_listo:
+            self.indice_nombres.quitar(id_producto)
+        if self.reposicion is not None:
+            self.reposicion.producto_eliminado(id_producto)
+
+    def _cantidad_cambiada(self, producto):
+        if self.reposicion is not None:
+            self.reposicion.cantidad_cambiada(producto.get_id(), producto.get_cantidad())
+
+    def _reproducir_diario(self):
+        """Aplica sobre la instantánea los registros pendientes del diario"""
+        pendiente_compactacion = os.path.exists(self.archivo_compactando)
+        aplicados = 0
+        self._marca_diario = (None, 0)
+        # El archivo en compactación es más antiguo que el diario actual
+        if pendiente_compactacion:
+            aplicados += self._leer_diario(self.archivo_compactando)[0]
+        marca = self._marca(self.archivo_diario)
+        if marca is not None:
+            leidos, posicion = self._leer_diario(self.archivo_diario)
+            aplicados += leidos
+            self._marca_diario = (marca[0], posicion)
+
+        if pendiente_compactacion:
+            # Una compactación anterior no terminó: se consolida todo ahora
+            self.guardar_en_archivo()
+        else:
+            self._registros_diario = aplicados
+        if aplicados:
+            self._informar(f"📜 {aplicados} cambios recuperados del diario.")
+
+    def _leer_diario(self, ruta, desde=0):
+        """Aplica los registros de un diario a partir de un byte; devuelve (aplicados, posición final).
+
+        Una última línea incompleta (cierre inesperado durante una escritura) se
+        elimina del archivo para que los registros siguientes no queden pegados a ella.
+        """
+        aplicados = 0
+        posicion = desde
+        with open(ruta, "rb") as file:
+            file.seek(desde)
+            for linea in file:
+                try:
+                    registro = json.loads(linea) if linea.endswith(b"\n") else None
+                except json.JSONDecodeError:
+                    registro = None
+                if registro is None:
+                    print("⚠️ Registro incompleto en el diario, se descarta.")
+                    break
+                self._aplicar_registro(registro)
+                aplicados += 1
+                posicion += len(linea)
+        if posicion < os.path.getsize(ruta):
+            os.truncate(ruta, posicion)
+        return aplicados, posicion
+
+    def _aplicar_registro(self, registro):
+        """Aplica en memoria un registro del diario"""
+        id_producto = int(registro["id"])
+        if registro["op"] == "p":
+            self._poner(Producto.from_dict(registro))
+            self.ultimo_id = max(self.ultimo_id, id_producto)
+        elif registro["op"] == "d" and id_producto in self.productos:
+            self._quitar(id_producto)
+
+    def _escribir_instantanea(self, datos):
+        """Escribe la lista de diccionarios en el archivo principal de forma atómica"""
+        temporal = self.archivo + ".tmp"
+        self.formato.escribir(temporal, datos)
+        os.replace(temporal, self.archivo)
+        self._marca_instantanea = self._marca(self.archivo)
+
+    def _esperar_compactacion(self):
+        if self._hilo_compactacion is not None:
+            self._hilo_compactacion.join()
+            self._hilo_compactacion = None
+
+    @_sincronizado
+    def guardar_en_archivo(self):
+        """Guarda el inventario completo en el archivo de instantánea"""
+        self._esperar_compactacion()
+        try:
+            self._escribir_instantanea([p.to_dict() for p in self.productos.values()])
+            if self.diario:
+                # La instantánea ya contiene todos los cambios del diario
+                for ruta in (self.archivo_compactando, self.archivo_diario):
+                    if os.path.exists(ruta):
+                        os.remove(ruta)
+                self._registros_diario = 0
+                self._marca_diario = (None, 0)
+            self._informar("💾 Inventario guardado correctamente.")
+        except PermissionError:
+            print("🚫 Error: No se tiene permiso para escribir en el archivo.")
+
+    @_sincronizado
+    def compactar(self, en_segundo_plano=False):
+        """Integra el diario en la instantánea.
+
+        El diario actual se renombra antes de copiar los productos, de modo que los
+        cambios posteriores van a un diario nuevo mientras se escribe la instantánea.
+        En modo multiproceso la compactación siempre termina antes de soltar el cerrojo.
+        """
+        self._esperar_compactacion()
+        if not os.path.exists(self.archivo_diario):
             return
+        os.replace(self.archivo_diario, self.archivo_compactando)
+        self._registros_diario = 0
+        self._marca_diario = (None, 0)
+        en_segundo_plano = en_segundo_plano and not self.multiproceso
+        datos = [p.to_dict() for p in self.productos.values()]
+        if en_segundo_plano:
+            self._hilo_compactacion = threading.Thread(target=self._finalizar_compactacion, args=(datos,))
+            self._hilo_compactacion.start()
+        else:
+            self._finalizar_compactacion(datos)
 
+    def _finalizar_compactacion(self, datos):
         try:
-            with open(self.archivo, "r", encoding="utf-8") as file:
-                datos = json.load(file)  # Leer datos en formato JSON
-                self.productos = {int(item["id"]): Producto.from_dict(item) for item in datos}
-                self.ultimo_id = max(self.productos.keys(), default=0)  # Actualizar ID máximo
-                print("📂 Inventario cargado correctamente.")
-        except (json.JSONDecodeError, FileNotFoundError):
-            print("⚠️ Error: Archivo vacío o corrupto. Se iniciará un nuevo inventario.")
+            self._escribir_instantanea(datos)
+            os.remove(self.archivo_compactando)
         except PermissionError:
-            print("🚫 Error: No se tiene permiso para leer el archivo.")
+            print("🚫 Error: No se pudo compactar el diario del inventario.")
 
-    def guardar_en_archivo(self):
-        """Guarda el inventario en un archivo JSON"""
+    def _escribir_diario(self, registros):
+        """Añade registros compactos al final del diario"""
         try:
-            with open(self.archivo, "w", encoding="utf-8") as file:
-                datos = [p.to_dict() for p in self.productos.values()]
-                json.dump(datos, file, indent=4, ensure_ascii=False)
-                print("💾 Inventario guardado correctamente.")
+            with open(self.archivo_diario, "ab") as file:
+                file.write("".join(json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n"
+                                   for r in registros).encode("utf-8"))
+                # Con el cerrojo tomado, todo lo que hay hasta aquí ya está aplicado en memoria
+                self._marca_diario = (os.fstat(file.fileno()).st_ino, file.tell())
         except PermissionError:
-            print("🚫 Error: No se tiene permiso para escribir en el archivo.")
+            print("🚫 Error: No se tiene permiso para escribir en el diario.")
+            return
+        self._registros_diario += len(registros)
+        if self._registros_diario >= self.limite_diario:
+            self.compactar(en_segundo_plano=True)
+
+    def _persistir(self, registro):
+        """Persiste un cambio: en el diario si está activo, o reescribiendo el archivo"""
+        if self._transaccion is not None:
+            # Solo se conserva el último estado de cada producto hasta confirmar
+            self._transaccion[registro["id"]] = registro
+        elif self.diario:
+            self._escribir_diario([registro])
+        else:
+            self.guardar_en_archivo()
+
+    def _registrar_movimiento(self, id_producto, diferencia):
+        """Anota una entrada o salida de stock; en una transacción espera a la confirmación"""
+        if self.movimientos is None or not diferencia:
+            return
+        if self._transaccion is not None:
+            self._movimientos_pendientes.append((id_producto, diferencia, None))
+        else:
+            self.movimientos.registrar(id_producto, diferencia)
+
+    def _recordar(self, id_producto):
+        """Guarda el estado previo de un producto la primera vez que cambia en la transacción"""
+        if self._transaccion is not None and id_producto not in self._deshacer:
+            producto = self.productos.get(id_producto)
+            self._deshacer[id_producto] = producto.to_dict() if producto else None
+
+    def _cantidad_entera(self, cantidad):
+        """Devuelve la cantidad tal como se guardará; si el almacenamiento solo admite enteros, debe serlo (7.0 -> 7)"""
+        if not self._cantidades_enteras or isinstance(cantidad, int):
+            return cantidad
+        if float(cantidad).is_integer():
+            return int(cantidad)
+        raise ValueError("La cantidad debe ser un número entero.")
+
+    def _rechazar(self, mensaje):
+        """Informa un error de validación; dentro de una transacción lo convierte en excepción"""
+        if self._transaccion is not None:
+            raise ValueError(mensaje)
+        print(mensaje)
+        return False
 
+    def _informar(self, mensaje):
+        if not self.silencioso and self._transaccion is None:
+            print(mensaje)
+
+    @contextmanager
+    def transaccion(self, silenciosa=False):
+        """Agrupa varios cambios y los persiste una sola vez al confirmar.
+
+        Si una validación falla (ValueError) o se produce cualquier otra excepción,
+        el inventario en memoria vuelve al estado anterior y no se escribe nada;
+        con silenciosa=True la reversión no se anuncia por pantalla.
+        Las transacciones anidadas se integran en la exterior. Mientras dura la
+        transacción ningún otro hilo (ni proceso, en modo multiproceso) modifica el inventario.
+        """
+        with self._exclusivo():
+            if self._transaccion is not None:
+                yield self
+                return
+
+            self._transaccion = {}
+            self._deshacer = {}
+            ultimo_id = self.ultimo_id
+            try:
+                yield self
+            except BaseException:
+                for id_producto, datos in self._deshacer.items():
+                    if datos is None:
+                        if id_producto in self.productos:
+                            self._quitar(id_producto)
+                    else:
+                        self._poner(Producto.from_dict(datos))
+                self.ultimo_id = ultimo_id
+                self._movimientos_pendientes = []
+                if not silenciosa:
+                    print("↩️ Transacción revertida.")
+                raise
+            finally:
+                pendientes = list(self._transaccion.values())
+                self._transaccion = None
+                self._deshacer = {}
+
+            if pendientes:
+                if self.diario:
+                    self._escribir_diario(pendientes)
+                else:
+                    self.guardar_en_archivo()
+            if self._movimientos_pendientes:
+                self.movimientos.registrar_lote(self._movimientos_pendientes)
+                self._movimientos_pendientes = []
+            self._informar(f"✅ Transacción confirmada: {len(pendientes)} productos modificados.")
+
+    @_sincronizado
     def agregar_producto(self, nombre, cantidad, precio):
         """Agrega un nuevo producto al inventario y lo guarda en el archivo"""
         if not nombre.strip():
-            print("❌ El nombre no puede estar vacío.")
-            return False
+            return self._rechazar("❌ El nombre no puede estar vacío.")
         if cantidad < 0:
-            print("❌ La cantidad no puede ser negativa.")
-            return False
+            return self._rechazar("❌ La cantidad no puede ser negativa.")
+        try:
+            cantidad = self._cantidad_entera(cantidad)
+        except ValueError as e:
+            return self._rechazar(f"❌ {str(e)}")
         if precio <= 0:
-            print("❌ El precio debe ser mayor que 0.")
-            return False
+            return self._rechazar("❌ El precio debe ser mayor que 0.")
 
         nuevo_id = self.generar_id()
+        self._recordar(nuevo_id)
         nuevo_producto = Producto(nuevo_id, nombre, cantidad, precio)
-        self.productos[nuevo_id] = nuevo_producto
-        self.guardar_en_archivo()
-        print(f"✅ Producto '{nombre}' agregado exitosamente.")
+        self._poner(nuevo_producto)
+        self._persistir({"op": "p", **nuevo_producto.to_dict()})
+        self._registrar_movimiento(nuevo_id, cantidad)
+        self._informar(f"✅ Producto '{nombre}' agregado exitosamente.")
         return True
 
+    @_sincronizado
     def eliminar_producto(self, id_producto):
         """Elimina un producto por su ID y actualiza el archivo"""
         if id_producto in self.productos:
-            del self.productos[id_producto]
-            self.guardar_en_archivo()
-            print("✅ Producto eliminado exitosamente.")
+            self._recordar(id_producto)
+            self._quitar(id_producto)
+            self._persistir({"op": "d", "id": id_producto})
+            self._informar("✅ Producto eliminado exitosamente.")
             return True
-        print("❌ Producto no encontrado.")
-        return False
+        return self._rechazar("❌ Producto no encontrado.")
 
+    @_sincronizado
+    def actualizar_nombre(self, id_producto, nuevo_nombre):
+        """Cambia el nombre de un producto y lo reindexa"""
+        if id_producto in self.productos:
+            try:
+                self._recordar(id_producto)
+                producto = self.productos[id_producto]
+                producto.set_nombre(nuevo_nombre)
+                self._indexar(id_producto, nuevo_nombre)
+                self._persistir({"op": "p", **producto.to_dict()})
+                self._informar("✅ Nombre actualizado exitosamente.")
+                return True
+            except ValueError as e:
+                return self._rechazar(f"❌ {str(e)}")
+        return self._rechazar("❌ Producto no encontrado.")
+
+    @_sincronizado
     def actualizar_cantidad(self, id_producto, nueva_cantidad):
         """Actualiza la cantidad de un producto"""
         if id_producto in self.productos:
             try:
+                nueva_cantidad = self._cantidad_entera(nueva_cantidad)
+                self._recordar(id_producto)
+                anterior = self.productos[id_producto].get_cantidad()
                 self.productos[id_producto].set_cantidad(nueva_cantidad)
-                self.guardar_en_archivo()
-                print("✅ Cantidad actualizada exitosamente.")
+                self._cantidad_cambiada(self.productos[id_producto])
+                self._persistir({"op": "p", **self.productos[id_producto].to_dict()})
+                self._registrar_movimiento(id_producto, nueva_cantidad - anterior)
+                self._informar("✅ Cantidad actualizada exitosamente.")
                 return True
             except ValueError as e:
-                print(f"❌ {str(e)}")
-                return False
-        print("❌ Producto no encontrado.")
-        return False
+                return self._rechazar(f"❌ {str(e)}")
+        return self._rechazar("❌ Producto no encontrado.")
+
+    @_sincronizado
+    def ajustar_cantidad(self, id_producto, diferencia):
+        """Suma (o resta, si es negativa) una diferencia a la cantidad de forma atómica"""
+        if id_producto in self.productos:
+            return self.actualizar_cantidad(id_producto, self.productos[id_producto].get_cantidad() + diferencia)
+        return self._rechazar("❌ Producto no encontrado.")
 
+    @_sincronizado
     def actualizar_precio(self, id_producto, nuevo_precio):
         """Actualiza el precio de un producto"""
         if id_producto in self.productos:
             try:
+                self._recordar(id_producto)
                 self.productos[id_producto].set_precio(nuevo_precio)
-                self.guardar_en_archivo()
-                print("✅ Precio actualizado exitosamente.")
+                self._persistir({"op": "p", **self.productos[id_producto].to_dict()})
+                self._informar("✅ Precio actualizado exitosamente.")
                 return True
             except ValueError as e:
-                print(f"❌ {str(e)}")
-                return False
-        print("❌ Producto no encontrado.")
-        return False
+                return self._rechazar(f"❌ {str(e)}")
+        return self._rechazar("❌ Producto no encontrado.")
 
+    @_sincronizado
     def buscar_por_nombre(self, nombre):
-        """Busca productos por nombre"""
-        nombre = nombre.lower()
-        resultados = [p for p in self.productos.values() if nombre in p.get_nombre().lower()]
-        return resultados
+        """Busca productos cuyo nombre contiene el texto, usando el índice de trigramas"""
+        self._asegurar_indice()
+        ids = sorted(self.indice_nombres.buscar(nombre))
+        return [self.productos[i] for i in ids]
+
+    @_sincronizado
+    def listar(self, tamano_pagina=20, cursor=None, ordenar_por="id", descendente=False, nombre=None,
+               cantidad_min=None, cantidad_max=None, precio_min=None, precio_max=None):
+        """Devuelve una página de productos filtrados y ordenados (ver listado.paginar).
+
+        Para la página siguiente se vuelve a llamar con el mismo orden y filtros y
+        cursor=pagina.cursor. El filtro por nombre usa el índice de trigramas.
+        """
+        if nombre:
+            self._asegurar_indice()
+            productos = (self.productos[i] for i in self.indice_nombres.buscar(nombre))
+        else:
+            productos = self.productos.values()
+        filtro = crear_filtro(cantidad_min, cantidad_max, precio_min, precio_max)
+        return paginar(productos, ordenar_por, descendente, cursor, tamano_pagina, filtro)
+
+    @_sincronizado
+    def definir_punto_reorden(self, id_producto, punto_reorden, consumo_diario=None):
+        """Fija el punto de reorden de un producto (requiere reposicion=True)"""
+        if self.reposicion is None:
+            return self._rechazar("❌ Las alertas de reposición no están activadas.")
+        if id_producto not in self.productos:
+            return self._rechazar("❌ Producto no encontrado.")
+        try:
+            self.reposicion.definir_punto(id_producto, self.productos[id_producto].get_cantidad(),
+                                          punto_reorden, consumo_diario)
+        except ValueError as e:
+            return self._rechazar(str(e))
+        self._informar("✅ Punto de reorden actualizado exitosamente.")
+        return True
+
+    @_sincronizado
+    def recalcular_consumos(self, dias=30):
+        """Toma el consumo diario de cada producto del historial de movimientos de los últimos 'dias' días"""
+        if self.reposicion is None or self.movimientos is None:
+            return self._rechazar("❌ Se necesitan las alertas de reposición y el historial de movimientos.")
+        self.reposicion.actualizar_consumos(self.movimientos.consumo_diario(dias))
+        return True
+
+    @_sincronizado
+    def productos_por_reponer(self, limite=None):
+        """Productos en su punto de reorden como lista de (Producto, días de stock restantes), más urgentes primero"""
+        if self.reposicion is None:
+            return []
+        return [(self.productos[i], dias) for i, dias in self.reposicion.por_reponer(limite)]
 
+    @_sincronizado
     def mostrar_inventario(self):
         """Muestra todos los productos en el inventario"""
         if not self.productos:
@@ -0,0 +1,218 @@
+import sqlite3
+from contextlib import contextmanager
+from producto import Producto
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS productos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nombre TEXT NOT NULL,
+    cantidad INTEGER NOT NULL CHECK (cantidad >= 0),
+    precio REAL NOT NULL CHECK (precio > 0)
+);
+CREATE INDEX IF NOT EXISTS idx_productos_nombre ON productos (nombre COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_productos_cantidad ON productos (cantidad);
+"""
+
+# Índice de trigramas de SQLite (FTS5) para buscar subcadenas del nombre sin recorrer la tabla.
+# Se mantiene desde Python en lugar de con triggers: en inserciones masivas es varias veces más rápido.
+ESQUEMA_FTS = """
+CREATE VIRTUAL TABLE productos_fts USING fts5(
+    nombre, content='productos', content_rowid='id', tokenize='trigram'
+)
+"""
+
+
+def _minusculas(texto):
+    """lower() de Python para SQLite, cuyo LOWER y LIKE solo ignoran mayúsculas en ASCII"""
+    return texto.lower() if isinstance(texto, str) else texto
+
+
+class InventarioSQLite:
+    """Inventario guardado en una base de datos SQLite local.
+
+    Ofrece los mismos métodos públicos que Inventario, pero cada operación
+    actualiza solo la fila afectada y los productos no se cargan en memoria,
+    así que el inventario puede ser más grande que la RAM disponible.
+    """
+
+    def __init__(self, archivo="inventario.db", silencioso=False):
+        self.archivo = archivo
+        self.silencioso = silencioso  # Omite los mensajes de éxito por operación
+        self._en_transaccion = False
+        self.conexion = sqlite3.connect(archivo)
+        self.conexion.create_function("minusculas", 1, _minusculas, deterministic=True)
+        self.conexion.execute("PRAGMA journal_mode = WAL")
+        self.conexion.executescript(ESQUEMA)
+        self.usa_fts = self._preparar_fts()
+        self.conexion.commit()
+
+    def _preparar_fts(self):
+        """Crea el índice de trigramas si hace falta; False si SQLite no lo soporta"""
+        existe = self.conexion.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'productos_fts'").fetchone()
+        if existe:
+            return True
+        try:
+            self.conexion.execute(ESQUEMA_FTS)
+        except sqlite3.OperationalError:
+            # SQLite sin FTS5 o sin el tokenizador trigram: se busca con LIKE
+            return False
+        self.conexion.execute("INSERT INTO productos_fts (productos_fts) VALUES ('rebuild')")
+        return True
+
+    def _indexar_nombre(self, id_producto, nombre):
+        if self.usa_fts:
+            self.conexion.execute("INSERT INTO productos_fts (rowid, nombre) VALUES (?, ?)", (id_producto, nombre))
+
+    def _desindexar_nombre(self, id_producto, nombre):
+        if self.usa_fts:
+            self.conexion.execute("INSERT INTO productos_fts (productos_fts, rowid, nombre) VALUES ('delete', ?, ?)",
+                                  (id_producto, nombre))
+
+    def cerrar(self):
+        self.conexion.close()
+
+    def _rechazar(self, mensaje):
+        """Informa un error de validación; dentro de una transacción lo convierte en excepción"""
+        if self._en_transaccion:
+            raise ValueError(mensaje)
+        print(mensaje)
+        return False
+
+    def _informar(self, mensaje):
+        if not self.silencioso and not self._en_transaccion:
+            print(mensaje)
+
+    def _confirmar(self):
+        if not self._en_transaccion:
+            self.conexion.commit()
+
+    @contextmanager
+    def transaccion(self, silenciosa=False):
+        """Agrupa varios cambios en una sola transacción de SQLite.
+
+        Si una validación falla (ValueError) o se produce cualquier otra excepción
+        se hace rollback y no queda ningún cambio; con silenciosa=True la reversión
+        no se anuncia por pantalla.
+        """
+        if self._en_transaccion:
+            yield self
+            return
+
+        self._en_transaccion = True
+        try:
+            yield self
+            self.conexion.commit()
+        except BaseException:
+            self.conexion.rollback()
+            if not silenciosa:
+                print("↩️ Transacción revertida.")
+            raise
+        finally:
+            self._en_transaccion = False
+
+    def _fila_a_producto(self, fila):
+        return Producto(*fila) if fila else None
+
+    def obtener_producto(self, id_producto):
+        fila = self.conexion.execute(
+            "SELECT id, nombre, cantidad, precio FROM productos WHERE id = ?", (id_producto,)).fetchone()
+        return self._fila_a_producto(fila)
+
+    def agregar_producto(self, nombre, cantidad, precio):
+        """Agrega un nuevo producto al inventario"""
+        if not nombre.strip():
+            return self._rechazar("❌ El nombre no puede estar vacío.")
+        if cantidad < 0:
+            return self._rechazar("❌ La cantidad no puede ser negativa.")
+        if precio <= 0:
+            return self._rechazar("❌ El precio debe ser mayor que 0.")
+
+        cursor = self.conexion.execute("INSERT INTO productos (nombre, cantidad, precio) VALUES (?, ?, ?)",
+                                       (nombre, cantidad, precio))
+        self._indexar_nombre(cursor.lastrowid, nombre)
+        self._confirmar()
+        self._informar(f"✅ Producto '{nombre}' agregado exitosamente.")
+        return True
+
+    def eliminar_producto(self, id_producto):
+        """Elimina un producto por su ID"""
+        producto = self.obtener_producto(id_producto)
+        if producto is not None:
+            self._desindexar_nombre(id_producto, producto.get_nombre())
+            self.conexion.execute("DELETE FROM productos WHERE id = ?", (id_producto,))
+            self._confirmar()
+            self._informar("✅ Producto eliminado exitosamente.")
+            return True
+        return self._rechazar("❌ Producto no encontrado.")
+
+    def _actualizar(self, id_producto, metodo, valor, mensaje):
+        """Valida el nuevo valor con el setter de Producto y actualiza solo esa fila"""
+        producto = self.obtener_producto(id_producto)
+        if producto is None:
+            return self._rechazar("❌ Producto no encontrado.")
+        nombre_anterior = producto.get_nombre()
+        try:
+            getattr(producto, metodo)(valor)
+        except ValueError as e:
+            return self._rechazar(f"❌ {str(e)}")
+        if producto.get_nombre() != nombre_anterior:
+            self._desindexar_nombre(id_producto, nombre_anterior)
+            self._indexar_nombre(id_producto, producto.get_nombre())
+        self.conexion.execute("UPDATE productos SET nombre = ?, cantidad = ?, precio = ? WHERE id = ?",
+                              (producto.get_nombre(), producto.get_cantidad(), producto.get_precio(),
+                               id_producto))
+        self._confirmar()
+        self._informar(mensaje)
+        return True
+
+    def actualizar_nombre(self, id_producto, nuevo_nombre):
+        """Cambia el nombre de un producto"""
+        return self._actualizar(id_producto, "set_nombre", nuevo_nombre, "✅ Nombre actualizado exitosamente.")
+
+    def actualizar_cantidad(self, id_producto, nueva_cantidad):
+        """Actualiza la cantidad de un producto"""
+        return self._actualizar(id_producto, "set_cantidad", nueva_cantidad,
+                                "✅ Cantidad actualizada exitosamente.")
+
+    def actualizar_precio(self, id_producto, nuevo_precio):
+        """Actualiza el precio de un producto"""
+        return self._actualizar(id_producto, "set_precio", nuevo_precio, "✅ Precio actualizado exitosamente.")
+
+    def buscar_por_nombre(self, nombre):
+        """Busca productos cuyo nombre contiene el texto (sin distinguir mayúsculas)"""
+        if self.usa_fts and len(nombre) >= 3:
+            # Con el tokenizador trigram una frase entre comillas equivale a buscar la subcadena
+            frase = '"' + nombre.replace('"', '""') + '"'
+            filas = self.conexion.execute(
+                "SELECT p.id, p.nombre, p.cantidad, p.precio FROM productos_fts "
+                "JOIN productos p ON p.id = productos_fts.rowid WHERE productos_fts MATCH ? ORDER BY p.id", (frase,))
+        else:
+            # Se comparan los dos lados en minúsculas: LIKE no iguala "É" y "é"
+            texto = _minusculas(nombre)
+            patron = "%" + texto.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            filas = self.conexion.execute(
+                "SELECT id, nombre, cantidad, precio FROM productos "
+                "WHERE minusculas(nombre) LIKE ? ESCAPE '\\' ORDER BY id", (patron,))
+        return [Producto(*fila) for fila in filas]
+
+    def buscar_bajo_stock(self, umbral):
+        """Productos con cantidad menor que el umbral (usa el índice de cantidad)"""
+        filas = self.conexion.execute(
+            "SELECT id, nombre, cantidad, precio FROM productos WHERE cantidad < ? ORDER BY cantidad", (umbral,))
+        return [Producto(*fila) for fila in filas]
+
+    def contar_productos(self):
+        return self.conexion.execute("SELECT COUNT(*) FROM productos").fetchone()[0]
+
+    def mostrar_inventario(self):
+        """Muestra todos los productos en el inventario, leyéndolos fila a fila"""
+        filas = self.conexion.execute("SELECT id, nombre, cantidad, precio FROM productos ORDER BY id")
+        primera = filas.fetchone()
+        if primera is None:
+            print("\n📦 El inventario está vacío.")
+            return
+        print("\n📋 Productos en inventario:")
+        print(Producto(*primera))
+        for fila in filas:
+            print(Producto(*fila))
@@ -0,0 +1,68 @@
+import heapq
+from collections import namedtuple
+from itertools import count
+
+# Página de resultados: los productos mostrados, cuántos cumplen los filtros y el
+# cursor para pedir la página siguiente (None si no hay más)
+Pagina = namedtuple("Pagina", ["productos", "total", "cursor"])
+
+CLAVES_ORDEN = {
+    "id": lambda p: p.get_id(),
+    "nombre": lambda p: p.get_nombre().casefold(),
+    "cantidad": lambda p: p.get_cantidad(),
+    "precio": lambda p: p.get_precio(),
+}
+
+
+def crear_filtro(cantidad_min=None, cantidad_max=None, precio_min=None, precio_max=None):
+    """Devuelve un predicado para los rangos indicados (extremos incluidos) o None si no hay rangos"""
+    condiciones = []
+    if cantidad_min is not None:
+        condiciones.append(lambda p: p.get_cantidad() >= cantidad_min)
+    if cantidad_max is not None:
+        condiciones.append(lambda p: p.get_cantidad() <= cantidad_max)
+    if precio_min is not None:
+        condiciones.append(lambda p: p.get_precio() >= precio_min)
+    if precio_max is not None:
+        condiciones.append(lambda p: p.get_precio() <= precio_max)
+    if not condiciones:
+        return None
+    return lambda p: all(condicion(p) for condicion in condiciones)
+
+
+def paginar(productos, ordenar_por="id", descendente=False, cursor=None, tamano=20, filtro=None):
+    """Devuelve una Pagina con los 'tamano' productos que siguen al cursor.
+
+    No ordena todo el catálogo: en una sola pasada cuenta los productos que
+    cumplen el filtro y conserva en un montículo solo los tamano + 1 primeros
+    según el orden pedido. El cursor es la clave (valor, id) del último producto
+    de la página anterior, así que las páginas siguen siendo coherentes aunque se
+    agreguen o eliminen productos entre una consulta y otra.
+    """
+    if ordenar_por not in CLAVES_ORDEN:
+        raise ValueError(f"❌ No se puede ordenar por '{ordenar_por}'.")
+    if tamano < 1:
+        raise ValueError("❌ El tamaño de página debe ser mayor que 0.")
+    clave_campo = CLAVES_ORDEN[ordenar_por]
+
+    def clave(producto):
+        return clave_campo(producto), producto.get_id()
+
+    if filtro is not None:
+        productos = filter(filtro, productos)
+    contador = count()
+    productos = (producto for producto, _ in zip(productos, contador))
+    if cursor is not None:
+        cursor = tuple(cursor)
+        if descendente:
+            productos = (p for p in productos if clave(p) < cursor)
+        else:
+            productos = (p for p in productos if clave(p) > cursor)
+
+    seleccion = heapq.nlargest if descendente else heapq.nsmallest
+    elegidos = seleccion(tamano + 1, productos, key=clave)
+    # El contador avanzó una vez por cada producto que pasó el filtro
+    total = next(contador)
+
+    siguiente = clave(elegidos[tamano - 1]) if len(elegidos) > tamano else None
+    return Pagina(elegidos[:tamano], total, siguiente)
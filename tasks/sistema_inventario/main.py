@@ -1,4 +1,6 @@
+import argparse
 from inventario import Inventario
+from importacion import importar_productos, exportar_productos, aplicar_deltas
 
 def mostrar_menu():
     print("\n=== 📦 SISTEMA DE GESTIÓN DE INVENTARIOS ===")
@@ -11,8 +13,90 @@ def mostrar_menu():
     print("7. Salir")
     return input("Seleccione una opción: ")
 
+def mostrar_progreso(leidos, total, registros):
+    porcentaje = leidos * 100 // total if total else 100
+    # Solo se reescribe la línea cuando cambia el porcentaje
+    if porcentaje != getattr(mostrar_progreso, "ultimo", None):
+        mostrar_progreso.ultimo = porcentaje
+        print(f"\r⏳ Cargando inventario: {porcentaje}% ({registros} productos)", end="", flush=True)
+        if leidos >= total:
+            print()
+
+def imprimir_pagina(pagina, desde):
+    """Imprime solo los productos de la página (los demás nunca se formatean)"""
+    if not pagina.total:
+        print("\n📦 No hay productos que mostrar.")
+        return
+    hasta = desde + len(pagina.productos) - 1
+    print(f"\n📋 Productos {desde}-{hasta} de {pagina.total}:")
+    for producto in pagina.productos:
+        print(producto)
+
+def listar_paginado(inventario, tamano_pagina=20, **opciones):
+    """Muestra el inventario página a página; Enter avanza y 'q' termina"""
+    pagina = inventario.listar(tamano_pagina, **opciones)
+    desde = 1
+    imprimir_pagina(pagina, desde)
+    while pagina.cursor is not None:
+        if input("Enter para ver más, 'q' para salir: ").strip().lower() == "q":
+            break
+        desde += len(pagina.productos)
+        pagina = inventario.listar(tamano_pagina, cursor=pagina.cursor, **opciones)
+        imprimir_pagina(pagina, desde)
+
+def pedir_opciones_listado():
+    orden = input("Ordenar por (id/nombre/cantidad/precio) [id]: ").strip().lower() or "id"
+    if orden not in ("id", "nombre", "cantidad", "precio"):
+        print("⚠️ Orden no válido, se ordena por ID.")
+        orden = "id"
+    nombre = input("Filtrar por nombre (Enter para omitir): ").strip()
+    return {"ordenar_por": orden, "nombre": nombre or None}
+
+def crear_parser():
+    parser = argparse.ArgumentParser(description="Sistema de gestión de inventarios. "
+                                                 "Sin subcomando abre el menú interactivo.")
+    parser.add_argument("--archivo", default="inventario.json", help="Archivo del inventario (.json o .invb)")
+    subparsers = parser.add_subparsers(dest="comando")
+    importar = subparsers.add_parser("importar", help="Agregar productos desde un CSV o JSONL (nombre, cantidad, precio)")
+    importar.add_argument("origen")
+    exportar = subparsers.add_parser("exportar", help="Exportar todos los productos a un CSV o JSONL")
+    exportar.add_argument("destino")
+    deltas = subparsers.add_parser("aplicar-deltas", help="Sumar cantidades desde un CSV o JSONL (id, delta)")
+    deltas.add_argument("origen")
+    listar = subparsers.add_parser("listar", help="Mostrar una página de productos con filtros y orden")
+    listar.add_argument("--ordenar-por", choices=["id", "nombre", "cantidad", "precio"], default="id")
+    listar.add_argument("--descendente", action="store_true")
+    listar.add_argument("--nombre", help="Texto contenido en el nombre")
+    listar.add_argument("--cantidad-min", type=int)
+    listar.add_argument("--cantidad-max", type=int)
+    listar.add_argument("--precio-min", type=float)
+    listar.add_argument("--precio-max", type=float)
+    listar.add_argument("--limite", type=int, default=50, help="Productos a mostrar")
+    return parser
+
+def ejecutar_comando(argumentos):
+    """Ejecuta un subcomando masivo sin interacción; las importaciones se guardan una sola vez"""
+    inventario = Inventario(argumentos.archivo, diario=True, silencioso=True, progreso=mostrar_progreso)
+    if argumentos.comando == "importar":
+        importar_productos(inventario, argumentos.origen)
+    elif argumentos.comando == "exportar":
+        exportar_productos(inventario, argumentos.destino)
+    elif argumentos.comando == "aplicar-deltas":
+        aplicar_deltas(inventario, argumentos.origen)
+    elif argumentos.comando == "listar":
+        pagina = inventario.listar(argumentos.limite, ordenar_por=argumentos.ordenar_por,
+                                   descendente=argumentos.descendente, nombre=argumentos.nombre,
+                                   cantidad_min=argumentos.cantidad_min, cantidad_max=argumentos.cantidad_max,
+                                   precio_min=argumentos.precio_min, precio_max=argumentos.precio_max)
+        imprimir_pagina(pagina, 1)
+
 def main():
-    inventario = Inventario()
+    argumentos = crear_parser().parse_args()
+    if argumentos.comando:
+        ejecutar_comando(argumentos)
+        return
+
+    inventario = Inventario(argumentos.archivo, diario=True, progreso=mostrar_progreso)
 
     while True:
         opcion = mostrar_menu()
@@ -28,7 +112,7 @@ def main():
             inventario.eliminar_producto(id_producto)
 
         elif opcion == "6":
-            inventario.mostrar_inventario()
+            listar_paginado(inventario, **pedir_opciones_listado())
 
         elif opcion == "7":
             print("¡Gracias por usar el sistema!")
@@ -0,0 +1,229 @@
+import os
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from datetime import date, timedelta
+
+SEGUNDOS_DIA = 86400
+TAMANO_REGISTRO = 24  # instante (double), id (int64), diferencia (int64), little-endian
+
+
+def _dia(instante):
+    """Número de día UTC de un instante (segundos desde la época)"""
+    return int(instante // SEGUNDOS_DIA)
+
+
+def _fecha(dia):
+    return date(1970, 1, 1) + timedelta(days=dia)
+
+
+class LibroMovimientos:
+    """Historial append-only de movimientos de stock (entradas y salidas).
+
+    Los movimientos se guardan en tres arrays paralelos ordenados por instante,
+    así que un rango de tiempo se localiza con búsqueda binaria y se agrega en
+    una sola pasada. Para las consultas de un solo producto se construye (la
+    primera vez que se necesita) un índice {id: posiciones}. En disco cada
+    movimiento ocupa 24 bytes fijos al final del archivo .mov; al cargar se leen
+    todas las columnas de golpe sin decodificar registro a registro.
+
+    Los días se agrupan en UTC.
+    """
+
+    def __init__(self, archivo=None):
+        self.archivo = archivo
+        self._instantes = array("d")
+        self._ids = array("q")
+        self._diferencias = array("q")
+        self._por_producto = None  # {id: array de posiciones}, se construye bajo demanda
+        self._posicion = 0  # Bytes del archivo ya incorporados
+        if archivo:
+            self.sincronizar()
+
+    def __len__(self):
+        return len(self._ids)
+
+    # --- Persistencia ---
+
+    def sincronizar(self):
+        """Incorpora los movimientos añadidos al archivo (por este u otro proceso) desde la última lectura"""
+        try:
+            with open(self.archivo, "r+b") as file:
+                self._incorporar(file)
+        except FileNotFoundError:
+            return
+
+    def _incorporar(self, file):
+        """Lee de un archivo abierto los registros completos posteriores a _posicion"""
+        tamano = file.seek(0, os.SEEK_END)
+        completo = tamano - tamano % TAMANO_REGISTRO
+        if completo < tamano:
+            file.truncate(completo)  # Registro final incompleto por una escritura interrumpida
+        if completo <= self._posicion:
+            return
+        file.seek(self._posicion)
+        datos = file.read(completo - self._posicion)
+        self._posicion = completo
+        columnas = array("q")
+        columnas.frombytes(datos)
+        if sys.byteorder == "big":
+            columnas.byteswap()
+        instantes = array("d")
+        instantes.frombytes(columnas[0::3].tobytes())
+        self._agregar(instantes, columnas[1::3], columnas[2::3])
+
+    def _escribir(self, instantes, ids, diferencias):
+        columnas = array("q", bytes(TAMANO_REGISTRO * len(ids)))
+        columnas[0::3] = array("q", instantes.tobytes())
+        columnas[1::3] = ids
+        columnas[2::3] = diferencias
+        if sys.byteorder == "big":
+            columnas.byteswap()
+        with open(self.archivo, "a+b") as file:
+            # Lo que otros procesos añadieron sin que lo hayamos leído se incorpora antes de
+            # avanzar _posicion; si no, quedaría fuera de memoria para siempre
+            self._incorporar(file)
+            file.write(columnas.tobytes())
+            self._posicion = file.tell()
+
+    # --- Escritura ---
+
+    def registrar(self, id_producto, diferencia, instante=None):
+        """Añade un movimiento (diferencia positiva = entrada, negativa = salida)"""
+        self.registrar_lote([(id_producto, diferencia, instante)])
+
+    def registrar_lote(self, movimientos):
+        """Añade varios movimientos (id, diferencia, instante o None) con una sola escritura"""
+        ahora = time.time()
+        instantes, ids, diferencias = array("d"), array("q"), array("q")
+        for id_producto, diferencia, instante in movimientos:
+            if diferencia:
+                instantes.append(ahora if instante is None else instante)
+                ids.append(id_producto)
+                diferencias.append(diferencia)
+        if not ids:
+            return
+        if self.archivo:
+            self._escribir(instantes, ids, diferencias)
+        self._agregar(instantes, ids, diferencias)
+
+    def _agregar(self, instantes, ids, diferencias):
+        """Añade columnas en memoria manteniendo el orden por instante"""
+        ordenados = all(a <= b for a, b in zip(instantes, instantes[1:]))
+        if ordenados and (not self._instantes or not instantes or instantes[0] >= self._instantes[-1]):
+            inicio = len(self._ids)
+            self._instantes.extend(instantes)
+            self._ids.extend(ids)
+            self._diferencias.extend(diferencias)
+            if self._por_producto is not None:
+                for posicion in range(inicio, len(self._ids)):
+                    self._por_producto.setdefault(self._ids[posicion], array("q")).append(posicion)
+            return
+        # Movimientos con fecha anterior (reloj atrasado o fecha explícita): se reordena todo
+        filas = sorted(zip(self._instantes + instantes, self._ids + ids, self._diferencias + diferencias),
+                       key=lambda fila: fila[0])
+        self._instantes = array("d", (f[0] for f in filas))
+        self._ids = array("q", (f[1] for f in filas))
+        self._diferencias = array("q", (f[2] for f in filas))
+        self._por_producto = None
+
+    # --- Consultas ---
+
+    def _posiciones_producto(self, id_producto):
+        if self._por_producto is None:
+            self._por_producto = {}
+            for posicion, id_movimiento in enumerate(self._ids):
+                self._por_producto.setdefault(id_movimiento, array("q")).append(posicion)
+        return self._por_producto.get(id_producto, ())
+
+    def _rango(self, desde, hasta):
+        """Posiciones [inicio, fin) de los movimientos con desde <= instante < hasta"""
+        inicio = 0 if desde is None else bisect_left(self._instantes, desde)
+        fin = len(self._instantes) if hasta is None else bisect_left(self._instantes, hasta)
+        return inicio, fin
+
+    def _movimientos(self, id_producto, desde, hasta):
+        """Genera (instante, id, diferencia) del rango, de un producto o de todos"""
+        instantes, ids, diferencias = self._instantes, self._ids, self._diferencias
+        if id_producto is None:
+            inicio, fin = self._rango(desde, hasta)
+            return zip(instantes[inicio:fin], ids[inicio:fin], diferencias[inicio:fin])
+        posiciones = self._posiciones_producto(id_producto)
+        # Las posiciones están en orden de tiempo: se recortan con búsqueda binaria
+        tiempos = [instantes[p] for p in posiciones]
+        inicio = 0 if desde is None else bisect_left(tiempos, desde)
+        fin = len(tiempos) if hasta is None else bisect_left(tiempos, hasta)
+        return ((instantes[p], id_producto, diferencias[p]) for p in posiciones[inicio:fin])
+
+    def historial(self, id_producto, desde=None, hasta=None):
+        """Lista de (instante, diferencia) de un producto, en orden cronológico"""
+        return [(instante, diferencia) for instante, _, diferencia in self._movimientos(id_producto, desde, hasta)]
+
+    def resumen(self, desde=None, hasta=None):
+        """Unidades que entraron y salieron de cada producto en [desde, hasta): {id: (entradas, salidas)}"""
+        entradas, salidas = {}, {}
+        inicio, fin = self._rango(desde, hasta)
+        for id_producto, diferencia in zip(self._ids[inicio:fin], self._diferencias[inicio:fin]):
+            if diferencia > 0:
+                entradas[id_producto] = entradas.get(id_producto, 0) + diferencia
+            else:
+                salidas[id_producto] = salidas.get(id_producto, 0) - diferencia
+        return {id_producto: (entradas.get(id_producto, 0), salidas.get(id_producto, 0))
+                for id_producto in entradas.keys() | salidas.keys()}
+
+    def salidas_recientes(self, dias=30, ahora=None):
+        """Unidades que salieron de cada producto en los últimos 'dias' días: {id: unidades}"""
+        ahora = time.time() if ahora is None else ahora
+        inicio, fin = self._rango(ahora - dias * SEGUNDOS_DIA, None)
+        salidas = {}
+        for id_producto, diferencia in zip(self._ids[inicio:fin], self._diferencias[inicio:fin]):
+            if diferencia < 0:
+                salidas[id_producto] = salidas.get(id_producto, 0) - diferencia
+        return salidas
+
+    def consumo_diario(self, dias=30, ahora=None):
+        """Promedio de unidades vendidas por día de cada producto en los últimos 'dias' días"""
+        return {id_producto: unidades / dias for id_producto, unidades in self.salidas_recientes(dias, ahora).items()}
+
+    def por_dia(self, id_producto=None, desde=None, hasta=None):
+        """Entradas y salidas agrupadas por día: {fecha: (entradas, salidas)}, de un producto o de todos"""
+        dias = {}
+        for instante, _, diferencia in self._movimientos(id_producto, desde, hasta):
+            dia = _dia(instante)
+            entradas, salidas = dias.get(dia, (0, 0))
+            if diferencia > 0:
+                dias[dia] = (entradas + diferencia, salidas)
+            else:
+                dias[dia] = (entradas, salidas - diferencia)
+        return {_fecha(dia): totales for dia, totales in sorted(dias.items())}
+
+    def promedio_movil(self, id_producto=None, ventana=7, desde=None, hasta=None):
+        """Promedio móvil de salidas diarias: lista de (fecha, promedio de los últimos 'ventana' días).
+
+        Los días sin movimientos cuentan como cero; la serie va del primer día con
+        movimientos (o 'desde') hasta el último (o 'hasta').
+        """
+        salidas = {}
+        for instante, _, diferencia in self._movimientos(id_producto, desde, hasta):
+            if diferencia < 0:
+                dia = _dia(instante)
+                salidas[dia] = salidas.get(dia, 0) - diferencia
+        if desde is not None:
+            primero = _dia(desde)
+        elif salidas:
+            primero = min(salidas)
+        else:
+            return []
+        if hasta is not None:
+            ultimo = -int(-hasta // SEGUNDOS_DIA) - 1  # Último día con instantes < hasta
+        else:
+            ultimo = max(salidas, default=primero)
+        serie = []
+        suma = 0
+        for dia in range(primero, ultimo + 1):
+            suma += salidas.get(dia, 0)
+            if dia - ventana >= primero:
+                suma -= salidas.get(dia - ventana, 0)
+            serie.append((_fecha(dia), suma / ventana))
+        return serie
@@ -1,4 +1,6 @@
 class Producto:
+    __slots__ = ("id_producto", "nombre", "cantidad", "precio")  # Sin __dict__ por instancia
+
     def __init__(self, id_producto, nombre, cantidad, precio):
         self.id_producto = id_producto
         self.nombre = nombre
@@ -17,6 +19,12 @@ class Producto:
     def get_precio(self):
         return self.precio
 
+    def set_nombre(self, nuevo_nombre):
+        if nuevo_nombre.strip():
+            self.nombre = nuevo_nombre
+        else:
+            raise ValueError("❌ El nombre no puede estar vacío.")
+
     def set_cantidad(self, nueva_cantidad):
         if nueva_cantidad >= 0:
             self.cantidad = nueva_cantidad
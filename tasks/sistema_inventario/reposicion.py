@@ -0,0 +1,159 @@
+import heapq
+import json
+import math
+import os
+
+
+class AlertasReposicion:
+    """Puntos de reorden por producto y cola de prioridad de los que hay que reponer.
+
+    Los productos que están en su punto de reorden o por debajo se guardan en
+    un montículo ordenado por días de stock restantes (cantidad / consumo
+    diario). Se actualiza en cada cambio de cantidad: se añade una entrada
+    nueva y la anterior queda obsoleta (se descarta al encontrarla), así que
+    cada cambio cuesta O(log n) y los k productos más urgentes se obtienen en
+    O(k log n) sin recorrer el catálogo.
+
+    Los oyentes registrados con al_cruzar(funcion) se llaman con
+    (id, cantidad, punto_reorden, dias_restantes, bajo_umbral) cada vez que un
+    producto baja hasta su punto de reorden (bajo_umbral=True) o vuelve a superarlo.
+    """
+
+    def __init__(self, archivo=None):
+        self.archivo = archivo  # JSON {id: [punto_reorden, consumo_diario]}
+        self._puntos = {}
+        self._consumos = {}
+        self._cantidades = {}
+        self._versiones = {}
+        self._monticulo = []  # (clave, id, versión)
+        self._bajo_umbral = set()
+        self._oyentes = []
+        if archivo and os.path.exists(archivo):
+            with open(archivo, "r", encoding="utf-8") as file:
+                for id_producto, (punto, consumo) in json.load(file).items():
+                    self._puntos[int(id_producto)] = punto
+                    self._consumos[int(id_producto)] = consumo
+
+    def guardar(self):
+        if self.archivo:
+            datos = {id_producto: [punto, self._consumos.get(id_producto, 0)]
+                     for id_producto, punto in self._puntos.items()}
+            with open(self.archivo, "w", encoding="utf-8") as file:
+                json.dump(datos, file)
+
+    def al_cruzar(self, oyente):
+        """Registra una función que se llama cuando un producto cruza su punto de reorden"""
+        self._oyentes.append(oyente)
+
+    def dias_restantes(self, id_producto):
+        """Días hasta agotar el stock al ritmo de consumo actual (inf si no hay consumo)"""
+        consumo = self._consumos.get(id_producto, 0)
+        return self._cantidades.get(id_producto, 0) / consumo if consumo > 0 else math.inf
+
+    def _invalidar(self, id_producto):
+        """Vuelve obsoletas las entradas del producto que haya en el montículo"""
+        self._versiones[id_producto] = self._versiones.get(id_producto, 0) + 1
+
+    def _encolar(self, id_producto):
+        self._invalidar(id_producto)
+        entrada = (self.dias_restantes(id_producto), id_producto, self._versiones[id_producto])
+        heapq.heappush(self._monticulo, entrada)
+        if len(self._monticulo) > 2 * len(self._bajo_umbral) + 64:
+            self._reconstruir()
+
+    def _reconstruir(self):
+        """Descarta las entradas obsoletas y vuelve a formar el montículo en O(n)"""
+        version = max(self._versiones.values(), default=0) + 1
+        self._versiones = {id_producto: version for id_producto in self._bajo_umbral}
+        self._monticulo = [(self.dias_restantes(id_producto), id_producto, version)
+                           for id_producto in self._bajo_umbral]
+        heapq.heapify(self._monticulo)
+
+    def _evaluar(self, id_producto):
+        """Actualiza la posición del producto en el montículo y avisa si cruzó su punto de reorden"""
+        cantidad = self._cantidades[id_producto]
+        punto = self._puntos[id_producto]
+        bajo = cantidad <= punto
+        cruzo = bajo != (id_producto in self._bajo_umbral)
+        if bajo:
+            self._bajo_umbral.add(id_producto)
+            self._encolar(id_producto)
+        elif cruzo:
+            self._bajo_umbral.discard(id_producto)
+            self._invalidar(id_producto)
+        if cruzo:
+            for oyente in self._oyentes:
+                oyente(id_producto, cantidad, punto, self.dias_restantes(id_producto), bajo)
+
+    def definir_punto(self, id_producto, cantidad, punto_reorden, consumo_diario=None):
+        """Fija el punto de reorden (en unidades) y, opcionalmente, el consumo diario de un producto"""
+        if punto_reorden < 0:
+            raise ValueError("❌ El punto de reorden no puede ser negativo.")
+        if consumo_diario is not None and consumo_diario < 0:
+            raise ValueError("❌ El consumo diario no puede ser negativo.")
+        self._puntos[id_producto] = punto_reorden
+        if consumo_diario is not None:
+            self._consumos[id_producto] = consumo_diario
+        self._cantidades[id_producto] = cantidad
+        self._evaluar(id_producto)
+        self.guardar()
+
+    def _olvidar(self, id_producto):
+        """Deja de seguir la cantidad del producto; sus entradas del montículo quedan obsoletas"""
+        self._cantidades.pop(id_producto, None)
+        self._invalidar(id_producto)
+        self._bajo_umbral.discard(id_producto)
+
+    def quitar_punto(self, id_producto):
+        if self._puntos.pop(id_producto, None) is not None:
+            self._consumos.pop(id_producto, None)
+            self._olvidar(id_producto)
+            self.guardar()
+
+    def actualizar_consumos(self, consumos):
+        """Reemplaza los consumos diarios ({id: unidades por día}) y reordena en O(n)"""
+        self._consumos = {id_producto: consumos.get(id_producto, 0) for id_producto in self._puntos}
+        self._reconstruir()
+        self.guardar()
+
+    def cantidad_cambiada(self, id_producto, cantidad):
+        """Se llama en cada cambio de cantidad; solo cuesta algo si el producto tiene punto de reorden"""
+        if id_producto in self._puntos:
+            self._cantidades[id_producto] = cantidad
+            self._evaluar(id_producto)
+
+    def producto_eliminado(self, id_producto):
+        """El punto de reorden se conserva por si el producto vuelve (p. ej. al revertir una transacción)"""
+        if id_producto in self._cantidades:
+            self._olvidar(id_producto)
+
+    def cargar_cantidades(self, productos):
+        """Toma las cantidades de {id: Producto} al cargar el inventario, sin disparar eventos"""
+        self._cantidades = {}
+        for id_producto in self._puntos:
+            producto = productos.get(id_producto)
+            if producto is not None:
+                self._cantidades[id_producto] = producto.get_cantidad()
+        self._bajo_umbral = {id_producto for id_producto, cantidad in self._cantidades.items()
+                             if cantidad <= self._puntos[id_producto]}
+        self._reconstruir()
+
+    def _vigente(self, entrada):
+        _, id_producto, version = entrada
+        return self._versiones.get(id_producto) == version
+
+    def por_reponer(self, limite=None):
+        """Productos en su punto de reorden o por debajo, de menos a más días de stock restantes.
+
+        Devuelve una lista de (id, dias_restantes). Solo se sacan del montículo las
+        entradas necesarias y después se devuelven, así que cuesta O(k log n).
+        """
+        vigentes = []
+        while self._monticulo and (limite is None or len(vigentes) < limite):
+            entrada = heapq.heappop(self._monticulo)
+            if self._vigente(entrada):
+                vigentes.append(entrada)
+            # Las entradas obsoletas se descartan definitivamente
+        for entrada in vigentes:
+            heapq.heappush(self._monticulo, entrada)
+        return [(id_producto, dias) for dias, id_producto, _ in vigentes]
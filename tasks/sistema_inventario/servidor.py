@@ -0,0 +1,126 @@
+"""Servidor asyncio que comparte un Inventario en memoria entre varios clientes.
+
+Protocolo: una línea JSON por solicitud y una por respuesta.
+    -> {"id": 1, "op": "agregar", "nombre": "arroz", "cantidad": 10, "precio": 1.5}
+    <- {"id": 1, "ok": true, "resultado": 42}
+    -> {"id": 2, "op": "ajustar", "id_producto": 99, "diferencia": -1}
+    <- {"id": 2, "ok": false, "error": "❌ Producto no encontrado."}
+
+Las solicitudes se pueden encadenar sin esperar respuesta (pipelining): el
+servidor procesa en orden todas las líneas recibidas en un bloque y devuelve
+sus respuestas con una sola escritura. Operaciones: ping, agregar, eliminar,
+cantidad, ajustar, precio, buscar y listar.
+
+Uso: python servidor.py [--archivo inventario.json] [--host 127.0.0.1] [--puerto 8765]
+"""
+import argparse
+import asyncio
+import json
+
+from inventario import Inventario
+
+LIMITE_LINEA = 1 << 20  # Bytes máximos de una solicitud
+
+
+def _producto(producto):
+    return producto.to_dict()
+
+
+def _listar(inventario, tamano=20, cursor=None, **filtros):
+    pagina = inventario.listar(tamano, cursor=cursor, **filtros)
+    return {"productos": [_producto(p) for p in pagina.productos], "total": pagina.total, "cursor": pagina.cursor}
+
+
+def _agregar(inventario, nombre, cantidad, precio):
+    inventario.agregar_producto(nombre, cantidad, precio)
+    return inventario.ultimo_id
+
+
+# Cada operación recibe el inventario y los argumentos de la solicitud
+OPERACIONES = {
+    "ping": lambda inventario: "pong",
+    "agregar": _agregar,
+    "eliminar": lambda inventario, id_producto: inventario.eliminar_producto(id_producto),
+    "cantidad": lambda inventario, id_producto, cantidad: inventario.actualizar_cantidad(id_producto, cantidad),
+    "ajustar": lambda inventario, id_producto, diferencia: inventario.ajustar_cantidad(id_producto, diferencia),
+    "precio": lambda inventario, id_producto, precio: inventario.actualizar_precio(id_producto, precio),
+    "buscar": lambda inventario, nombre: [_producto(p) for p in inventario.buscar_por_nombre(nombre)],
+    "listar": _listar,
+}
+
+
+class ServidorInventario:
+    """Atiende conexiones TCP y ejecuta las solicitudes sobre un único Inventario"""
+
+    def __init__(self, inventario):
+        self.inventario = inventario
+        self.solicitudes = 0
+
+    def ejecutar(self, linea):
+        """Procesa una línea de solicitud y devuelve la respuesta como diccionario"""
+        try:
+            solicitud = json.loads(linea)
+            argumentos = dict(solicitud)
+            id_solicitud = argumentos.pop("id", None)
+            operacion = OPERACIONES[argumentos.pop("op")]
+        except Exception:
+            return {"id": None, "ok": False, "error": "❌ Solicitud no válida."}
+        self.solicitudes += 1
+        try:
+            # Dentro de una transacción las validaciones fallidas se convierten en
+            # ValueError con el mensaje del inventario; las reversiones no se anuncian
+            # en la consola del servidor, el cliente ya recibe el error
+            with self.inventario.transaccion(silenciosa=True):
+                resultado = operacion(self.inventario, **argumentos)
+        except ValueError as e:
+            return {"id": id_solicitud, "ok": False, "error": str(e)}
+        except TypeError:
+            return {"id": id_solicitud, "ok": False, "error": "❌ Argumentos no válidos."}
+        except Exception as e:
+            # Cualquier otro fallo (p. ej. un nombre que no es texto) solo afecta a esta solicitud
+            return {"id": id_solicitud, "ok": False, "error": f"❌ Solicitud no válida: {type(e).__name__}: {e}"}
+        return {"id": id_solicitud, "ok": True, "resultado": resultado}
+
+    async def atender(self, lector, escritor):
+        pendiente = b""
+        try:
+            while True:
+                bloque = await lector.read(1 << 16)
+                if not bloque:
+                    break
+                *lineas, pendiente = (pendiente + bloque).split(b"\n")
+                if len(pendiente) > LIMITE_LINEA:
+                    break
+                respuestas = [json.dumps(self.ejecutar(linea), ensure_ascii=False) for linea in lineas if linea.strip()]
+                if respuestas:
+                    escritor.write(("\n".join(respuestas) + "\n").encode("utf-8"))
+                    await escritor.drain()
+        except ConnectionError:
+            pass
+        finally:
+            escritor.close()
+
+    async def servir(self, host="127.0.0.1", puerto=8765):
+        servidor = await asyncio.start_server(self.atender, host, puerto)
+        print(f"✅ Servidor de inventario escuchando en {host}:{puerto}")
+        async with servidor:
+            await servidor.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor de inventario compartido")
+    parser.add_argument("--archivo", default="inventario.json")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8765)
+    argumentos = parser.parse_args()
+
+    inventario = Inventario(argumentos.archivo, diario=True, silencioso=True)
+    try:
+        asyncio.run(ServidorInventario(inventario).servir(argumentos.host, argumentos.puerto))
+    except KeyboardInterrupt:
+        inventario.compactar()
+        print("💾 Servidor detenido; inventario compactado.")
+
+
+if __name__ == "__main__":
+    main()
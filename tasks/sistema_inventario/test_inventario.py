@@ -0,0 +1,229 @@
+"""Pruebas de regresión del sistema de inventario.
+
+Uso: python -m unittest test_inventario (desde esta carpeta)
+"""
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from almacen_columnar import AlmacenColumnar
+from analitica import AnaliticaInventario
+from formatos import FormatoBinario
+from importacion import importar_productos
+from inventario import Inventario
+from inventario_sqlite import InventarioSQLite
+from producto import Producto
+
+
+class PruebaConCarpeta(unittest.TestCase):
+    """Cada prueba trabaja en una carpeta temporal y sin mensajes por pantalla"""
+
+    def setUp(self):
+        self.carpeta = tempfile.TemporaryDirectory()
+        self.addCleanup(self.carpeta.cleanup)
+        salida = contextlib.redirect_stdout(io.StringIO())
+        salida.__enter__()
+        self.addCleanup(salida.__exit__, None, None, None)
+
+    def ruta(self, nombre="inventario.json"):
+        return os.path.join(self.carpeta.name, nombre)
+
+    def abrir(self, nombre="inventario.json", **opciones):
+        return Inventario(self.ruta(nombre), silencioso=True, **opciones)
+
+
+class PruebasPersistencia(PruebaConCarpeta):
+    def test_reabrir_conserva_los_productos(self):
+        inventario = self.abrir()
+        inventario.agregar_producto("arroz", 10, 1.5)
+        inventario.agregar_producto("leche", 3, 0.9)
+        inventario.eliminar_producto(1)
+        reabierto = self.abrir()
+        self.assertEqual([p.to_dict() for p in reabierto.productos.values()],
+                         [{"id": 2, "nombre": "leche", "cantidad": 3, "precio": 0.9}])
+        self.assertEqual(reabierto.ultimo_id, 2)
+
+    def test_el_diario_se_reproduce_al_cargar(self):
+        inventario = self.abrir(diario=True)
+        inventario.agregar_producto("arroz", 10, 1.5)
+        inventario.actualizar_cantidad(1, 7)
+        inventario.agregar_producto("leche", 3, 0.9)
+        inventario.eliminar_producto(2)
+        self.assertTrue(os.path.exists(inventario.archivo_diario))
+        reabierto = self.abrir(diario=True)
+        self.assertEqual(list(reabierto.productos), [1])
+        self.assertEqual(reabierto.productos[1].get_cantidad(), 7)
+        self.assertEqual(reabierto.ultimo_id, 2)
+
+    def test_linea_incompleta_del_diario_se_descarta(self):
+        inventario = self.abrir(diario=True)
+        inventario.agregar_producto("arroz", 10, 1.5)
+        with open(inventario.archivo_diario, "ab") as file:
+            file.write(b'{"op": "p", "id": 2, "nom')
+        reabierto = self.abrir(diario=True)
+        self.assertEqual(list(reabierto.productos), [1])
+        reabierto.agregar_producto("leche", 3, 0.9)
+        self.assertEqual(sorted(self.abrir(diario=True).productos), [1, 2])
+
+    def test_compactar_integra_el_diario(self):
+        inventario = self.abrir(diario=True)
+        for i in range(5):
+            inventario.agregar_producto(f"producto {i}", i, 1.0)
+        inventario.compactar()
+        self.assertFalse(os.path.exists(inventario.archivo_diario))
+        self.assertEqual(len(self.abrir(diario=True).productos), 5)
+
+
+class PruebasTransacciones(PruebaConCarpeta):
+    def test_confirmar_guarda_todos_los_cambios(self):
+        inventario = self.abrir(diario=True)
+        with inventario.transaccion():
+            inventario.agregar_producto("arroz", 10, 1.5)
+            inventario.agregar_producto("leche", 3, 0.9)
+            inventario.actualizar_precio(1, 2.0)
+        reabierto = self.abrir(diario=True)
+        self.assertEqual(len(reabierto.productos), 2)
+        self.assertEqual(reabierto.productos[1].get_precio(), 2.0)
+
+    def test_una_validacion_fallida_revierte_todo(self):
+        inventario = self.abrir()
+        inventario.agregar_producto("arroz", 10, 1.5)
+        with self.assertRaises(ValueError):
+            with inventario.transaccion():
+                inventario.actualizar_cantidad(1, 4)
+                inventario.agregar_producto("leche", 3, 0.9)
+                inventario.agregar_producto("", 1, 1.0)
+        self.assertEqual(list(inventario.productos), [1])
+        self.assertEqual(inventario.productos[1].get_cantidad(), 10)
+        self.assertEqual(inventario.ultimo_id, 1)
+        self.assertEqual(self.abrir().productos[1].get_cantidad(), 10)
+
+    def test_la_reversion_silenciosa_no_escribe_en_pantalla(self):
+        inventario = self.abrir()
+        salida = io.StringIO()
+        with contextlib.redirect_stdout(salida), self.assertRaises(ValueError):
+            with inventario.transaccion(silenciosa=True):
+                inventario.agregar_producto("", 1, 1.0)
+        self.assertEqual(salida.getvalue(), "")
+
+    def test_movimientos_solo_al_confirmar(self):
+        inventario = self.abrir(movimientos=True)
+        inventario.agregar_producto("arroz", 10, 1.5)
+        with self.assertRaises(ValueError):
+            with inventario.transaccion():
+                inventario.ajustar_cantidad(1, -4)
+                inventario.actualizar_cantidad(1, -1)
+        self.assertEqual(inventario.movimientos.historial(1)[-1][1], 10)
+        self.assertEqual(len(inventario.movimientos), 1)
+
+
+class PruebasColumnar(PruebaConCarpeta):
+    def test_cantidad_no_entera_no_deja_columnas_desiguales(self):
+        inventario = self.abrir(columnar=True)
+        inventario.agregar_producto("a", 1, 1.0)
+        self.assertFalse(inventario.agregar_producto("b", 2.5, 1.0))
+        self.assertTrue(inventario.agregar_producto("c", 3.0, 1.0))
+        ids, cantidades, precios = inventario.productos.columnas()
+        self.assertEqual((len(ids), len(cantidades), len(precios)), (2, 2, 2))
+        self.assertEqual([p.get_cantidad() for p in inventario.productos.values()], [1, 3])
+
+    def test_asignar_directamente_una_cantidad_no_entera(self):
+        almacen = AlmacenColumnar()
+        with self.assertRaises(ValueError):
+            almacen[1] = Producto(1, "a", 1.5, 1.0)
+        self.assertEqual(len(almacen), 0)
+        self.assertEqual(list(almacen.items()), [])
+
+    def test_vista_de_un_producto_eliminado(self):
+        almacen = AlmacenColumnar()
+        almacen[1] = Producto(1, "x", 1, 1.0)
+        almacen[2] = Producto(2, "y", 1, 1.0)
+        vista = almacen[1]
+        del almacen[1]
+        with self.assertRaises(KeyError):
+            vista.get_nombre()
+
+
+class PruebasMovimientos(PruebaConCarpeta):
+    def test_cantidad_no_entera_no_desincroniza_el_historial(self):
+        inventario = self.abrir(movimientos=True)
+        inventario.agregar_producto("arroz", 3, 1.0)
+        self.assertFalse(inventario.actualizar_cantidad(1, 2.5))
+        self.assertEqual(inventario.productos[1].get_cantidad(), 3)
+        self.assertTrue(inventario.actualizar_cantidad(1, 2.0))
+        reabierto = self.abrir(movimientos=True)
+        self.assertEqual(sum(d for _, d in reabierto.movimientos.historial(1)),
+                         reabierto.productos[1].get_cantidad())
+
+
+class PruebasFormatos(PruebaConCarpeta):
+    def test_binario_rechaza_cantidades_no_enteras(self):
+        with self.assertRaises(ValueError):
+            FormatoBinario().escribir(self.ruta("a.invb"), [{"id": 1, "nombre": "a", "cantidad": 7.5, "precio": 1.0}])
+
+    def test_inventario_binario_valida_al_agregar(self):
+        inventario = self.abrir("inventario.invb")
+        self.assertFalse(inventario.agregar_producto("a", 7.5, 1.0))
+        self.assertTrue(inventario.agregar_producto("b", 7.0, 1.0))
+        self.assertEqual(self.abrir("inventario.invb").productos[1].get_cantidad(), 7)
+
+
+class PruebasImportacion(PruebaConCarpeta):
+    def test_linea_jsonl_mal_formada_es_una_fila_rechazada(self):
+        ruta = self.ruta("productos.jsonl")
+        with open(ruta, "w", encoding="utf-8") as file:
+            file.write('{"nombre": "a", "cantidad": 1, "precio": 1}\n'
+                       '{"nombre": "b",\n'
+                       '{"nombre": "c", "cantidad": 2, "precio": 1}\n')
+        inventario = self.abrir()
+        self.assertEqual(importar_productos(inventario, ruta), (2, 1))
+        self.assertEqual(len(self.abrir().productos), 2)
+
+
+class PruebasAnalitica(PruebaConCarpeta):
+    def test_cantidades_decimales_en_modo_diccionario(self):
+        inventario = self.abrir()
+        inventario.agregar_producto("a", 2.5, 2.0)
+        inventario.agregar_producto("b", 3, 1.0)
+        analitica = AnaliticaInventario(inventario)
+        self.assertEqual(analitica.valor_total(), 8.0)
+        self.assertEqual(analitica.bajo_stock(3), [1])
+
+    def test_histograma_con_precios_iguales(self):
+        inventario = self.abrir()
+        inventario.agregar_producto("a", 1, 5.0)
+        inventario.agregar_producto("b", 1, 5.0)
+        conteos, bordes = AnaliticaInventario(inventario).histograma_precios(4)
+        self.assertEqual(conteos, [0, 0, 2, 0])
+        self.assertEqual(bordes, [4.5, 4.75, 5.0, 5.25, 5.5])
+
+
+class PruebasSQLite(PruebaConCarpeta):
+    def abrir_sqlite(self):
+        inventario = InventarioSQLite(self.ruta("inventario.db"), silencioso=True)
+        self.addCleanup(inventario.cerrar)
+        return inventario
+
+    def test_busqueda_corta_sin_distinguir_mayusculas_acentuadas(self):
+        inventario = self.abrir_sqlite()
+        inventario.agregar_producto("café", 1, 1.0)
+        inventario.agregar_producto("CAFÉ molido", 1, 1.0)
+        inventario.agregar_producto("té", 1, 1.0)
+        self.assertEqual([p.get_nombre() for p in inventario.buscar_por_nombre("É")],
+                         ["café", "CAFÉ molido", "té"])
+
+    def test_transaccion_silenciosa(self):
+        inventario = self.abrir_sqlite()
+        salida = io.StringIO()
+        with contextlib.redirect_stdout(salida), self.assertRaises(ValueError):
+            with inventario.transaccion(silenciosa=True):
+                inventario.agregar_producto("arroz", 1, 1.0)
+                inventario.agregar_producto("", 1, 1.0)
+        self.assertEqual(salida.getvalue(), "")
+        self.assertEqual(inventario.contar_productos(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
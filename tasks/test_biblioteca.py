@@ -0,0 +1,156 @@
+"""Pruebas de regresión de la biblioteca digital.
+
+Uso: python -m unittest test_biblioteca (desde esta carpeta)
+"""
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+from busqueda_biblioteca import MotorBusqueda
+from historial_biblioteca import HistorialPrestamos
+from ingesta_biblioteca import ingerir, normalizar_isbn, validar_lote
+from persistencia_biblioteca import AlmacenArchivos, AlmacenBiblioteca
+from sistema_biblioteca import Biblioteca, Libro, Usuario
+
+
+class PruebaConCarpeta(unittest.TestCase):
+    """Cada prueba trabaja en una carpeta temporal y sin mensajes por pantalla"""
+
+    def setUp(self):
+        self.carpeta = tempfile.TemporaryDirectory()
+        self.addCleanup(self.carpeta.cleanup)
+        salida = contextlib.redirect_stdout(io.StringIO())
+        salida.__enter__()
+        self.addCleanup(salida.__exit__, None, None, None)
+        self.ruta = os.path.join(self.carpeta.name, "biblioteca")
+
+
+class PruebasPersistencia(PruebaConCarpeta):
+    def test_restaurar_desde_el_registro_de_cambios(self):
+        biblioteca = Biblioteca(AlmacenArchivos(self.ruta))
+        biblioteca.añadir_libro(Libro("Cien años de soledad", "Gabriel García Márquez", "Ficción", "1", 2))
+        biblioteca.añadir_libro(Libro("El principito", "Antoine de Saint-Exupéry", "Fantasía", "2"))
+        biblioteca.registrar_usuario(Usuario("Ana", "U1"))
+        self.assertTrue(biblioteca.prestar_libro("1", "U1", ahora=1000.0))
+        biblioteca.quitar_libro("2")
+        restaurada = Biblioteca(AlmacenArchivos(self.ruta))
+        self.assertEqual(list(restaurada.libros), ["1"])
+        self.assertEqual(restaurada.libros["1"].disponibles, 1)
+        self.assertEqual([u.id_usuario for u in restaurada.prestatarios("1")], ["U1"])
+        self.assertEqual(restaurada.vencimiento("1", "U1"), biblioteca.vencimiento("1", "U1"))
+
+    def test_restaurar_tras_compactar(self):
+        biblioteca = Biblioteca(AlmacenArchivos(self.ruta))
+        biblioteca.añadir_libros([Libro(f"Libro {i}", "Autor", "Ficción", str(i)) for i in range(10)])
+        biblioteca.registrar_usuario(Usuario("Ana", "U1"))
+        biblioteca.prestar_libro("3", "U1")
+        biblioteca.compactar()
+        biblioteca.devolver_libro("3", "U1")
+        restaurada = Biblioteca(AlmacenArchivos(self.ruta))
+        self.assertEqual(len(restaurada.libros), 10)
+        self.assertEqual(restaurada.prestamos, {})
+
+    def test_un_almacen_incompleto_falla_al_crearlo(self):
+        class SoloCarga(AlmacenBiblioteca):
+            def cargar(self):
+                return {}
+
+        with self.assertRaises(TypeError):
+            SoloCarga()
+
+
+class PruebasInternado(unittest.TestCase):
+    def test_textos_compartidos_y_olvidados_al_quitar(self):
+        biblioteca = Biblioteca()
+        primero = Libro("a", "".join(["Autor ", "X"]), "Ficción", "1")
+        segundo = Libro("b", "".join(["Autor ", "X"]), "Ficción", "2")
+        biblioteca.añadir_libro(primero)
+        biblioteca.añadir_libros([segundo])
+        self.assertIs(primero.autor, segundo.autor)
+        biblioteca.quitar_libro("1")
+        biblioteca.quitar_libro("2")
+        self.assertEqual(biblioteca._textos, {})
+        self.assertEqual(Biblioteca()._textos, {})
+
+
+class PruebasHistorial(PruebaConCarpeta):
+    def test_claves_numericas_tras_recargar_el_resumen(self):
+        historial = HistorialPrestamos(self.ruta)
+        historial.registrar([[1.7e9, "p", 111, 7, "Ficción"]])
+        historial.guardar_resumen()
+        historial.cerrar()
+        historial = HistorialPrestamos(self.ruta)
+        self.addCleanup(historial.cerrar)
+        historial.registrar([[1.7e9, "p", 111, 7, "Ficción"]])
+        self.assertEqual(historial.por_usuario, {7: 2})
+        self.assertEqual(historial.mas_prestados(), [(111, 2)])
+        self.assertEqual(historial.mas_prestados(anio=2023), [(111, 2)])
+
+
+class PruebasIngesta(PruebaConCarpeta):
+    def test_isbn_con_digitos_no_ascii(self):
+        for isbn in ["٨", "²", "²²²²²²²²²²", "９７８０３０７４７４７２８"]:
+            self.assertIsNone(normalizar_isbn(isbn), isbn)
+        self.assertEqual(normalizar_isbn("978-0307474728"), "9780307474728")
+        self.assertEqual(normalizar_isbn("0-8044-2957-x"), "080442957X")
+
+    def test_isbn_no_valido_es_un_registro_rechazado(self):
+        libros, duplicados, invalidos = validar_lote(
+            [{"isbn": "٨", "titulo": "a", "autor": "b"}, {"isbn": "978-0307474728", "titulo": "a", "autor": "b"}],
+            set())
+        self.assertEqual((len(libros), duplicados, invalidos), (1, 0, 1))
+
+    def test_la_ingesta_termina_compactando(self):
+        almacen = AlmacenArchivos(self.ruta)
+        biblioteca = Biblioteca(almacen)
+        registros = [{"isbn": "978-0307474728", "titulo": "a", "autor": "b"},
+                     {"isbn": "0-8044-2957-X", "titulo": "c", "autor": "d"}]
+        resumen = ingerir(biblioteca, registros, tamano_lote=1)
+        self.assertEqual(resumen.añadidos, 2)
+        self.assertFalse(os.path.exists(almacen.archivo_registro))
+        self.assertEqual(len(Biblioteca(AlmacenArchivos(self.ruta)).libros), 2)
+
+
+class Documento:
+    def __init__(self, isbn, titulo, autor="autor", categoria="categoria"):
+        self.isbn, self.titulo, self.autor, self.categoria = isbn, titulo, autor, categoria
+
+
+class PruebasBusqueda(unittest.TestCase):
+    def test_compactar_renumera_los_documentos(self):
+        motor = MotorBusqueda()
+        for i in range(1000):
+            documento = Documento(str(i), f"libro {i}")
+            motor.agregar(documento)
+            motor.quitar(documento)
+        self.assertEqual((len(motor), len(motor._isbns), len(motor._longitudes)), (0, 0, 0))
+
+    def test_resultados_iguales_tras_compactar(self):
+        documentos = [Documento(str(i), ["sol luna", "mar cielo", "sol mar rio"][i % 3] + f" {i}")
+                      for i in range(60)]
+        compactado, nuevo = MotorBusqueda(), MotorBusqueda()
+        for documento in documentos:
+            compactado.agregar(documento)
+        for documento in documentos[::4]:
+            compactado.quitar(documento)
+        compactado.compactar()
+        for documento in documentos:
+            if documento not in documentos[::4]:
+                nuevo.agregar(documento)
+        for consulta in ["sol", "mar rio", "ci*"]:
+            esperado = nuevo.buscar(consulta, 20)
+            obtenido = compactado.buscar(consulta, 20)
+            self.assertEqual([isbn for isbn, _ in obtenido], [isbn for isbn, _ in esperado])
+            for (_, puntos), (_, esperados) in zip(obtenido, esperado):
+                self.assertAlmostEqual(puntos, esperados, places=5)
+
+    def test_documentos_sin_palabras(self):
+        motor = MotorBusqueda()
+        motor.agregar(Documento("1", "", "", ""))
+        self.assertEqual(motor.buscar("nada"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()